@@ -0,0 +1,37 @@
+"""Add geocode_cache table
+
+Revision ID: 305211092cce
+Revises: 2d63442efb4e
+Create Date: 2024-04-15 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '305211092cce'
+down_revision: Union[str, None] = '2d63442efb4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('geocode_cache',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('normalized_address', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('lat', sa.Float(), nullable=True),
+    sa.Column('lng', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('normalized_address'),
+    schema='public'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('geocode_cache', schema='public')
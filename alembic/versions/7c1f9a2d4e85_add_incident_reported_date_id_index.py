@@ -0,0 +1,27 @@
+"""Add incident reported date, id index
+
+Revision ID: 7c1f9a2d4e85
+Revises: 305211092cce
+Create Date: 2024-04-17 09:41:08.215734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1f9a2d4e85'
+down_revision: Union[str, None] = '305211092cce'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_incident_reported_date_id', 'incident', ['incident_reported_date', 'id'], unique=False,
+                    schema='public')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_incident_reported_date_id', table_name='incident', schema='public')
@@ -0,0 +1,31 @@
+"""Add incident details_fingerprint
+
+Revision ID: a3c81e5f92d4
+Revises: f7b2d9e4c6a1
+Create Date: 2024-04-24 14:05:51.630918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c81e5f92d4'
+down_revision: Union[str, None] = 'f7b2d9e4c6a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # filled in by police_fire.data_normalization.fix_database_duplicates.backfill_details_fingerprints, so it's
+    # computed the same way as for new incidents
+    op.add_column('incident', sa.Column('details_fingerprint', sa.String(), nullable=True), schema='public')
+    op.create_index('ix_incident_details_fingerprint', 'incident', ['details_fingerprint'], unique=False,
+                    schema='public')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_incident_details_fingerprint', table_name='incident', schema='public')
+    op.drop_column('incident', 'details_fingerprint', schema='public')
@@ -0,0 +1,26 @@
+"""Add charges charged_name index
+
+Revision ID: b5e03d7a91c2
+Revises: 7c1f9a2d4e85
+Create Date: 2024-04-17 14:02:55.618320
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e03d7a91c2'
+down_revision: Union[str, None] = '7c1f9a2d4e85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_charges_charged_name', 'charges', ['charged_name'], unique=False, schema='public')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_charges_charged_name', table_name='charges', schema='public')
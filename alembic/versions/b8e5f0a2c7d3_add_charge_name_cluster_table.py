@@ -0,0 +1,38 @@
+"""Add charge_name_cluster table
+
+Revision ID: b8e5f0a2c7d3
+Revises: a3c81e5f92d4
+Create Date: 2024-04-26 11:47:22.905143
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e5f0a2c7d3'
+down_revision: Union[str, None] = 'a3c81e5f92d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('charge_name_cluster',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('crime', sa.String(), nullable=True),
+    sa.Column('canonical_crime', sa.String(), nullable=True),
+    sa.Column('similarity', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('crime'),
+    schema='public'
+    )
+    op.create_index('ix_charge_name_cluster_canonical_crime', 'charge_name_cluster', ['canonical_crime'],
+                    unique=False, schema='public')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_charge_name_cluster_canonical_crime', table_name='charge_name_cluster', schema='public')
+    op.drop_table('charge_name_cluster', schema='public')
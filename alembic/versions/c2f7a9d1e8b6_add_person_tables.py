@@ -0,0 +1,66 @@
+"""Add person and person_name tables
+
+Revision ID: c2f7a9d1e8b6
+Revises: b8e5f0a2c7d3
+Create Date: 2024-04-29 16:21:40.218563
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2f7a9d1e8b6'
+down_revision: Union[str, None] = 'b8e5f0a2c7d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # filled in by police_fire.data_normalization.resolve_people
+    op.create_table('person',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('canonical_name', sa.String(), nullable=True),
+    sa.Column('first_name', sa.String(), nullable=True),
+    sa.Column('middle_name', sa.String(), nullable=True),
+    sa.Column('last_name', sa.String(), nullable=True),
+    sa.Column('suffix', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    schema='public'
+    )
+    op.create_index('ix_person_last_name_first_name', 'person', ['last_name', 'first_name'], unique=False,
+                    schema='public')
+    op.create_table('person_name',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('person_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['person_id'], ['public.person.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name'),
+    schema='public'
+    )
+    op.create_index('ix_person_name_person_id', 'person_name', ['person_id'], unique=False, schema='public')
+    op.add_column('incident', sa.Column('person_id', sa.Integer(), nullable=True), schema='public')
+    op.create_foreign_key('incident_person_id_fkey', 'incident', 'person', ['person_id'], ['id'],
+                          source_schema='public', referent_schema='public')
+    op.create_index('ix_incident_person_id', 'incident', ['person_id'], unique=False, schema='public')
+    op.add_column('charges', sa.Column('person_id', sa.Integer(), nullable=True), schema='public')
+    op.create_foreign_key('charges_person_id_fkey', 'charges', 'person', ['person_id'], ['id'],
+                          source_schema='public', referent_schema='public')
+    op.create_index('ix_charges_person_id', 'charges', ['person_id'], unique=False, schema='public')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_charges_person_id', table_name='charges', schema='public')
+    op.drop_constraint('charges_person_id_fkey', 'charges', schema='public', type_='foreignkey')
+    op.drop_column('charges', 'person_id', schema='public')
+    op.drop_index('ix_incident_person_id', table_name='incident', schema='public')
+    op.drop_constraint('incident_person_id_fkey', 'incident', schema='public', type_='foreignkey')
+    op.drop_column('incident', 'person_id', schema='public')
+    op.drop_index('ix_person_name_person_id', table_name='person_name', schema='public')
+    op.drop_table('person_name', schema='public')
+    op.drop_index('ix_person_last_name_first_name', table_name='person', schema='public')
+    op.drop_table('person', schema='public')
@@ -0,0 +1,34 @@
+"""Add charges_extracted_at and charges_extracted_hash to incident
+
+Revision ID: c9d84f1e6a37
+Revises: b5e03d7a91c2
+Create Date: 2024-04-18 11:26:43.907152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d84f1e6a37'
+down_revision: Union[str, None] = 'b5e03d7a91c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('incident', sa.Column('charges_extracted_at', sa.DateTime(), nullable=True), schema='public')
+    op.add_column('incident', sa.Column('charges_extracted_hash', sa.String(), nullable=True), schema='public')
+    # incidents that already have charges were extracted from their current spellchecked_charges
+    op.execute(
+        "UPDATE public.incident SET charges_extracted_at = now(), charges_extracted_hash = md5(spellchecked_charges) "
+        "WHERE spellchecked_charges IS NOT NULL "
+        "AND EXISTS (SELECT 1 FROM public.charges WHERE charges.incident_id = incident.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('incident', 'charges_extracted_hash', schema='public')
+    op.drop_column('incident', 'charges_extracted_at', schema='public')
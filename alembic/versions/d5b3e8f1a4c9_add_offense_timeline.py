@@ -0,0 +1,42 @@
+"""Add offense_timeline table
+
+Revision ID: d5b3e8f1a4c9
+Revises: c2f7a9d1e8b6
+Create Date: 2024-05-01 10:12:57.381046
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b3e8f1a4c9'
+down_revision: Union[str, None] = 'c2f7a9d1e8b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # filled in by police_fire.analysis.calculate_recidivism_rate
+    op.create_table('offense_timeline',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('incident_id', sa.Integer(), nullable=True),
+    sa.Column('offender_key', sa.String(), nullable=True),
+    sa.Column('incident_date', sa.Date(), nullable=True),
+    sa.Column('days_to_next', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('incident_id'),
+    schema='public'
+    )
+    op.create_index('ix_offense_timeline_offender_key', 'offense_timeline', ['offender_key'], unique=False,
+                    schema='public')
+    op.create_index('ix_offense_timeline_incident_date', 'offense_timeline', ['incident_date'], unique=False,
+                    schema='public')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_offense_timeline_incident_date', table_name='offense_timeline', schema='public')
+    op.drop_index('ix_offense_timeline_offender_key', table_name='offense_timeline', schema='public')
+    op.drop_table('offense_timeline', schema='public')
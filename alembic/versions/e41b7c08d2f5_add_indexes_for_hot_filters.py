@@ -0,0 +1,44 @@
+"""Add indexes for hot filters
+
+Revision ID: e41b7c08d2f5
+Revises: c9d84f1e6a37
+Create Date: 2024-04-19 10:12:37.480215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b7c08d2f5'
+down_revision: Union[str, None] = 'c9d84f1e6a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_incident_accused_name_trgm', 'incident', ['accused_name'], unique=False, schema='public',
+                    postgresql_using='gin', postgresql_ops={'accused_name': 'gin_trgm_ops'})
+    op.create_index('ix_incident_details_md5', 'incident', [sa.text('md5(details)')], unique=False,
+                    schema='public', postgresql_using='hash')
+    op.create_index('ix_incident_cortland_standard_source', 'incident', ['cortlandStandardSource'], unique=False,
+                    schema='public')
+    op.create_index('ix_incident_cortland_voice_source', 'incident', ['cortlandVoiceSource'], unique=False,
+                    schema='public')
+    op.create_index('ix_article_incidents_scraped_verified', 'article', ['incidents_scraped', 'incidents_verified'],
+                    unique=False, schema='public')
+    op.create_index('ix_charges_crime', 'charges', ['crime'], unique=False, schema='public')
+    op.create_index('ix_charges_incident_id', 'charges', ['incident_id'], unique=False, schema='public')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_charges_incident_id', table_name='charges', schema='public')
+    op.drop_index('ix_charges_crime', table_name='charges', schema='public')
+    op.drop_index('ix_article_incidents_scraped_verified', table_name='article', schema='public')
+    op.drop_index('ix_incident_cortland_voice_source', table_name='incident', schema='public')
+    op.drop_index('ix_incident_cortland_standard_source', table_name='incident', schema='public')
+    op.drop_index('ix_incident_details_md5', table_name='incident', schema='public')
+    op.drop_index('ix_incident_accused_name_trgm', table_name='incident', schema='public')
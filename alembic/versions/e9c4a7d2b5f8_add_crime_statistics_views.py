@@ -0,0 +1,64 @@
+"""Add crime statistics materialized views
+
+Revision ID: e9c4a7d2b5f8
+Revises: d5b3e8f1a4c9
+Create Date: 2024-05-02 14:36:08.527719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9c4a7d2b5f8'
+down_revision: Union[str, None] = 'd5b3e8f1a4c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # refreshed by police_fire.analysis.crime_statistics.  REFRESH ... CONCURRENTLY needs a unique index on each view
+    op.execute('''
+        CREATE MATERIALIZED VIEW public.crime_counts AS
+        SELECT crime, category, count(id) AS charge_count, count(DISTINCT incident_id) AS incident_count
+        FROM public.charges
+        GROUP BY crime, category
+    ''')
+    op.create_index('ux_crime_counts_crime_category', 'crime_counts', ['crime', 'category'], unique=True,
+                    schema='public')
+
+    op.execute('''
+        CREATE MATERIALIZED VIEW public.crime_counts_by_month AS
+        SELECT date_trunc('month', incident.incident_reported_date)::date AS month, charges.crime, charges.category,
+               count(charges.id) AS charge_count, count(DISTINCT charges.incident_id) AS incident_count
+        FROM public.charges
+        JOIN public.incident ON incident.id = charges.incident_id
+        WHERE incident.incident_reported_date IS NOT NULL
+        GROUP BY 1, charges.crime, charges.category
+    ''')
+    op.create_index('ux_crime_counts_by_month_month_crime_category', 'crime_counts_by_month',
+                    ['month', 'crime', 'category'], unique=True, schema='public')
+
+    # people as /people lists them: under their canonical name once resolve_people has linked them
+    op.execute('''
+        CREATE MATERIALIZED VIEW public.person_charge_totals AS
+        SELECT coalesce(person.canonical_name, charges.charged_name) AS person_name,
+               count(charges.id) AS total_charges, count(DISTINCT charges.incident_id) AS total_incidents,
+               count(DISTINCT charges.crime) AS distinct_crime_count,
+               array_remove(array_agg(DISTINCT charges.crime), NULL) AS distinct_crimes
+        FROM public.charges
+        LEFT JOIN public.person ON person.id = charges.person_id
+        GROUP BY 1
+    ''')
+    op.create_index('ux_person_charge_totals_person_name', 'person_charge_totals', ['person_name'], unique=True,
+                    schema='public')
+    op.create_index('ix_person_charge_totals_total_charges', 'person_charge_totals', ['total_charges'], unique=False,
+                    schema='public')
+
+
+def downgrade() -> None:
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS public.person_charge_totals')
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS public.crime_counts_by_month')
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS public.crime_counts')
@@ -0,0 +1,30 @@
+"""Add partial index of incidents whose charges need extracting
+
+Revision ID: f1a6c3e9d7b2
+Revises: e9c4a7d2b5f8
+Create Date: 2024-05-03 09:41:15.264830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6c3e9d7b2'
+down_revision: Union[str, None] = 'e9c4a7d2b5f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # the predicate has to match CHARGES_TO_EXTRACT in models/incident.py for the planner to use the index
+    op.create_index('ix_incident_charges_to_extract', 'incident', ['id'], unique=False, schema='public',
+                    postgresql_where=sa.text('"cortlandStandardSource" IS NOT NULL '
+                                             'AND spellchecked_charges IS NOT NULL '
+                                             'AND charges_extracted_hash IS DISTINCT FROM md5(spellchecked_charges)'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_incident_charges_to_extract', table_name='incident', schema='public')
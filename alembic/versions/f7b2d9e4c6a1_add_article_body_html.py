@@ -0,0 +1,27 @@
+"""Add article body_html
+
+Revision ID: f7b2d9e4c6a1
+Revises: e41b7c08d2f5
+Create Date: 2024-04-22 09:31:08.114362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b2d9e4c6a1'
+down_revision: Union[str, None] = 'e41b7c08d2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # filled in by police_fire.cortland_standard.scrape_articles_by_section.backfill_article_body_html, which needs BeautifulSoup
+    op.add_column('article', sa.Column('body_html', sa.String(), nullable=True), schema='public')
+
+
+def downgrade() -> None:
+    op.drop_column('article', 'body_html', schema='public')
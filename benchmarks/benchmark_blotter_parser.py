@@ -0,0 +1,70 @@
+# parse rate of police_fire.utilities.blotter_parser and the gazetteer over synthetic Police/Fire articles in the
+# <strong> and <br> layouts and as OCR text, the work that used to be an LLM request per article.
+#   python -m benchmarks.benchmark_blotter_parser [number of articles]
+import random
+import sys
+import time
+
+from police_fire.utilities.blotter_parser import is_complete, parse_accused, parse_blotter_html, parse_blotter_text
+from police_fire.utilities.gazetteer import get_gazetteer, get_incident_location
+
+NAMES = ['Julie M. Conners', 'John Smith Jr.', 'Robert Jones', 'Mark Lee', 'Ann Marie Walsh']
+PLACES = ['Cortland', 'Cortlandville', 'Homer', 'McGraw', 'Marathon', 'Virgil', 'Preble']
+STREETS = ['Riley Road', 'Main Street', '14 Groton Ave.', 'Route 11', 'Tompkins Street', 'Cold Brook Road']
+CHARGES = ['Driving while intoxicated, a misdemeanor', 'Petit larceny, a misdemeanor', 'Harassment, a violation',
+           'Third-degree burglary, a felony']
+
+
+def build_record(rng):
+    name = rng.choice(NAMES)
+    return [
+        ('Accused', f'{name}, {rng.randint(18, 70)}, of {rng.choice(PLACES)}'),
+        ('Charges', rng.choice(CHARGES)),
+        ('Details', f'Police said {name.split()[-1]} was found on {rng.choice(STREETS)} in '
+                    f'{rng.choice(PLACES)} at 11:40 p.m. Saturday.'),
+        ('Legal actions', f'{name.split()[-1]} was ticketed to appear in {rng.choice(PLACES)} Town Court.'),
+    ]
+
+
+def build_corpus(size, seed=0):
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(size):
+        records = [build_record(rng) for _ in range(rng.randint(1, 6))]
+        if index % 3 == 0:
+            corpus.append(('html', ''.join(f'<p><strong>{label}:</strong> {value}</p>'
+                                           for record in records for label, value in record)))
+        elif index % 3 == 1:
+            corpus.append(('html', ''.join('<p>' + '<br>'.join(f'{label}: {value}' for label, value in record)
+                                           + '</p>' for record in records)))
+        else:
+            corpus.append(('text', 'Police/Fire\n' + '\n'.join(f'{label}: {value}'
+                                                                for record in records for label, value in record)))
+
+    return corpus
+
+
+def main(size=2000):
+    corpus = build_corpus(size)
+    # compile the gazetteer patterns before timing
+    get_gazetteer()
+
+    start = time.perf_counter()
+    incidents = 0
+    for kind, content in corpus:
+        records = parse_blotter_html(content) if kind == 'html' else parse_blotter_text(content)
+        for record in records:
+            if is_complete(record):
+                parse_accused(record['accused'])
+                get_incident_location(record['details'])
+                incidents += 1
+    elapsed = time.perf_counter() - start
+
+    print(f'{len(corpus)} articles, {incidents} incidents in {elapsed:.2f}s: '
+          f'{len(corpus) / elapsed:,.0f} articles/sec, {elapsed / incidents * 1e6:.1f} us/incident.')
+
+    return
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
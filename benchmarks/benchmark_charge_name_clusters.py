@@ -0,0 +1,43 @@
+# clustering rate of police_fire.utilities.charge_name_clusters over a synthetic crime vocabulary: the names in
+# charge_renames.json, each with a few misspelled copies like the ones the LLM and OCR produce.
+#   python -m benchmarks.benchmark_charge_name_clusters [number of misspellings per name]
+import random
+import sys
+import time
+
+from police_fire.utilities.charge_name_clusters import cluster_crimes, get_cluster_members
+from police_fire.utilities.charge_normalizer import load_charge_renames
+
+
+def misspell(crime, rng):
+    index = rng.randrange(len(crime))
+    return crime[:index] + rng.choice('aeilnorst') + crime[index + 1:]
+
+
+def build_vocabulary(misspellings, seed=0):
+    rng = random.Random(seed)
+    crimes = sorted(set(load_charge_renames().values()))
+    counts = {crime: rng.randint(10, 100) for crime in crimes}
+    for crime in crimes:
+        for _ in range(misspellings):
+            counts.setdefault(misspell(crime, rng), rng.randint(1, 3))
+
+    return counts
+
+
+def main(misspellings=3):
+    counts = build_vocabulary(misspellings)
+
+    start = time.perf_counter()
+    clusters = cluster_crimes(list(counts), counts=counts)
+    elapsed = time.perf_counter() - start
+
+    print(f'{len(counts)} crimes into {len(set(canonical for canonical, similarity in clusters.values()))} clusters '
+          f'({len(get_cluster_members(clusters))} with suggestions) in {elapsed:.2f}s: '
+          f'{len(counts) / elapsed:,.0f} crimes/sec.')
+
+    return
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
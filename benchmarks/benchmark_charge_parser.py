@@ -0,0 +1,49 @@
+# parse rate of police_fire.utilities.charge_parser over a synthetic corpus of charges strings built from the
+# descriptions in charge_renames.json, in the shapes the Cortland Standard uses.
+#   python -m benchmarks.benchmark_charge_parser [number of charges strings]
+import random
+import sys
+import time
+
+from police_fire.utilities.charge_normalizer import load_charge_renames
+from police_fire.utilities.charge_parser import parse_charges
+
+CHARGE_CLASSES = [', a felony', ', a misdemeanor', ', a violation', ', a traffic infraction', ', felonies',
+                  ', misdemeanors', ', violations', ', traffic infractions']
+PREFIXES = ['', '', 'two counts of ', 'third-degree ', 'second-degree ', 'three counts of fourth-degree ']
+
+
+def build_corpus(size, seed=0):
+    random.seed(seed)
+    descriptions = [description for description in load_charge_renames()
+                    if ',' not in description and ' and ' not in description]
+    corpus = []
+    for _ in range(size):
+        segments = []
+        for _ in range(random.randint(1, 3)):
+            charges = [random.choice(PREFIXES) + random.choice(descriptions) for _ in range(random.randint(1, 3))]
+            segment = ', '.join(charges[:-1]) + (' and ' if len(charges) > 1 else '') + charges[-1]
+            segments.append(segment + random.choice(CHARGE_CLASSES))
+        corpus.append('; '.join(segments) + '.')
+
+    return corpus
+
+
+def main(size=5000):
+    corpus = build_corpus(size)
+    # warm up the normalizer so loading charge_renames.json isn't timed
+    parse_charges(corpus[0], 'John Smith')
+
+    start = time.perf_counter()
+    charges_parsed = sum(len(parse_charges(charges, 'John Smith')) for charges in corpus)
+    elapsed = time.perf_counter() - start
+
+    print(f'{len(corpus)} charges strings, {charges_parsed} charges in {elapsed:.2f}s: '
+          f'{len(corpus) / elapsed:,.0f} strings/sec, {charges_parsed / elapsed:,.0f} charges/sec, '
+          f'{elapsed / charges_parsed * 1e6:.1f} us/charge.')
+
+    return
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
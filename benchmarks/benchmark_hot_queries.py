@@ -0,0 +1,73 @@
+# EXPLAIN ANALYZE timings for the queries the scrapers and the Flask app run most.  Run it before and after
+# `alembic upgrade e41b7c08d2f5` (or with --without-indexes, which drops them inside a transaction that is rolled
+# back) to compare plans.
+#   python -m benchmarks.benchmark_hot_queries [environment] [--without-indexes]
+import sys
+
+from sqlalchemy import text
+
+from database import get_database_session
+
+HOT_INDEXES = ['ix_incident_accused_name_trgm', 'ix_incident_details_md5', 'ix_incident_cortland_standard_source',
+               'ix_incident_cortland_voice_source', 'ix_article_incidents_scraped_verified', 'ix_charges_crime',
+               'ix_charges_incident_id', 'ix_charges_charged_name', 'ix_incident_reported_date_id']
+
+
+def get_sample(DBsession):
+    # values that exist in this database, so every query finds something
+    row = DBsession.execute(text(
+        "SELECT accused_name, details, \"cortlandStandardSource\" FROM public.incident "
+        "WHERE accused_name LIKE '% %' AND details IS NOT NULL AND \"cortlandStandardSource\" IS NOT NULL "
+        "ORDER BY id DESC LIMIT 1"
+    )).one()
+    crime = DBsession.execute(text('SELECT crime FROM public.charges WHERE crime IS NOT NULL LIMIT 1')).scalar()
+    incident_id = DBsession.execute(text('SELECT max(incident_id) FROM public.charges')).scalar()
+
+    return {
+        'name_pattern': f'%{row.accused_name.split()[0]}%{row.accused_name.split()[-1]}%',
+        'details': row.details,
+        'url': row.cortlandStandardSource,
+        'crime': crime,
+        'charged_name': row.accused_name,
+        'incident_id': incident_id,
+    }
+
+
+HOT_QUERIES = {
+    'accused_name ILIKE': 'SELECT id FROM public.incident WHERE accused_name ILIKE :name_pattern',
+    'details dedup': 'SELECT id FROM public.incident WHERE md5(details) = md5(:details) AND details = :details',
+    'incidents for article': 'SELECT id FROM public.incident WHERE "cortlandStandardSource" = :url',
+    'unverified articles': 'SELECT id FROM public.article WHERE incidents_scraped = true AND incidents_verified = false',
+    'charges by crime': 'SELECT id FROM public.charges WHERE crime = :crime',
+    'charges by person': 'SELECT id FROM public.charges WHERE charged_name = :charged_name',
+    'charges for incident': 'SELECT id FROM public.charges WHERE incident_id = :incident_id',
+    'latest incidents': 'SELECT id FROM public.incident ORDER BY incident_reported_date DESC, id DESC LIMIT 50',
+}
+
+
+def explain_analyze(DBsession, query, parameters):
+    plan = DBsession.execute(text('EXPLAIN (ANALYZE, FORMAT JSON) ' + query), parameters).scalar()[0]
+
+    return plan['Plan']['Node Type'], plan['Execution Time']
+
+
+def main(environment='development', without_indexes=False):
+    DBsession, engine = get_database_session(environment=environment)
+    parameters = get_sample(DBsession)
+    if without_indexes:
+        for index_name in HOT_INDEXES:
+            DBsession.execute(text(f'DROP INDEX IF EXISTS public.{index_name}'))
+    try:
+        for name, query in HOT_QUERIES.items():
+            node_type, execution_time = explain_analyze(DBsession, query, parameters)
+            print(f'{name:<24}{node_type:<20}{execution_time:>10.3f} ms')
+    finally:
+        DBsession.rollback()
+        DBsession.close()
+
+    return
+
+
+if __name__ == '__main__':
+    arguments = [argument for argument in sys.argv[1:] if not argument.startswith('--')]
+    main(arguments[0] if arguments else 'development', without_indexes='--without-indexes' in sys.argv)
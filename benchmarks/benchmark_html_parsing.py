@@ -0,0 +1,76 @@
+# parse time of the structured scraper's html handling over stored Cortland Standard articles: the whole page with
+# html.parser and a second parse per <br> fragment, as before, against the stored body_html with the parser
+# article_html picks (lxml when it's installed) and split_at_br_tags.
+#   python -m benchmarks.benchmark_html_parsing [environment] [number of articles]
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+from database import get_database_session
+from models.article import Article
+from police_fire.utilities.article_html import HTML_PARSER, extract_main_body_html, parse_article_body, \
+    split_at_br_tags
+
+
+def parse_full_page(html_content):
+    soup = BeautifulSoup(html_content, 'html.parser')
+    main_body = soup.find('div', class_='main-body')
+    for paragraph in main_body.find_all('p') if main_body else []:
+        for br_tag in str(paragraph).replace('<br>', '<br/>').split('<br/>'):
+            if br_tag.strip() != '':
+                BeautifulSoup(br_tag, 'html.parser').text.strip()
+
+    return soup
+
+
+def parse_body(article):
+    soup = parse_article_body(article)
+    for paragraph in soup.find_all('p'):
+        split_at_br_tags(paragraph)
+
+    return soup
+
+
+def main(environment='dev', limit=200):
+    DBsession, engine = get_database_session(environment=environment)
+    articles = DBsession.query(Article).filter(
+        Article.url.like('https://www.cortlandstandard.com%'),
+        Article.html_content.contains('Accused'),
+    ).order_by(Article.id.desc()).limit(limit).all()
+    # detached, so setting body_html on articles that don't have it yet isn't written back
+    DBsession.expunge_all()
+    DBsession.close()
+    if not articles:
+        print('No stored articles to parse.')
+        return
+
+    start = time.perf_counter()
+    for article in articles:
+        parse_full_page(article.html_content)
+    full_page_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for article in articles:
+        if article.body_html is None:
+            article.body_html = extract_main_body_html(article.html_content)
+    extract_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for article in articles:
+        parse_body(article)
+    body_elapsed = time.perf_counter() - start
+
+    page_size = sum(len(article.html_content) for article in articles) / len(articles)
+    body_size = sum(len(article.body_html or article.html_content) for article in articles) / len(articles)
+    print(f'{len(articles)} articles, {page_size / 1024:,.0f} KB pages, {body_size / 1024:,.1f} KB bodies.')
+    print(f'full page, html.parser:  {full_page_elapsed / len(articles) * 1000:8.2f} ms/article')
+    print(f'extract body_html once:  {extract_elapsed / len(articles) * 1000:8.2f} ms/article')
+    print(f'body_html, {HTML_PARSER + ":":12} {body_elapsed / len(articles) * 1000:8.2f} ms/article '
+          f'({full_page_elapsed / body_elapsed:.1f}x faster)')
+
+    return
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else 'dev', int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -0,0 +1,62 @@
+# cold import time of the Flask app and each CLI entry point, from `python -X importtime`.  Each module is imported
+# in a fresh interpreter; the script exits non-zero if any of them imports a heavy package it shouldn't need until
+# it runs, or takes longer than the budget, so it can gate a build.
+#   python -m benchmarks.benchmark_import_time [budget in seconds]
+import subprocess
+import sys
+
+ENTRY_POINTS = [
+    'flask_app.app',
+    'police_fire.cortland_standard.main',
+    'police_fire.cortland_standard.scrape_charges_from_incidents',
+    'police_fire.cortland_standard.scrape_police_fire_details_from_pdfs',
+    'police_fire.data_normalization.categorize_charges',
+    'police_fire.data_normalization.fix_charge_descriptions_with_misspellings',
+    'police_fire.classification.create_embeddings',
+]
+# loaded on first use by get_openai_client and get_tokenizer_and_model
+LAZY_PACKAGES = ['openai', 'torch', 'transformers']
+DEFAULT_BUDGET_SECONDS = 2.0
+
+
+def get_import_times(module):
+    """Returns {package: cumulative microseconds} for everything module imports, or None if it failed to import."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], capture_output=True,
+                            text=True)
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1])
+        return None
+    import_times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_time, cumulative_time, package = line[len('import time:'):].split('|')
+        import_times[package.strip()] = int(cumulative_time)
+
+    return import_times
+
+
+def main(budget_seconds=DEFAULT_BUDGET_SECONDS):
+    failures = []
+    for module in ENTRY_POINTS:
+        import_times = get_import_times(module)
+        if import_times is None:
+            failures.append(f'{module} failed to import')
+            continue
+        seconds = import_times[module] / 1e6
+        lazy_packages_imported = [package for package in LAZY_PACKAGES if package in import_times]
+        print(f'{module:<72}{seconds:>7.2f}s  {", ".join(lazy_packages_imported)}')
+        if seconds > budget_seconds:
+            failures.append(f'{module} took {seconds:.2f}s to import')
+        if lazy_packages_imported:
+            failures.append(f'{module} imported {", ".join(lazy_packages_imported)}')
+
+    for failure in failures:
+        print(failure)
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_SECONDS))
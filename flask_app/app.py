@@ -1,42 +1,96 @@
 import os
-from datetime import timedelta
+from datetime import date, timedelta
 
-import pandas as pd
-from flask import Flask, render_template, jsonify, redirect, url_for, flash
+from flask import Flask, render_template, jsonify, redirect, url_for, flash, request, abort
 from flask import send_from_directory
-from sqlalchemy import func
+from sqlalchemy import func, tuple_
 
-from database import get_database_session
+from database import get_scoped_session
 from flask_app.forms import VerificationForm, IncidentForm
 from models.article import Article
 from models.charges import Charges
+from models.crime_statistics import crime_counts, crime_counts_by_month, person_charge_totals
 from models.incident import Incident
+from police_fire.analysis.calculate_recidivism_rate import get_offense_timeline_rates
 from police_fire.cortland_voice.scrape_incidents_from_articles import rescrape_article as rescrape_cv_article
+from police_fire.utilities.recidivism import RECIDIVISM_THRESHOLDS
+from police_fire.utilities.utilities import get_person_id
 
-db_session, engine = get_database_session(environment='production')
+# one session per request thread, from a pool shared across requests
+db_session = get_scoped_session(environment='production')
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'mysecretkey'
 
+INCIDENTS_PAGE_SIZE = 50
+MAX_INCIDENTS_PAGE_SIZE = 500
+
+
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    # returns the request's connection to the pool, rolling back anything left uncommitted
+    db_session.remove()
+
 
 @app.route('/')
 def index():
-    incidents = fetch_incidents()  # Fetch incidents data
-    incidents_by_year = get_incidents_by_year(incidents)  # Process data
+    incidents_by_year = get_incidents_by_year()  # counted in the database
     return render_template('index.html', incidents_by_year=incidents_by_year)  # Pass data to template
 
 
 @app.route('/data')
 def data():
+    # from the crime_counts materialized view instead of a DISTINCT over charges, alphabetically
     distinct_crimes = db_session.query(
-        Charges.crime
-    ).distinct().all()
-    # order crimes alphabetically
-    distinct_crimes.sort()
+        crime_counts.c.crime
+    ).distinct().order_by(
+        crime_counts.c.crime.nullsfirst()
+    ).all()
     crimes = [crime[0] for crime in distinct_crimes]  # Extracting crime types
     return jsonify(crimes)
 
 
+def get_crime_counts(period='month', crime=None, category=None):
+    # charges by reported month or year, from the crime_counts_by_month materialized view
+    period_start = crime_counts_by_month.c.month
+    if period == 'year':
+        period_start = func.date_trunc('year', crime_counts_by_month.c.month)
+    period_start = period_start.label('period_start')
+    counts = db_session.query(
+        period_start,
+        crime_counts_by_month.c.crime,
+        crime_counts_by_month.c.category,
+        func.sum(crime_counts_by_month.c.charge_count).label('charge_count'),
+        func.sum(crime_counts_by_month.c.incident_count).label('incident_count')
+    )
+    if crime:
+        counts = counts.filter(crime_counts_by_month.c.crime == crime)
+    if category:
+        counts = counts.filter(crime_counts_by_month.c.category == category)
+
+    return counts.group_by(
+        period_start, crime_counts_by_month.c.crime, crime_counts_by_month.c.category
+    ).order_by(
+        period_start
+    ).all()
+
+
+@app.route('/api/crime_counts')
+def crime_counts_api():
+    # ?period=year&crime=Petit larceny&category=..., all optional; period is month by default
+    period = request.args.get('period', 'month')
+    if period not in ['month', 'year']:
+        abort(400)
+    counts = get_crime_counts(period=period, crime=request.args.get('crime'), category=request.args.get('category'))
+    return jsonify([{
+        period: count.period_start.isoformat()[:7 if period == 'month' else 4],
+        'crime': count.crime,
+        'category': count.category,
+        'charge_count': int(count.charge_count),
+        'incident_count': int(count.incident_count),
+    } for count in counts])
+
+
 def fetch_crimes_by_type(crime_type):
     crimes_by_type = db_session.query(
         Charges
@@ -53,19 +107,97 @@ def show_filtered_crimes(crime_type):
     return render_template('filtered_crimes.html', crimes=filtered_crimes)
 
 
-def fetch_incidents():
-    incidents = db_session.query(Incident).distinct().all()
+def get_incidents_page(before_date=None, before_id=None, page_size=INCIDENTS_PAGE_SIZE):
+    """
+    Keyset pagination over incidents, most recently reported first.  A page is the page_size incidents after the
+    (before_date, before_id) cursor, so every page costs the same index range scan no matter how deep it is.
+    Incidents without a reported date come last.  Returns the incidents and the cursor for the next page.
+    """
+    # dated and undated incidents are paged separately so that both scans can walk ix_incident_reported_date_id
+    incidents = []
+    if before_id is None or before_date is not None:
+        dated_incidents = db_session.query(Incident).filter(
+            Incident.incident_reported_date != None
+        ).order_by(
+            Incident.incident_reported_date.desc(),
+            Incident.id.desc()
+        )
+        if before_id is not None:
+            dated_incidents = dated_incidents.filter(
+                tuple_(Incident.incident_reported_date, Incident.id) < tuple_(before_date, before_id))
+        # one extra row tells us whether there's another page
+        incidents = dated_incidents.limit(page_size + 1).all()
+        before_id = None
+    if len(incidents) <= page_size:
+        undated_incidents = db_session.query(Incident).filter(
+            Incident.incident_reported_date == None
+        ).order_by(
+            Incident.id.desc()
+        )
+        if before_id is not None:
+            undated_incidents = undated_incidents.filter(Incident.id < before_id)
+        incidents += undated_incidents.limit(page_size + 1 - len(incidents)).all()
+
+    if len(incidents) <= page_size:
+        return incidents, None
+    incidents = incidents[:page_size]
+    last_incident = incidents[-1]
+    next_cursor = {
+        'before_date': last_incident.incident_reported_date.isoformat() if last_incident.incident_reported_date
+        else None,
+        'before_id': last_incident.id,
+    }
 
-    # print('incidents: ', incidents)
-    return incidents
+    return incidents, next_cursor
+
+
+def get_page_arguments():
+    try:
+        before_date = request.args.get('before_date')
+        before_date = date.fromisoformat(before_date) if before_date else None
+        before_id = request.args.get('before_id', type=int)
+        page_size = min(request.args.get('page_size', INCIDENTS_PAGE_SIZE, type=int), MAX_INCIDENTS_PAGE_SIZE)
+    except ValueError:
+        abort(400)
+    if page_size < 1:
+        abort(400)
+
+    return before_date, before_id, page_size
+
+
+def incident_to_dict(incident):
+    return {
+        'id': incident.id,
+        'incident_reported_date': incident.incident_reported_date.isoformat() if incident.incident_reported_date
+        else None,
+        'incident_date': incident.incident_date.isoformat() if incident.incident_date else None,
+        'accused_name': incident.accused_name,
+        'accused_age': incident.accused_age,
+        'accused_location': incident.accused_location,
+        'charges': incident.charges,
+        'details': incident.details,
+        'legal_actions': incident.legal_actions,
+        'incident_location': incident.incident_location,
+        'cortlandStandardSource': incident.cortlandStandardSource,
+        'cortlandVoiceSource': incident.cortlandVoiceSource,
+    }
 
 
 @app.route('/incidents')
 def incidents():
-    incidents = fetch_incidents()
-    # order Incidents by reported_date
-    incidents.sort(key=lambda x: x.incident_reported_date, reverse=True)
-    return render_template('incidents.html', incidents=incidents)
+    before_date, before_id, page_size = get_page_arguments()
+    incidents, next_cursor = get_incidents_page(before_date, before_id, page_size)
+    return render_template('incidents.html', incidents=incidents, next_cursor=next_cursor, page_size=page_size)
+
+
+@app.route('/api/incidents')
+def incidents_api():
+    before_date, before_id, page_size = get_page_arguments()
+    incidents, next_cursor = get_incidents_page(before_date, before_id, page_size)
+    return jsonify({
+        'incidents': [incident_to_dict(incident) for incident in incidents],
+        'next': next_cursor,
+    })
 
 
 @app.route('/incidents/<int:incident_id>')
@@ -75,19 +207,19 @@ def incident(incident_id):
 
 
 def get_people():
+    # charges linked to a person are counted under their canonical name, the rest under the name they were charged
+    # as; precomputed in the person_charge_totals materialized view
     people_counts = db_session.query(
-        Charges.charged_name,
-        func.count(Charges.id).label('total_charges'),
-        func.count(Charges.incident_id.distinct()).label('total_incidents')
-    ).group_by(
-        Charges.charged_name
+        person_charge_totals.c.person_name,
+        person_charge_totals.c.total_charges,
+        person_charge_totals.c.total_incidents
     ).order_by(
-        func.count(Charges.id).desc()
+        person_charge_totals.c.total_charges.desc()
     ).all()
 
     # Transform query results into a list of dictionaries for easier handling in the template
     people = [{
-        'name': person.charged_name,
+        'name': person.person_name,
         'total_charges': person.total_charges,
         'total_incidents': person.total_incidents
     } for person in people_counts]
@@ -95,23 +227,31 @@ def get_people():
     return people
 
 
-def get_charges_by_person(person):
-    # lookup the incident date
+def get_charges_by_person(person, start_date=None, end_date=None):
+    # one query for the charges and their incident dates, by person_id for names resolve_people has linked, so every
+    # variant of the name is included, and by charged_name otherwise
+    person_id = get_person_id(db_session, person)
     charges = db_session.query(
-        Charges
+        Charges.id,
+        Charges.incident_id,
+        Charges.charge_description,
+        Charges.crime,
+        Charges.charge_class,
+        Charges.degree,
+        Charges.counts,
+        Incident.incident_reported_date.label('incident_date')
+    ).join(
+        Incident, Incident.id == Charges.incident_id
     ).filter(
-        Charges.charged_name == person
-    ).all()
-
-    for charge in charges:
-        # get the incident date by looking up the incident_id
-        incident = db_session.query(Incident).filter(Incident.id == charge.incident_id).first()
-        charge.incident_date = incident.incident_reported_date
+        Charges.person_id == person_id if person_id is not None else Charges.charged_name == person
+    )
+    if start_date:
+        charges = charges.filter(Incident.incident_reported_date >= start_date)
+    if end_date:
+        charges = charges.filter(Incident.incident_reported_date <= end_date)
 
     # sort charges by incident date
-    charges.sort(key=lambda x: x.incident_date, reverse=True)
-
-    return charges
+    return charges.order_by(Incident.incident_reported_date.desc().nullslast(), Charges.id).all()
 
 
 @app.route('/charges/<string:person_name>')
@@ -120,40 +260,78 @@ def charges(person_name):
     return render_template('charges_for_person.html', person_name=person_name, charges=charges)
 
 
+@app.route('/api/charges/<string:person_name>')
+def charges_api(person_name):
+    try:
+        start_date = request.args.get('start_date')
+        start_date = date.fromisoformat(start_date) if start_date else None
+        end_date = request.args.get('end_date')
+        end_date = date.fromisoformat(end_date) if end_date else None
+    except ValueError:
+        abort(400)
+    charges = get_charges_by_person(person_name, start_date=start_date, end_date=end_date)
+    return jsonify({
+        'person_name': person_name,
+        'charges': [{
+            'id': charge.id,
+            'incident_id': charge.incident_id,
+            'incident_date': charge.incident_date.isoformat() if charge.incident_date else None,
+            'charge_description': charge.charge_description,
+            'crime': charge.crime,
+            'charge_class': charge.charge_class,
+            'degree': charge.degree,
+            'counts': charge.counts,
+        } for charge in charges],
+    })
+
+
 @app.route('/people')
 def people():
     people = get_people()  # Call the function to fetch distinct names
     return render_template('people.html', people=people)
 
 
-def get_incidents_by_year(incidents):
-    incident_data = []
-    for incident in incidents:
-        incident_data.append({
-            'incident_reported_date': incident.incident_reported_date,
-            'id': incident.id
-        })
-
-    # Convert crimes to pandas DataFrame
-    df = pd.DataFrame(incident_data)
-
-    # Ensure 'incident_reported_date' is a datetime type
-    df['incident_reported_date'] = pd.to_datetime(df['incident_reported_date'])
-
-    # Extract year and month for sorting
-    df['year'] = df['incident_reported_date'].dt.year
-
-    # Group by year and count incidents
-    crimes_by_year = df.groupby('year').size().to_dict()
+def get_incidents_by_year():
+    year = func.date_trunc('year', Incident.incident_reported_date).label('year')
+    incident_counts = db_session.query(
+        year,
+        func.count(Incident.id)
+    ).filter(
+        Incident.incident_reported_date != None
+    ).group_by(
+        year
+    ).order_by(
+        year
+    ).all()
 
-    return crimes_by_year
+    return {incident_year.year: count for incident_year, count in incident_counts}
 
 
 @app.route('/api/incidents_by_year')
 def incidents_by_year_api():
-    incidents = fetch_incidents()
-    incidents_by_year = get_incidents_by_year(incidents)
-    return render_template('index.html', incidents_by_year=incidents_by_year)
+    incidents_by_year = get_incidents_by_year()
+    return jsonify({str(year): count for year, count in incidents_by_year.items()})
+
+
+@app.route('/api/recidivism')
+def recidivism_api():
+    # ?threshold=30&threshold=365&start_date=2020-01-01&end_date=2020-12-31, all optional
+    try:
+        thresholds = [int(threshold) for threshold in request.args.getlist('threshold')] or RECIDIVISM_THRESHOLDS
+        start_date = request.args.get('start_date')
+        start_date = date.fromisoformat(start_date) if start_date else None
+        end_date = request.args.get('end_date')
+        end_date = date.fromisoformat(end_date) if end_date else None
+    except ValueError:
+        abort(400)
+    rates, offender_count = get_offense_timeline_rates(db_session, thresholds=thresholds, start_date=start_date,
+                                                       end_date=end_date)
+    return jsonify({
+        'start_date': start_date.isoformat() if start_date else None,
+        'end_date': end_date.isoformat() if end_date else None,
+        'offenders': offender_count,
+        'rates': rates,
+    })
 
 
 @app.route('/verify_incidents')
@@ -235,9 +413,16 @@ def verify_article(article_id):
                         all_associated_incidents.append(existing_incident)
 
     potentially_duplicate_incidents = []
-    # do a query with the first and last name like this: accused_name like '%Chris%Hines%
-    # if there are any results, then the incident is likely a duplicate
-    if len(all_associated_incidents) > 0:
+    # the other incidents of the same person are likely duplicates.  Without a person_id, do a query with the first
+    # and last name like this: accused_name like '%Chris%Hines%
+    if len(all_associated_incidents) > 0 and all_associated_incidents[0].person_id is not None:
+        incidents = db_session.query(Incident).filter(
+            Incident.person_id == all_associated_incidents[0].person_id
+        ).all()
+        for incident in incidents:
+            if incident not in all_associated_incidents:
+                potentially_duplicate_incidents.append(incident)
+    elif len(all_associated_incidents) > 0:
         first_name, last_name = all_associated_incidents[0].accused_name.split()[0], all_associated_incidents[0].accused_name.split()[-1]
         if last_name in ['Jr.', 'Jr', 'Sr.', 'Sr', 'II', 'III', 'IV', 'V']:
             last_name = all_associated_incidents[0].accused_name.split()[-2]
@@ -353,7 +538,7 @@ def rescrape_cortland_voice_article(article_id):
     # Logic to rescrape a Cortland Voice article
     article = db_session.query(Article).filter(Article.id == article_id).first()
     print('rescraping article: ', article.url)
-    rescrape_cv_article(article.url)
+    rescrape_cv_article(article.url, DBsession=db_session)
     return redirect(url_for('verify_article', article_id=article_id))
 
 
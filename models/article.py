@@ -1,11 +1,15 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean
+from sqlalchemy import Column, Integer, String, Date, Boolean, Index
 
 from base import Base
 
 
 class Article(Base):
     __tablename__ = 'article'
-    __table_args__ = {'schema': 'public'}
+    __table_args__ = (
+        # articles left to scrape or verify
+        Index('ix_article_incidents_scraped_verified', 'incidents_scraped', 'incidents_verified'),
+        {'schema': 'public'}
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     headline = Column(String)
@@ -16,6 +20,8 @@ class Article(Base):
     url = Column(String, unique=True)
     content = Column(String)
     html_content = Column(String)
+    # the div.main-body of html_content, '' if it has none; see police_fire/utilities/article_html.py
+    body_html = Column(String)
 
     incidents_scraped = Column(Boolean, default=False)
     incidents_verified = Column(Boolean, default=False)
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+
+from base import Base
+
+
+class ChargeNameCluster(Base):
+    __tablename__ = 'charge_name_cluster'
+    __table_args__ = (
+        Index('ix_charge_name_cluster_canonical_crime', 'canonical_crime'),
+        {'schema': 'public'}
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    crime = Column(String, unique=True)
+    # the most common crime of the cluster when it was made; canonical crimes are their own canonical_crime
+    canonical_crime = Column(String)
+    similarity = Column(Integer)
+    created_at = Column(DateTime)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
 from sqlalchemy.orm import declarative_base
 
 from base import Base
@@ -6,7 +6,14 @@ from base import Base
 
 class Charges(Base):
     __tablename__ = 'charges'
-    __table_args__ = {'schema': 'public'}
+    __table_args__ = (
+        # a person's charge history on /charges/<person_name>
+        Index('ix_charges_charged_name', 'charged_name'),
+        Index('ix_charges_crime', 'crime'),
+        Index('ix_charges_incident_id', 'incident_id'),
+        Index('ix_charges_person_id', 'person_id'),
+        {'schema': 'public'}
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     charge_description = Column(String)
@@ -18,6 +25,8 @@ class Charges(Base):
     counts = Column(Integer, nullable=True)
 
     incident_id = Column(Integer, ForeignKey('public.incident.id'))
+    # the charged_name's person; set by police_fire/data_normalization/resolve_people.py
+    person_id = Column(Integer, ForeignKey('public.person.id'), nullable=True)
 
     def __str__(self):
         return f'{self.charged_name}, {self.charge_description}, {self.charge_class}, {self.degree}, {self.counts}, {self.incident_id}'
@@ -4,12 +4,16 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from base import Base
-from database import get_database_session
+from database import create_tables
 from models.article import Article
+from models.charge_name_cluster import ChargeNameCluster
 from models.charges import Charges
+from models.geocode_cache import GeocodeCache
 from models.incident import Incident
 from models.incidents_with_errors import IncidentsWithErrors
+from models.offense_timeline import OffenseTimeline
+from models.person import Person
+from models.person_name import PersonName
 
 if __name__ == "__main__":
-    DBsession, engine = get_database_session(environment='test')
-    Base.metadata.create_all(engine)
+    create_tables(environment='test')
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, Date, MetaData, Table
+from sqlalchemy.dialects.postgresql import ARRAY
+
+# materialized views made by alembic/versions/e9c4a7d2b5f8_add_crime_statistics_views.py and refreshed by
+# police_fire/analysis/crime_statistics.py.  They're on their own MetaData, not Base's, so create_all and alembic
+# autogenerate don't take them for tables.
+view_metadata = MetaData(schema='public')
+
+# charges by crime and category
+crime_counts = Table(
+    'crime_counts', view_metadata,
+    Column('crime', String),
+    Column('category', String),
+    Column('charge_count', Integer),
+    Column('incident_count', Integer),
+)
+
+# charges by the month their incident was reported, crime and category
+crime_counts_by_month = Table(
+    'crime_counts_by_month', view_metadata,
+    Column('month', Date),
+    Column('crime', String),
+    Column('category', String),
+    Column('charge_count', Integer),
+    Column('incident_count', Integer),
+)
+
+# charges by person, under their canonical name once resolve_people has linked them
+person_charge_totals = Table(
+    'person_charge_totals', view_metadata,
+    Column('person_name', String),
+    Column('total_charges', Integer),
+    Column('total_incidents', Integer),
+    Column('distinct_crime_count', Integer),
+    Column('distinct_crimes', ARRAY(String)),
+)
+
+MATERIALIZED_VIEWS = [crime_counts, crime_counts_by_month, person_charge_totals]
@@ -0,0 +1,15 @@
+import hashlib
+
+
+# incident.details_fingerprint: the md5 of the details with whitespace, curly apostrophes and case normalized, so
+# rescrapes of the same incident land in the same police_fire.utilities.incident_dedup block
+def normalize_details(details):
+    return ' '.join(details.replace('’', "'").split()).lower()
+
+
+def get_details_fingerprint(details):
+    normalized_details = normalize_details(details or '')
+    if not normalized_details:
+        return None
+
+    return hashlib.md5(normalized_details.encode('utf-8')).hexdigest()
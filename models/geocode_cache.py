@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime
+
+from base import Base
+
+
+class GeocodeCache(Base):
+    __tablename__ = 'geocode_cache'
+    __table_args__ = {'schema': 'public'}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    normalized_address = Column(String, unique=True)
+    address = Column(String)
+    # lat/lng are null for addresses the geocoder couldn't find (negative results)
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    status = Column(String)
+    updated_at = Column(DateTime)
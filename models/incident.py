@@ -1,12 +1,25 @@
-from sqlalchemy import Column, Integer, String, Date
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, DDL, and_, event, func
 from sqlalchemy.orm import declarative_base
 
 from base import Base
+from models.details_fingerprint import get_details_fingerprint
 
 
 class Incident(Base):
     __tablename__ = 'incident'
-    __table_args__ = {'schema': 'public'}
+    __table_args__ = (
+        # keyset pagination of /incidents, most recently reported first
+        Index('ix_incident_reported_date_id', 'incident_reported_date', 'id'),
+        # accused_name ILIKE '%first%last%' in filter_incidents and verify_article
+        Index('ix_incident_accused_name_trgm', 'accused_name', postgresql_using='gin',
+              postgresql_ops={'accused_name': 'gin_trgm_ops'}),
+        Index('ix_incident_cortland_standard_source', 'cortlandStandardSource'),
+        Index('ix_incident_cortland_voice_source', 'cortlandVoiceSource'),
+        # duplicate detection in fix_database_duplicates
+        Index('ix_incident_details_fingerprint', 'details_fingerprint'),
+        Index('ix_incident_person_id', 'person_id'),
+        {'schema': 'public'}
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     incident_reported_date = Column(Date)
@@ -26,5 +39,40 @@ class Incident(Base):
     cortlandStandardSource = Column(String)
     cortlandVoiceSource = Column(String)
 
+    # when charges were last extracted into the charges table, and the md5 of the spellchecked_charges they came
+    # from.  Incidents whose spellchecked_charges no longer match the hash have their charges re-extracted.
+    charges_extracted_at = Column(DateTime, nullable=True)
+    charges_extracted_hash = Column(String, nullable=True)
+
+    # md5 of the whitespace- and case-normalized details, see police_fire/utilities/incident_dedup.py
+    details_fingerprint = Column(String, nullable=True)
+
+    # the accused, for incidents with one; set by police_fire/data_normalization/resolve_people.py
+    person_id = Column(Integer, ForeignKey('public.person.id'), nullable=True)
+
     def __str__(self):
         return f'{self.incident_reported_date} - {self.accused_name} - {self.accused_age} - {self.accused_location} - {self.charges} - {self.details} - {self.legal_actions} - {self.incident_date}'
+
+
+# dedup on details.  details can be longer than a btree entry allows, so the index is on their hash
+Index('ix_incident_details_md5', func.md5(Incident.details), postgresql_using='hash')
+
+# incidents whose charges haven't been extracted, or whose spellchecked_charges changed since.  The partial index only
+# holds those incidents, so scrape_charges_from_incidents, which filters on exactly this predicate, reads the index
+# instead of hashing every incident's spellchecked_charges
+CHARGES_TO_EXTRACT = and_(
+    Incident.cortlandStandardSource.isnot(None),
+    Incident.spellchecked_charges.isnot(None),
+    Incident.charges_extracted_hash.is_distinct_from(func.md5(Incident.spellchecked_charges)),
+)
+Index('ix_incident_charges_to_extract', Incident.id, postgresql_where=CHARGES_TO_EXTRACT)
+
+
+@event.listens_for(Incident, 'before_insert')
+@event.listens_for(Incident, 'before_update')
+def set_details_fingerprint(mapper, connection, incident):
+    incident.details_fingerprint = get_details_fingerprint(incident.details)
+
+
+# ix_incident_accused_name_trgm needs pg_trgm when the tables are made with create_all instead of alembic
+event.listen(Incident.__table__, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
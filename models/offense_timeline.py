@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Date, Index
+
+from base import Base
+
+
+# one row per incident of an offender, with the days to their next incident; see police_fire/utilities/recidivism.py.
+# Refreshed by police_fire/analysis/calculate_recidivism_rate.py.  incident_id has no foreign key so incidents deleted
+# by fix_database_duplicates leave rows behind that mark their offender as changed.
+class OffenseTimeline(Base):
+    __tablename__ = 'offense_timeline'
+    __table_args__ = (
+        Index('ix_offense_timeline_offender_key', 'offender_key'),
+        Index('ix_offense_timeline_incident_date', 'incident_date'),
+        {'schema': 'public'}
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    incident_id = Column(Integer, unique=True)
+    offender_key = Column(String)
+    # incident_date, or incident_reported_date when it's missing
+    incident_date = Column(Date)
+    days_to_next = Column(Integer, nullable=True)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+
+from base import Base
+
+
+# one person, however their name was written; see police_fire/utilities/person_names.py
+class Person(Base):
+    __tablename__ = 'person'
+    __table_args__ = (
+        Index('ix_person_last_name_first_name', 'last_name', 'first_name'),
+        {'schema': 'public'}
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    canonical_name = Column(String)
+    first_name = Column(String)
+    middle_name = Column(String, nullable=True)
+    last_name = Column(String)
+    suffix = Column(String, nullable=True)
+    created_at = Column(DateTime)
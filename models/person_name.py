@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+
+from base import Base
+
+
+# an accused_name or charged_name, exactly as it was scraped, and the person it was resolved to
+class PersonName(Base):
+    __tablename__ = 'person_name'
+    __table_args__ = (
+        Index('ix_person_name_person_id', 'person_id'),
+        {'schema': 'public'}
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, unique=True)
+    person_id = Column(Integer, ForeignKey('public.person.id'))
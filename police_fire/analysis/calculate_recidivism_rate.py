@@ -1,35 +1,96 @@
-import pandas as pd
-from sqlalchemy import text
+# refreshes offense_timeline and prints recidivism rates.  Only the offenders with an incident that is new, deleted,
+# re-dated or linked to a different person since the last run have their timelines rewritten; see
+# police_fire/utilities/recidivism.py.  The same rates are served as JSON by /api/recidivism.
+#   python -m police_fire.analysis.calculate_recidivism_rate [--rebuild]
+import sys
+
 from database import get_database_session
+from models.incident import Incident
+from models.offense_timeline import OffenseTimeline
+from police_fire.utilities.recidivism import RECIDIVISM_THRESHOLDS, get_min_gaps, get_offender_key, \
+    get_recidivism_rates, get_timeline
+
+CHUNK_SIZE = 1000
+
+
+def get_offender_incidents(DBsession):
+    """{incident_id: (offender_key, incident_date)} for every incident with an offender and a date."""
+    offender_incidents = {}
+    for incident_id, person_id, accused_name, incident_date, incident_reported_date in DBsession.query(
+            Incident.id, Incident.person_id, Incident.accused_name, Incident.incident_date,
+            Incident.incident_reported_date):
+        offender_key = get_offender_key(person_id, accused_name)
+        incident_date = incident_date or incident_reported_date
+        if offender_key is not None and incident_date is not None:
+            offender_incidents[incident_id] = (offender_key, incident_date)
+
+    return offender_incidents
+
+
+def refresh_offense_timeline(DBsession, rebuild=False):
+    """Rewrites the timelines of the offenders whose incidents changed, or every timeline with rebuild."""
+    try:
+        if rebuild:
+            DBsession.query(OffenseTimeline).delete(synchronize_session=False)
+        offender_incidents = get_offender_incidents(DBsession)
+        saved_incidents = {incident_id: (offender_key, incident_date) for incident_id, offender_key, incident_date
+                           in DBsession.query(OffenseTimeline.incident_id, OffenseTimeline.offender_key,
+                                              OffenseTimeline.incident_date)}
+        changed = set(offender_incidents.items()) ^ set(saved_incidents.items())
+        changed_offender_keys = sorted({offender_key for incident_id, (offender_key, incident_date) in changed})
 
-dbSession, engine = get_database_session(environment='prod')
+        incidents_by_offender = {}
+        for incident_id, (offender_key, incident_date) in offender_incidents.items():
+            incidents_by_offender.setdefault(offender_key, []).append((incident_id, incident_date))
+        # every changed timeline is deleted before any is written, since an incident linked to a different person
+        # moves from one offender to the other
+        for start in range(0, len(changed_offender_keys), CHUNK_SIZE):
+            DBsession.query(OffenseTimeline).filter(
+                OffenseTimeline.offender_key.in_(changed_offender_keys[start:start + CHUNK_SIZE])
+            ).delete(synchronize_session=False)
+        for start in range(0, len(changed_offender_keys), CHUNK_SIZE):
+            offender_keys = changed_offender_keys[start:start + CHUNK_SIZE]
+            DBsession.add_all([
+                OffenseTimeline(incident_id=incident_id, offender_key=offender_key, incident_date=incident_date,
+                                days_to_next=days_to_next)
+                for offender_key in offender_keys if offender_key in incidents_by_offender
+                for incident_id, incident_date, days_to_next in get_timeline(incidents_by_offender[offender_key])
+            ])
+            DBsession.flush()
+        DBsession.commit()
+    except Exception:
+        DBsession.rollback()
+        raise
+    print(f'{len(incidents_by_offender)} offenders, {len(changed_offender_keys)} timelines refreshed.')
 
-# Get persons incidents by querying the combined_incidents view
-sql = text("SELECT accused_name, incident_date, source FROM public.incident ORDER BY incident_date ASC;")
-result = dbSession.execute(sql)
-persons_incidents = result.fetchall()
+    return changed_offender_keys
 
-# Assuming persons_incidents is a list of tuples (accused_name, incident_date, source)
-df = pd.DataFrame(persons_incidents, columns=['accused_name', 'incident_date', 'source'])
 
-# Convert incident_date to datetime if it's not already
-df['incident_date'] = pd.to_datetime(df['incident_date'])
+def get_offense_timeline_rates(DBsession, thresholds=RECIDIVISM_THRESHOLDS, start_date=None, end_date=None):
+    """Recidivism rates from offense_timeline, for the incidents between start_date and end_date."""
+    timeline_rows = DBsession.query(OffenseTimeline.offender_key, OffenseTimeline.incident_date,
+                                    OffenseTimeline.days_to_next)
+    if start_date:
+        timeline_rows = timeline_rows.filter(OffenseTimeline.incident_date >= start_date)
+    if end_date:
+        timeline_rows = timeline_rows.filter(OffenseTimeline.incident_date <= end_date)
+    sorted_gaps, offender_count = get_min_gaps(timeline_rows)
 
-# Identifying repeat offenders
-repeat_offenders = df[df.duplicated(subset=['accused_name'], keep=False)].copy()
+    return get_recidivism_rates(sorted_gaps, offender_count, thresholds), offender_count
 
-# Calculate the next incident date and days to next incident for repeat offenders
-repeat_offenders['next_incident'] = repeat_offenders.groupby('accused_name')['incident_date'].shift(-1)
-repeat_offenders['days_to_next'] = (repeat_offenders['next_incident'] - repeat_offenders['incident_date']).dt.days
 
-total_unique_offenders = len(df['accused_name'].unique())
+def main(environment='prod', rebuild=False):
+    DBsession, engine = get_database_session(environment=environment)
+    refresh_offense_timeline(DBsession, rebuild=rebuild)
+    rates, offender_count = get_offense_timeline_rates(DBsession)
+    print(f'{offender_count} unique offenders')
+    for rate in rates:
+        print(f"Threshold: {rate['threshold']} days, Recidivism Rate: {rate['rate']:.2f}, "
+              f"Unique Re-offenders Count: {rate['reoffenders']}")
+    DBsession.close()
 
-thresholds = [30, 60, 180, 365, 1000, 10000]
-for threshold in thresholds:
-    filtered_df = repeat_offenders[repeat_offenders['days_to_next'] <= threshold]
+    return
 
-    # Ensure each offender is counted only once for each threshold
-    unique_offenders_within_threshold = filtered_df['accused_name'].nunique()
 
-    recidivism_rate_within_threshold = unique_offenders_within_threshold / total_unique_offenders
-    print(f"Threshold: {threshold} days, Recidivism Rate: {recidivism_rate_within_threshold:.2f}, Unique Re-offenders Count: {unique_offenders_within_threshold}")
+if __name__ == '__main__':
+    main(rebuild='--rebuild' in sys.argv)
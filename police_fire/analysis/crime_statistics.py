@@ -0,0 +1,41 @@
+# refreshes the crime statistics materialized views in models/crime_statistics.py.  They're refreshed concurrently, so
+# the Flask dashboard keeps reading the old rows while the new ones are computed, at the end of each ingest run in
+# police_fire/cortland_standard/main.py.  Views the database doesn't have yet are skipped.
+#   python -m police_fire.analysis.crime_statistics
+import time
+
+from sqlalchemy import text
+
+from database import get_database_session
+from models.crime_statistics import MATERIALIZED_VIEWS
+
+
+def refresh_materialized_views(DBsession):
+    for view in MATERIALIZED_VIEWS:
+        # the views are made by alembic, not create_all, so a dev or test database may not have them
+        if DBsession.execute(text('SELECT to_regclass(:name)'), {'name': view.fullname}).scalar() is None:
+            print(f'{view.fullname} does not exist.  Run alembic upgrade head to create it.  Skipping.')
+            continue
+
+        start = time.perf_counter()
+        try:
+            DBsession.execute(text(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {view.fullname}'))
+            DBsession.commit()
+        except Exception:
+            DBsession.rollback()
+            raise
+        print(f'Refreshed {view.fullname} in {time.perf_counter() - start:.2f}s.')
+
+    return
+
+
+def main(environment='prod'):
+    DBsession, engine = get_database_session(environment=environment)
+    refresh_materialized_views(DBsession)
+    DBsession.close()
+
+    return
+
+
+if __name__ == '__main__':
+    main()
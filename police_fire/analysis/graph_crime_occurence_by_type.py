@@ -1,16 +1,25 @@
-from pprint import pprint
+from sqlalchemy import func
 
 from database import get_database_session
-from models.charges import Charges
-DBsession, engine = get_database_session(environment='prod')
+from models.crime_statistics import crime_counts
 
-from sqlalchemy import func
 
-crime_counts_with_ids = DBsession.query(
-    Charges.crime,
-    func.count(Charges.crime).label('total'),
-    func.array_agg(Charges.incident_id).label('incident_ids')  # This aggregates the IDs into an array
-).group_by(Charges.crime).order_by(func.count(Charges.crime).desc()).all()
+def main(environment='prod'):
+    DBsession, engine = get_database_session(environment=environment)
+
+    # precomputed in the crime_counts materialized view instead of an array_agg over every charge.  The view counts
+    # by crime and category, so a crime filed under more than one category is summed back into one row
+    total = func.sum(crime_counts.c.charge_count)
+    crime_counts_by_type = DBsession.query(
+        crime_counts.c.crime,
+        total.label('total'),
+        func.sum(crime_counts.c.incident_count).label('incident_count')
+    ).group_by(crime_counts.c.crime).order_by(total.desc()).all()
+    DBsession.close()
+
+    for crime_count in crime_counts_by_type:
+        print(f'{crime_count.crime}, {crime_count.total}, {crime_count.incident_count}')
+
 
-for crime_count in crime_counts_with_ids:
-    print(f'{crime_count.crime}, {crime_count.total}, {crime_count.incident_ids}')
\ No newline at end of file
+if __name__ == '__main__':
+    main()
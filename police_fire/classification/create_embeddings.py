@@ -1,18 +1,27 @@
 import csv
 
-from transformers import AutoTokenizer, AutoModel
-import torch
-
 import numpy as np
 
 from database import get_database_session
 from models.incident import Incident
 
-tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
-model = AutoModel.from_pretrained("bert-base-uncased")
+_tokenizer = None
+_model = None
+
+
+def get_tokenizer_and_model():
+    # transformers and torch take seconds to import and bert-base-uncased longer to load, so both wait for first use
+    global _tokenizer, _model
+    if _model is None:
+        from transformers import AutoTokenizer, AutoModel
+        _tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
+        _model = AutoModel.from_pretrained("bert-base-uncased")
+
+    return _tokenizer, _model
 
 
 def get_embeddings(text):
+    tokenizer, model = get_tokenizer_and_model()
     inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True)
     outputs = model(**inputs)
     embeddings = outputs.last_hidden_state.mean(dim=1).squeeze(1).detach().numpy()
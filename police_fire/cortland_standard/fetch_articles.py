@@ -0,0 +1,67 @@
+# concurrent article fetcher used for backfills.  Each url is downloaded exactly once with the cookies of the
+# logged-in requests session; requests are limited per host by a token bucket and by a bound on concurrency.
+import asyncio
+from urllib.parse import urlparse
+
+import httpx
+
+from police_fire.utilities.rate_limiting import TokenBucket
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_BURST = 4
+MAX_ATTEMPTS = 3
+
+
+async def fetch_url(client, url, semaphore, rate_limiters, requests_per_second, burst):
+    host = urlparse(url).netloc
+    if host not in rate_limiters:
+        rate_limiters[host] = TokenBucket(rate=requests_per_second, capacity=burst)
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        async with semaphore:
+            await rate_limiters[host].acquire()
+            try:
+                response = await client.get(url)
+            except httpx.TransportError as e:
+                print(f'Error fetching {url} (attempt {attempt}): {e}')
+                response = None
+        if response is not None and response.status_code < 500 and response.status_code != 429:
+            if response.status_code != 200:
+                print(f'{url} returned {response.status_code}.')
+                return url, None
+            return url, response.content
+        # back off before retrying server errors and rate limiting
+        await asyncio.sleep(2 ** attempt)
+
+    print(f'Giving up on {url} after {MAX_ATTEMPTS} attempts.')
+    return url, None
+
+
+async def fetch_urls_async(urls, cookies=None, headers=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                           requests_per_second=DEFAULT_REQUESTS_PER_SECOND, burst=DEFAULT_BURST):
+    semaphore = asyncio.Semaphore(max_concurrency)
+    rate_limiters = {}
+    async with httpx.AsyncClient(cookies=cookies, headers=headers, follow_redirects=True, timeout=30) as client:
+        results = await asyncio.gather(*[
+            fetch_url(client, url, semaphore, rate_limiters, requests_per_second, burst)
+            for url in dict.fromkeys(urls)
+        ])
+
+    return dict(results)
+
+
+def fetch_articles(urls, logged_in_session, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                   requests_per_second=DEFAULT_REQUESTS_PER_SECOND, burst=DEFAULT_BURST):
+    """
+    Downloads every url once, reusing the cookie jar and headers from login().
+    Returns a dict of url -> response bytes (None for urls that couldn't be fetched).
+    """
+    return asyncio.run(fetch_urls_async(
+        urls,
+        cookies=logged_in_session.cookies,
+        headers=dict(logged_in_session.headers),
+        max_concurrency=max_concurrency,
+        requests_per_second=requests_per_second,
+        burst=burst,
+    ))
@@ -0,0 +1,192 @@
+# streaming ingest of unscraped articles: select -> parse -> enrich -> persist.
+# select streams articles off a server-side cursor with its own session, and parse builds the BeautifulSoup trees
+# in a second thread; both hand off through bounded queues so at most a few dozen articles are in memory at once,
+# however large the archive gets.  enrich (LLM calls, date resolution and geocoding) and persist share the write
+# session, so they run in the calling thread.
+import queue
+import threading
+
+from sqlalchemy.orm import defer, sessionmaker
+
+from models.article import Article
+from police_fire.cortland_standard.scrape_structured_police_fire_details import parse_article_html_content, \
+    scrape_structured_incident_details_into_writer
+from police_fire.cortland_standard.scrape_unstructured_police_fire_details import \
+    scrape_unstructured_incident_details_into_writer, add_extracted_incidents_to_writer
+from police_fire.utilities.batched_extraction import MAX_BATCH_ARTICLES, extract_incidents, print_extraction_stats
+from police_fire.utilities.incident_writer import IncidentWriter
+
+SELECT_BATCH_SIZE = 100
+QUEUE_SIZE = 16
+CORTLAND_STANDARD_URL_PREFIX = 'https://www.cortlandstandard.com%'
+
+# marks the end of a stage's output
+END_OF_STAGE = object()
+
+
+def select_unscraped_articles(DBsession, url_prefix=CORTLAND_STANDARD_URL_PREFIX, batch_size=SELECT_BATCH_SIZE):
+    """
+    Yields unscraped articles, most recent first, detached from DBsession so they can be garbage collected.
+    html_content is only loaded for articles without a body_html to parse instead.
+    """
+    articles = DBsession.query(Article).options(defer(Article.html_content)).filter(
+        Article.url.like(url_prefix),
+        Article.incidents_scraped.isnot(True),
+    ).order_by(Article.date_published.desc(), Article.id).yield_per(batch_size)
+    for article in articles:
+        if not article.body_html:
+            # a deferred column can't be loaded once the article is detached
+            article.html_content
+        DBsession.expunge(article)
+        yield article
+
+    return
+
+
+def count_unscraped_articles(DBsession, url_prefix=CORTLAND_STANDARD_URL_PREFIX):
+    return DBsession.query(Article.id).filter(
+        Article.url.like(url_prefix),
+        Article.incidents_scraped.isnot(True),
+    ).count()
+
+
+def put(output_queue, item, stop):
+    # gives up if the consumer has stopped, instead of blocking forever on a full queue
+    while not stop.is_set():
+        try:
+            output_queue.put(item, timeout=1)
+            return True
+        except queue.Full:
+            continue
+
+    return False
+
+
+def select_stage(engine, output_queue, stop, url_prefix, batch_size):
+    select_session = sessionmaker(bind=engine)()
+    try:
+        for article in select_unscraped_articles(select_session, url_prefix=url_prefix, batch_size=batch_size):
+            if not put(output_queue, article, stop):
+                return
+    except Exception as e:
+        put(output_queue, e, stop)
+    finally:
+        select_session.close()
+        put(output_queue, END_OF_STAGE, stop)
+
+    return
+
+
+def parse_stage(input_queue, output_queue, stop):
+    while not stop.is_set():
+        try:
+            article = input_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+        if article is END_OF_STAGE or isinstance(article, Exception):
+            put(output_queue, article, stop)
+            return
+        try:
+            soup = parse_article_html_content(article) if article.body_html or article.html_content else None
+        except Exception as e:
+            print(f'Could not parse {article.url}: {e}')
+            soup = None
+        put(output_queue, (article, soup), stop)
+
+    return
+
+
+def enrich_article(article, soup, DBsession, writer):
+    """Runs both scrapers into writer.  Nothing is written until the article is persisted."""
+    print(article.url)
+    if soup is not None:
+        scrape_structured_incident_details_into_writer(article, DBsession, writer, soup=soup)
+    scrape_unstructured_incident_details_into_writer(article, writer)
+    writer.mark_article_scraped(article.id)
+
+    return
+
+
+def enrich_articles_batched(items, DBsession, writer, get_responses=None):
+    """
+    Like enrich_article for several articles at once, with the unstructured incidents of all of them extracted in
+    batched requests.  Articles whose extraction fails are persisted without being marked scraped, so the next run
+    scrapes them again.
+    """
+    extracted, failed = extract_incidents([article for article, soup in items], get_responses=get_responses)
+    for article, soup in items:
+        print(article.url)
+        try:
+            if soup is not None:
+                # the batch already extracts the unstructured incidents, so there's no per-article fallback
+                scrape_structured_incident_details_into_writer(article, DBsession, writer, soup=soup,
+                                                               unstructured_fallback=False)
+            if article.id in extracted:
+                add_extracted_incidents_to_writer(article, extracted[article.id], writer)
+                writer.mark_article_scraped(article.id)
+            else:
+                print(f'Could not extract incidents from {article.url}.  It will be scraped again next run.')
+        except Exception:
+            writer.rollback()
+            raise
+        # persist
+        writer.finish_article()
+
+    return len(items)
+
+
+def run_ingest_pipeline(DBsession, engine, url_prefix=CORTLAND_STANDARD_URL_PREFIX, batch_size=SELECT_BATCH_SIZE,
+                        queue_size=QUEUE_SIZE, commit_every=1, extraction_batch_size=MAX_BATCH_ARTICLES,
+                        get_responses=None):
+    # with an extraction_batch_size of 1, each article's incidents are extracted with a request of its own
+    selected_articles = queue.Queue(maxsize=queue_size)
+    parsed_articles = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    stages = [
+        threading.Thread(target=select_stage, args=(engine, selected_articles, stop, url_prefix, batch_size),
+                         daemon=True),
+        threading.Thread(target=parse_stage, args=(selected_articles, parsed_articles, stop), daemon=True),
+    ]
+    for stage in stages:
+        stage.start()
+
+    writer = IncidentWriter(DBsession, commit_every=commit_every)
+    articles_scraped = 0
+    pending_items = []
+    try:
+        while True:
+            item = parsed_articles.get()
+            if item is END_OF_STAGE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            if extraction_batch_size > 1:
+                pending_items.append(item)
+                if len(pending_items) >= extraction_batch_size:
+                    articles_scraped += enrich_articles_batched(pending_items, DBsession, writer,
+                                                                get_responses=get_responses)
+                    pending_items = []
+                continue
+            article, soup = item
+            try:
+                enrich_article(article, soup, DBsession, writer)
+            except Exception:
+                writer.rollback()
+                raise
+            # persist
+            writer.finish_article()
+            articles_scraped += 1
+        if pending_items:
+            articles_scraped += enrich_articles_batched(pending_items, DBsession, writer, get_responses=get_responses)
+        writer.commit()
+    finally:
+        stop.set()
+        for stage in stages:
+            stage.join(timeout=5)
+
+    print(f'{articles_scraped} articles scraped.')
+    writer.print_stats()
+    if extraction_batch_size > 1:
+        print_extraction_stats()
+
+    return articles_scraped
@@ -1,37 +1,36 @@
-from tqdm import tqdm
-
-from police_fire.cortland_standard import scrape_unstructured_police_fire_details, scrape_structured_police_fire_details
 from database import get_database_session
-from models.article import Article
+from police_fire.analysis.calculate_recidivism_rate import refresh_offense_timeline
+from police_fire.analysis.crime_statistics import refresh_materialized_views
+from police_fire.cortland_standard.ingest_pipeline import count_unscraped_articles, run_ingest_pipeline
 
-from police_fire.cortland_standard.scrape_articles_by_section import main as scrape_articles_by_section
+from police_fire.cortland_standard.scrape_articles_by_section import backfill_article_body_html, \
+    main as scrape_articles_by_section
 from police_fire.cortland_standard.scrape_charges_from_incidents import main as scrape_charges_from_incidents
 from police_fire.data_normalization.fix_charge_descriptions_with_misspellings import spellcheck_charges
 from police_fire.data_normalization.categorize_charges import main as categorize_charges
+from police_fire.data_normalization.resolve_people import main as resolve_people
+from police_fire.utilities import llm_cache
 
 
 def main(environment='dev'):
     scrape_articles_by_section(max_pages=1, environment=environment)
     database_session, engine = get_database_session(environment=environment)
-    # get articles by date_published descending, and filter out articles that have already had incidents scraped
-    articles = database_session.query(Article).filter(Article.url.like('https://www.cortlandstandard.com%')).all()
-    articles_with_incidents_not_scraped = [article for article in articles if not article.incidents_scraped]
-    # sort by date_published descending
-    articles_with_incidents_not_scraped.sort(key=lambda x: x.date_published, reverse=True)
-    print(f'{len(articles_with_incidents_not_scraped)} unscraped articles found.')
-    for article in tqdm(articles_with_incidents_not_scraped, desc='Scraping incidents from article content.'):
-        print(article.url)
-        scrape_structured_police_fire_details.scrape_structured_incident_details(article, database_session)
-        scrape_unstructured_police_fire_details.scrape_unstructured_incident_details(
-            article,
-            database_session
-        )
-        article.incidents_scraped = True
-        database_session.commit()
-
-    spellcheck_charges(source='cortlandStandard')
-    scrape_charges_from_incidents()
-    categorize_charges()
+    # only articles saved before body_html existed; new ones get it when they're scraped
+    backfill_article_body_html(database_session)
+    # articles are streamed from the database most recent first, instead of loading the whole archive
+    print(f'{count_unscraped_articles(database_session)} unscraped articles found.')
+    run_ingest_pipeline(database_session, engine)
+
+    spellcheck_charges(source='cortlandStandard', environment=environment)
+    scrape_charges_from_incidents(environment=environment)
+    categorize_charges(environment=environment)
+    # only the names that are new since the last run are resolved
+    resolve_people(environment=environment)
+    # after resolve_people, so incidents newly linked to a person move to their timeline
+    refresh_offense_timeline(database_session)
+    # last, so the dashboard's counts include everything this run added
+    refresh_materialized_views(database_session)
+    llm_cache.print_cache_stats()
 
     return
 
@@ -0,0 +1,100 @@
+# OCR stage for the e-edition PDFs.  Kept free of database imports so that the worker processes can import it
+# cheaply.  Pages are rasterized straight from the source PDF and their text is cached next to it under a name
+# that includes a hash of the PDF's contents, so a re-run never OCRs the same page twice.
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytesseract
+from pdf2image import convert_from_path
+
+TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+POPPLER_PATH = r'C:\Users\Nick\Downloads\Release-23.11.0-0\poppler-23.11.0\Library\bin'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+ocr_stats = {'pages_ocred': 0, 'pages_from_cache': 0, 'ocr_seconds': 0.0}
+
+
+def get_pdf_hash(pdf_path):
+    pdf_hash = hashlib.md5()
+    with open(pdf_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            pdf_hash.update(chunk)
+
+    return pdf_hash.hexdigest()
+
+
+def get_page_text_path(pages_path, pdf_hash, newspaper_page_number):
+    return os.path.join(pages_path, f'police_fire_page_{newspaper_page_number}_{pdf_hash[:16]}.txt')
+
+
+def ocr_page(pdf_path, newspaper_page_number):
+    """Returns the text of a zero-indexed page of the PDF, or None if the PDF doesn't have that page."""
+    pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    # pdftoppm pages are one-indexed
+    page_images = convert_from_path(pdf_path, first_page=newspaper_page_number + 1,
+                                    last_page=newspaper_page_number + 1, poppler_path=POPPLER_PATH)
+    if not page_images:
+        return None
+
+    return pytesseract.pytesseract.image_to_string(page_images[0])
+
+
+def ocr_page_to_cache(pdf_path, newspaper_page_number, page_text_path, ocr_function=ocr_page):
+    txt = ocr_function(pdf_path, newspaper_page_number)
+    if txt is not None:
+        with open(page_text_path, 'w', encoding='utf-8') as f:
+            f.write(txt)
+
+    return txt
+
+
+def ocr_pages(pdf_path, newspaper_page_numbers, pages_path, executor=None, ocr_function=ocr_page):
+    """
+    OCRs the given pages of a PDF concurrently, skipping any page whose text is already cached.
+    Returns a dict of page number -> text (None for pages the PDF doesn't have).
+    """
+    if not os.path.exists(pages_path):
+        os.mkdir(pages_path)
+    pdf_hash = get_pdf_hash(pdf_path)
+
+    texts = {}
+    futures = {}
+    owns_executor = executor is None
+    start = time.perf_counter()
+    for newspaper_page_number in newspaper_page_numbers:
+        page_text_path = get_page_text_path(pages_path, pdf_hash, newspaper_page_number)
+        if os.path.exists(page_text_path):
+            with open(page_text_path, 'r', encoding='utf-8') as f:
+                texts[newspaper_page_number] = f.read()
+            ocr_stats['pages_from_cache'] += 1
+            continue
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=len(newspaper_page_numbers))
+        futures[newspaper_page_number] = executor.submit(
+            ocr_page_to_cache, pdf_path, newspaper_page_number, page_text_path, ocr_function)
+
+    try:
+        for newspaper_page_number, future in futures.items():
+            texts[newspaper_page_number] = future.result()
+    finally:
+        if owns_executor and executor is not None:
+            executor.shutdown()
+
+    if futures:
+        elapsed = time.perf_counter() - start
+        ocr_stats['pages_ocred'] += len(futures)
+        ocr_stats['ocr_seconds'] += elapsed
+        print(f'OCRed {len(futures)} pages of {pdf_path} in {elapsed:.1f}s '
+              f'({len(futures) / elapsed:.2f} pages/sec).')
+
+    return texts
+
+
+def print_ocr_stats():
+    pages_per_second = ocr_stats['pages_ocred'] / ocr_stats['ocr_seconds'] if ocr_stats['ocr_seconds'] else 0
+    print(f"OCR: {ocr_stats['pages_ocred']} pages OCRed at {pages_per_second:.2f} pages/sec, "
+          f"{ocr_stats['pages_from_cache']} pages from cache.")
+
+    return
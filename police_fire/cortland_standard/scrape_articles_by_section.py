@@ -1,5 +1,3 @@
-from time import sleep
-
 import regex as re
 from bs4 import BeautifulSoup
 from newspaper import Article as NewspaperArticle
@@ -8,6 +6,10 @@ from tqdm import tqdm
 
 from database import get_database_session
 from models.article import Article
+from police_fire.cortland_standard.fetch_articles import fetch_articles
+from police_fire.utilities.article_html import extract_main_body_html
+from police_fire.utilities.rate_limiting import TokenBucket
+from police_fire.utilities.scraped_url_index import ScrapedUrlIndex
 from police_fire.utilities.utilities import login
 
 config = Config()
@@ -15,6 +17,11 @@ userAgent = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
              "Safari/537.36")
 config.browser_user_agent = userAgent
 
+# listing pages are walked one at a time; this is the politeness delay between them
+LISTING_PAGE_DELAY = 2.5
+# articles are fetched and saved in chunks so a full backfill doesn't hold every page in memory
+FETCH_CHUNK_SIZE = 50
+
 topic_ids = {
     'Lottery': 317,
     'Top Stories': 89,
@@ -65,7 +72,11 @@ topic_ids = {
 
 
 def get_article_urls(topics, keywords, byline, match_type, sub_types, start_date, end_date, max_pages=9999,
-                     session=None):
+                     session=None, page_delay=LISTING_PAGE_DELAY, scraped_urls=None):
+    """
+    Walks the archive listing pages and returns the article urls found.  When a ScrapedUrlIndex is passed as
+    scraped_urls, pagination stops at the first page whose articles have all been scraped already.
+    """
     if match_type not in ['all', 'any', 'phrase']:
         print('match must be one of all, any, or phrase. defaulting to \'any\'.')
         match = 'any'
@@ -120,22 +131,27 @@ def get_article_urls(topics, keywords, byline, match_type, sub_types, start_date
     hasMore = True
 
     articleUrls = []
+    rate_limiter = TokenBucket(rate=1 / page_delay)
 
     while hasMore:
         pageUrl = url + f"page={page_number}"
         print('getting page ' + str(page_number))
-        sleep(2.5)
+        rate_limiter.wait()
         r = session.get(pageUrl)
         soup = BeautifulSoup(r.content, 'html.parser')
         story_container = soup.find('div', class_='container pk-layer default noear')
         story_list = story_container.find('div', class_='story_list')
         stories = story_list.find_all('div', class_='item')
+        page_article_urls = []
         for story in stories:
             article_url = 'https://www.cortlandstandard.com' + story.find('a')['href']
-            # if article_url not in already_scraped_urls view, add it to articleUrls
+            page_article_urls.append(article_url)
 
-            articleUrls.append(article_url)
-        if soup.find('span', class_='next'):
+        articleUrls.extend(page_article_urls)
+        if scraped_urls is not None and scraped_urls.all_known(page_article_urls):
+            print('Every article on this page has already been scraped. Stopping.')
+            hasMore = False
+        elif soup.find('span', class_='next'):
             page_number += 1
             if page_number > max_pages:
                 hasMore = False
@@ -146,18 +162,38 @@ def get_article_urls(topics, keywords, byline, match_type, sub_types, start_date
     return articleUrls
 
 
-def get_or_create_article(article_url, section, DBsession, soup, headline, byline, date_published):
+def parse_article_html(article_url, html):
+    # newspaper parses the html we already downloaded instead of fetching the url a second time
+    parsed_article = NewspaperArticle(article_url, config=config)
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    parsed_article.download(input_html=html)
+    parsed_article.parse()
+    parsed_article.nlp()
+    print('keywords: ' + str(parsed_article.keywords))
+
+    return parsed_article
+
+
+def get_or_create_article(article_url, section, DBsession, soup, headline, byline, date_published,
+                          parsed_article=None, scraped_urls=None):
     # try getting article from database by url
-    article = DBsession.query(Article).filter_by(url=article_url).first()
+    if scraped_urls is not None and article_url not in scraped_urls:
+        # the index was loaded from the database, so we already know there's nothing to get
+        article = None
+    else:
+        article = DBsession.query(Article).filter_by(url=article_url).first()
     if article:
         return article
     else:
-        parsed_article = NewspaperArticle(article_url, config=config)
-        parsed_article.download()
-        parsed_article.parse()
-        parsed_article.nlp()
-        print('keywords: ' + str(parsed_article.keywords))
-
+        if parsed_article is None:
+            parsed_article = NewspaperArticle(article_url, config=config)
+            parsed_article.download()
+            parsed_article.parse()
+            parsed_article.nlp()
+            print('keywords: ' + str(parsed_article.keywords))
+
+        html_content = soup.prettify()
         article = Article(
             headline=headline,
             section=section,
@@ -166,13 +202,16 @@ def get_or_create_article(article_url, section, DBsession, soup, headline, bylin
             date_published=date_published,
             url=article_url,
             content=parsed_article.text,
-            html_content=soup.prettify()
+            html_content=html_content,
+            body_html=extract_main_body_html(html_content)
         )
         try:
             print('adding article')
             DBsession.add(article)
             DBsession.commit()
             DBsession.close()
+            if scraped_urls is not None:
+                scraped_urls.add(article_url)
         except Exception as e:
             print('Error adding article to database: ', e)
             DBsession.rollback()
@@ -181,9 +220,11 @@ def get_or_create_article(article_url, section, DBsession, soup, headline, bylin
     return article
 
 
-def get_article_and_details(article_url, logged_in_session):
-    r = logged_in_session.get(article_url)
-    soup = BeautifulSoup(r.content, 'html.parser')
+def get_article_and_details(article_url, logged_in_session, content=None):
+    if content is None:
+        r = logged_in_session.get(article_url)
+        content = r.content
+    soup = BeautifulSoup(content, 'html.parser')
     assert 'Log out' in soup.text, 'Not logged in.'
     headline = soup.find('h1', id='headline').text
     try:
@@ -194,34 +235,72 @@ def get_article_and_details(article_url, logged_in_session):
     return headline, byline, date_published, soup
 
 
-def scrape_article(article_url, logged_in_session, section, DBsession):
-    article = DBsession.query(Article).filter_by(url=article_url).first()
-    if article:
+def scrape_article(article_url, logged_in_session, section, DBsession, content=None, scraped_urls=None):
+    # saves the article unless it's already in the database; nothing is returned either way, callers query it
+    if scraped_urls is not None:
+        if article_url in scraped_urls:
+            print('Article already in database.')
+            return
+    elif DBsession.query(Article.id).filter_by(url=article_url).first():
         print('Article already in database.')
-        return article
-    parsed_article = NewspaperArticle(article_url, config=config)
-    parsed_article.download()
-    parsed_article.parse()
-    parsed_article.nlp()
-    print('keywords: ' + str(parsed_article.keywords))
+        return
+    if content is None:
+        content = logged_in_session.get(article_url).content
+    # the same downloaded bytes feed both newspaper and BeautifulSoup
+    parsed_article = parse_article_html(article_url, content)
 
-    headline, byline, date_published, soup = get_article_and_details(article_url, logged_in_session)
-    get_or_create_article(article_url, section, DBsession, soup, headline, byline, date_published)
+    headline, byline, date_published, soup = get_article_and_details(article_url, logged_in_session, content)
+    get_or_create_article(article_url, section, DBsession, soup, headline, byline, date_published,
+                          parsed_article=parsed_article, scraped_urls=scraped_urls)
 
     return
 
 
-def main(max_pages=1, environment='prod'):
+def backfill_article_body_html(DBsession, batch_size=200):
+    """Sets body_html on articles saved before it existed, batch_size articles per commit."""
+    updated = 0
+    while True:
+        articles = DBsession.query(Article).filter(
+            Article.body_html.is_(None),
+            Article.html_content.isnot(None),
+        ).order_by(Article.id).limit(batch_size).all()
+        if not articles:
+            break
+        for article in articles:
+            article.body_html = extract_main_body_html(article.html_content)
+        DBsession.commit()
+        updated += len(articles)
+        print(f'{updated} articles backfilled.')
+
+    return updated
+
+
+def main(max_pages=1, environment='prod', scraped_urls=None, stop_at_known_page=True):
     DBsession, engine = get_database_session(environment=environment)
+    if scraped_urls is None:
+        scraped_urls = ScrapedUrlIndex.load(DBsession)
     logged_in_session = login()
     article_urls = get_article_urls(
         ['Police/Fire'], [], '', 'any',
         '', '', [], session=logged_in_session,
-        max_pages=max_pages
+        max_pages=max_pages,
+        # backfills resuming after an interrupted run need to page past already scraped pages
+        scraped_urls=scraped_urls if stop_at_known_page else None
     )
     print(str(len(article_urls)) + ' articles found.')
-    for article_url in tqdm(article_urls):
-        scrape_article(article_url, logged_in_session, section='Police/Fire', DBsession=DBsession)
+    article_urls = scraped_urls.unknown(article_urls)
+    print(str(len(article_urls)) + ' articles not yet scraped.')
+    progress_bar = tqdm(total=len(article_urls))
+    for chunk_start in range(0, len(article_urls), FETCH_CHUNK_SIZE):
+        chunk = article_urls[chunk_start:chunk_start + FETCH_CHUNK_SIZE]
+        contents = fetch_articles(chunk, logged_in_session)
+        for article_url in chunk:
+            progress_bar.update(1)
+            if contents.get(article_url) is None:
+                continue
+            scrape_article(article_url, logged_in_session, section='Police/Fire', DBsession=DBsession,
+                           content=contents[article_url], scraped_urls=scraped_urls)
+    progress_bar.close()
 
 
 if __name__ == '__main__':
@@ -1,26 +1,19 @@
 import ast
 import glob
 import os
+from concurrent.futures import ProcessPoolExecutor
 from time import sleep
 
-import PyPDF2.errors
-import openai
-import pytesseract
-from PyPDF2 import PdfReader, PdfWriter
-from openai import OpenAI
-from pdf2image import convert_from_path
 from tqdm import tqdm
 
 from database import get_database_session
 from models.incident import Incident
 from models.article import Article
+from police_fire.cortland_standard.ocr_pages import ocr_pages, print_ocr_stats
 from police_fire.maps.get_lat_lng_of_addresses import get_lat_lng_of_address
+from police_fire.utilities.blotter_parser import is_complete, parse_accused, parse_blotter_text
 from police_fire.utilities.utilities import check_if_details_references_a_relative_date, \
-    check_if_details_references_an_actual_date, get_incident_location_from_details \
-    , get_response_for_query
-
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-DBsession, engine = get_database_session(environment='prod')
+    check_if_details_references_an_actual_date, get_response_for_query, resolve_incident_location
 
 month_str_to_int = {
     'jan': '01',
@@ -50,60 +43,37 @@ def get_pdf_path(year, month, day):
         return
 
 
-def convert_newspaper_page_to_text(input_pdf, newspaper_page_number, pages_path):
-    # print('newspaper_page_number:', newspaper_page_number)
-    output = PdfWriter()
-    try:
-        page_object = input_pdf.pages[newspaper_page_number]
-    except IndexError:
-        print(f'No page {str(newspaper_page_number)} found.  Not adding to database.')
-        return
-    output.add_page(page_object)
-
-    policeFirePagePath = pages_path + '\\' + "police_fire_page.pdf"
-    with open(policeFirePagePath, "wb") as output_stream:
-        output.write(output_stream)
-
-    pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-
-    page_data = convert_from_path(policeFirePagePath,
-                                  poppler_path=r'C:\Users\Nick\Downloads\Release-23.11.0-0\poppler-23.11.0\Library\bin')
-    page_data = page_data[0]
-
-    # print('newspaper_page_number:', newspaper_page_number)
-    txt = pytesseract.pytesseract.image_to_string(page_data).encode("utf-8")
-    return txt
+def scrape_police_fire_data_from_pdf(pdf_path, year_month_day_str, DBsession, executor=None):
+    # imported here, like get_openai_client does, so importing this scraper doesn't load openai
+    import openai
 
-
-def scrape_police_fire_data_from_pdf(pdf_path, year_month_day_str):
     print(pdf_path)
-    pages_path = '\\'.join(pdf_path.split('\\')[:-1]) + '\\pages'
-    if not os.path.exists(pages_path):
-        os.mkdir(pages_path)
+    pages_path = os.path.join(os.path.dirname(pdf_path), 'pages')
 
+    # it's more often the case that the police/fire details are on the 3rd page of the PDF,
+    # but sometimes they're on the 2nd page.  Both are OCRed at once.
+    newspaper_page_numbers = [2, 1]
     try:
-        input_pdf = PdfReader(pdf_path)
+        page_texts = ocr_pages(pdf_path, newspaper_page_numbers, pages_path, executor=executor)
     except PermissionError as e:
         raise e
-    except PyPDF2.errors.PdfReadError:
-        raise Exception(f'Could not read PDF: {pdf_path}')
-        return
-    for newspaper_page_number in [2, 1]:
-        # it's more often the case that the police/fire details are on the 3rd page of the PDF,
-        # but sometimes they're on the 2nd page.
-        txt = convert_newspaper_page_to_text(input_pdf, newspaper_page_number, pages_path)
-        txt = str(txt)
+    except Exception as e:
+        raise Exception(f'Could not read PDF: {pdf_path}') from e
+    for newspaper_page_number in newspaper_page_numbers:
+        txt = page_texts[newspaper_page_number]
+        if txt is None:
+            print(f'No page {str(newspaper_page_number)} found.  Not adding to database.')
+            continue
         # cut off everything before the first instance of 'Polic'
         txt = txt[txt.find('Polic'):]
 
-        # check if pages_path already exists before writing a new one
-        file_path = pages_path + '\\' + f'police_fire_page_{str(newspaper_page_number)}.txt'
-
-        if os.path.exists(file_path):
-            txt = open(file_path, 'r').read()
-        else:
-            with open(file_path, 'w') as f:
-                f.write(txt)
+        # pages where every Accused: has its charges and details are parsed without the LLM
+        records = parse_blotter_text(txt)
+        if records and all(is_complete(record) for record in records):
+            for record in records:
+                parse_details_for_incident(get_incident_from_record(record), year_month_day_str, DBsession,
+                                           use_llm_fallback=False)
+            continue
 
         query = ("List all of the incident details provided in the following string, in the original language"
                  " of the article.  Use a Python-style dictionaries with the keys \'accused_name\', \'accused_age\',"
@@ -129,27 +99,28 @@ def scrape_police_fire_data_from_pdf(pdf_path, year_month_day_str):
             continue
         try:
             response_as_dict = ast.literal_eval(response)
-        except SyntaxError:
-            print('SyntaxError')
+        except (SyntaxError, ValueError):
+            # one unreadable response shouldn't end the whole backfill
+            print('Could not parse response.  Skipping page.')
             print('query:', query)
             print('response:', response)
-            quit()
+            continue
         if type(response_as_dict) is list:
             for incident in response_as_dict:
                 if incident == 'N/A':
                     print('No police/fire details found.  Not adding to database.')
                     continue
                 else:
-                    parse_details_for_incident(incident, year_month_day_str)
+                    parse_details_for_incident(incident, year_month_day_str, DBsession)
         elif type(response_as_dict) is dict:
             if list(response_as_dict.keys())[0] == 'incidents':
                 for incident in response_as_dict['incidents']:
-                    parse_details_for_incident(incident, year_month_day_str)
+                    parse_details_for_incident(incident, year_month_day_str, DBsession)
             elif list(response_as_dict.values())[0] == 'N/A':
                 print('No police/fire details found.  Not adding to database.')
                 continue
             elif 'accused_name' in response_as_dict.keys():
-                parse_details_for_incident(response_as_dict, year_month_day_str)
+                parse_details_for_incident(response_as_dict, year_month_day_str, DBsession)
             elif list(response_as_dict.keys())[0] == 'N/A':
                 continue
             else:
@@ -162,20 +133,34 @@ def scrape_police_fire_data_from_pdf(pdf_path, year_month_day_str):
     return
 
 
-def parse_details_for_incident(incident, year_month_day_str):
+def get_incident_from_record(record):
+    # in the same shape as the incidents the LLM returns
+    accused_names, accused_ages, accused_locations = parse_accused(record['accused'])
+    return {
+        'accused_name': ','.join(accused_names),
+        'accused_age': ','.join([i for i in accused_ages if i]),
+        'accused_location': ','.join([i for i in accused_locations if i]),
+        'charges': record['charges'],
+        'details': record['details'],
+        'legal_actions': record['legal_actions'] or 'N/A',
+    }
+
+
+def parse_details_for_incident(incident, year_month_day_str, DBsession, use_llm_fallback=True):
     incident_date_response = check_if_details_references_a_relative_date(incident['details'],
                                                                          year_month_day_str)
-    incident_location = get_incident_location_from_details(incident['details'])
+    incident_location = resolve_incident_location(incident['details'], use_llm_fallback=use_llm_fallback)
     if not incident_date_response:
         # check if details references an actual date
         incident_date_response = check_if_details_references_an_actual_date(incident['details'],
-                                                                            year_month_day_str)
+                                                                            year_month_day_str,
+                                                                            use_llm_fallback=use_llm_fallback)
     existing_incident = DBsession.query(Incident).filter(
         Incident.incident_reported_date == year_month_day_str,
         Incident.accused_name == incident['accused_name'],
         Incident.accused_age == incident['accused_age'],
     ).all()
-    lat, lng = get_lat_lng_of_address(incident_location)
+    lat, lng = get_lat_lng_of_address(incident_location, DBsession)
     existing_incident = existing_incident[0] if len(existing_incident) > 0 else None
     if existing_incident:
         print('Existing incident found.  Not adding to database.')
@@ -193,11 +178,13 @@ def parse_details_for_incident(incident, year_month_day_str):
             incident_location=incident_location,
             incident_location_lat=lat,
             incident_location_lng=lng,
-            source='pdfs/' + year_month_day_str.replace('-', '/')
+            # PDF incidents have the PDF's path instead of an article url; incident.html shows it as text
+            cortlandStandardSource='pdfs/' + year_month_day_str.replace('-', '/')
         )
         DBsession.add(incident)
         DBsession.commit()
-        sleep(1)
+        if use_llm_fallback:
+            sleep(1)
 
     if not DBsession.query(Article).filter_by(path='pdfs/' + year_month_day_str.replace('-', '/')).first():
         scraped_article = Article(path='pdfs/' + year_month_day_str.replace('-', '/'), incidents_scraped=True, incidents_verified=False)
@@ -211,7 +198,8 @@ def parse_details_for_incident(incident, year_month_day_str):
     return
 
 
-def main():
+def main(environment='prod'):
+    DBsession, engine = get_database_session(environment=environment)
     years = [
         # '2017',
          '2018',
@@ -235,15 +223,18 @@ def main():
         'dec',
     ]
     day_numbers = [str(day_number) for day_number in range(1, 31)]
-    for year in tqdm(years, desc='year'):
-        for month in tqdm(months, desc='month'):
-            for day_number in tqdm(day_numbers, desc='day'):
-                year_month_day_str = f'{year}-{month_str_to_int[month]}-{day_number}'
-                pdf_path = get_pdf_path(year, month, day_number)
-                if not pdf_path:
-                    continue
-                else:
-                    scrape_police_fire_data_from_pdf(pdf_path, year_month_day_str)
+    # one pool for the whole run so the OCR workers only start once
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        for year in tqdm(years, desc='year'):
+            for month in tqdm(months, desc='month'):
+                for day_number in tqdm(day_numbers, desc='day'):
+                    year_month_day_str = f'{year}-{month_str_to_int[month]}-{day_number}'
+                    pdf_path = get_pdf_path(year, month, day_number)
+                    if not pdf_path:
+                        continue
+                    else:
+                        scrape_police_fire_data_from_pdf(pdf_path, year_month_day_str, DBsession, executor=executor)
+    print_ocr_stats()
     return
 
 
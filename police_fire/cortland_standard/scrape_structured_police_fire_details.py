@@ -1,38 +1,36 @@
 import regex as re
-from bs4 import BeautifulSoup
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer
 
 from database import get_database_session
 from models.article import Article
-from models.incident import Incident
 from police_fire.maps import get_lat_lng_of_addresses
-from police_fire.cortland_standard.scrape_unstructured_police_fire_details import scrape_unstructured_incident_details
+from police_fire.cortland_standard.scrape_unstructured_police_fire_details import \
+    scrape_unstructured_incident_details_into_writer
+from police_fire.utilities.article_html import get_article_body_html, parse_article_body, split_at_br_tags
+from police_fire.utilities.blotter_parser import is_complete, parse_accused, parse_blotter_html
+from police_fire.utilities.incident_writer import IncidentWriter
 from police_fire.utilities.utilities import add_incident_with_error_if_not_already_exists, \
     clean_up_charges_details_and_legal_actions_records, check_if_details_references_a_relative_date, \
-    update_incident_date_if_necessary, check_if_details_references_an_actual_date, get_incident_location_from_details
+    check_if_details_references_an_actual_date, resolve_incident_location
 
 
 def identify_articles_with_incident_formatting(db_session):
     """
     Identify articles that contain incidents in the headline or keywords.
     """
-    # get articles with URLs that begin with https://www.cortlandstandard.com
-    articles = db_session.query(Article).filter(Article.url.like('https://www.cortlandstandard.com%')).all()
-    # filter out articles that have already had incidents scraped
-    articles = [article for article in articles if not article.incidents_scraped]
-
-    articles_with_incidents = []
-    for article in articles:
-        if 'Accused' in article.html_content and 'Charges' in article.html_content and 'Details' in article.html_content:
-            articles_with_incidents.append(article)
-
-    # order by article id, descending
-    articles_with_incidents = sorted(articles_with_incidents, key=lambda x: x.date_published, reverse=False)
+    # filtering is done in SQL, and html_content is only loaded for articles that don't have body_html yet
+    articles_with_incidents = db_session.query(Article).options(defer(Article.html_content)).filter(
+        Article.url.like('https://www.cortlandstandard.com%'),
+        Article.incidents_scraped.isnot(True),
+        Article.html_content.contains('Accused'),
+        Article.html_content.contains('Charges'),
+        Article.html_content.contains('Details'),
+    ).order_by(Article.date_published).all()
 
     return articles_with_incidents
 
 
-def scrape_separate_incident_details(separate_incident_tags, article, DBsession):
+def scrape_separate_incident_details(separate_incident_tags, article, DBsession, writer):
     separate_incident_tags = [i for i in separate_incident_tags if i.strip() != '']
     if len(separate_incident_tags) in [0, 1]:
         print('No separate incident tags found.')
@@ -103,156 +101,113 @@ def scrape_separate_incident_details(separate_incident_tags, article, DBsession)
             charges_str, details_str, legal_actions_str)
 
         incident_date = check_if_details_references_a_relative_date(details_str, article.date_published)
-        incident_location = get_incident_location_from_details(details_str)
-        incident_lat, incident_lng = get_lat_lng_of_addresses.get_lat_lng_of_address(incident_location)
-        incident = Incident(
-            cortlandStandardSource=article.url,
-            incident_reported_date=article.date_published,
-            accused_age=accused_age,
-            accused_location=accused_location,
-            charges=charges_str,
-            details=details_str,
-            legal_actions=legal_actions_str,
-            incident_date=incident_date,
-            incident_location=incident_location,
-            incident_location_lat=incident_lat,
-            incident_location_lng=incident_lng,
-            accused_name=accused_name
+        incident_location = resolve_incident_location(details_str)
+        incident_lat, incident_lng = get_lat_lng_of_addresses.get_lat_lng_of_address(incident_location, DBsession)
+
+        # added with the rest of the article's incidents unless one with the same details and name already exists
+        writer.add_incident(
+            dict(
+                cortlandStandardSource=article.url,
+                incident_reported_date=article.date_published,
+                accused_age=accused_age,
+                accused_location=accused_location,
+                charges=charges_str,
+                details=details_str,
+                legal_actions=legal_actions_str,
+                incident_date=incident_date,
+                incident_location=incident_location,
+                incident_location_lat=incident_lat,
+                incident_location_lng=incident_lng,
+                accused_name=accused_name
+            ),
+            dedup_on=('details', 'accused_name'),
+            update_on_duplicate=('incident_date',)
         )
 
-        # add incident to database if it doesn't already exist
-        if DBsession.query(Incident).filter_by(details=details_str, accused_name=accused_name).count() == 0:
-            DBsession.add(incident)
-            DBsession.commit()
-        else:
-            print('Incident already exists. Updating if necessary.')
-            incident_date_response = check_if_details_references_a_relative_date(details_str, article.date_published)
-            print(incident_date_response)
-            if incident_date_response:
-                update_incident_date_if_necessary(DBsession, incident_date_response, details_str)
+    return
 
-    # when all separate incidents are scraped, update article to incidents_scraped == True
-    article = DBsession.query(Article).filter_by(url=article.url).first()
-    article.incidents_scraped = True
-    DBsession.commit()
+
+def clean_up_accused_record(article, accused_str, DBsession):
+    return parse_accused(accused_str)
+
+
+def scrape_structured_incident_details(article, DBsession, writer=None, soup=None):
+    """
+    Scrape incident details from article.  Incidents are buffered in writer and written together with the
+    article's incidents_scraped flag, so a failure part-way through rolls the whole article back.  If no writer
+    is passed, the article is committed on its own.
+    """
+    if writer is None:
+        writer = IncidentWriter(DBsession)
+    try:
+        scrape_structured_incident_details_into_writer(article, DBsession, writer, soup=soup)
+        writer.mark_article_scraped(article.id)
+    except Exception:
+        writer.rollback()
+        raise
+    writer.finish_article()
 
     return
 
 
-def clean_up_accused_record(article, accused_str, DBsession):
-    # clean up accused record
-    accused_str = accused_str.replace(': ', '')
-    if ', Jr' in accused_str:
-        accused_str = accused_str.replace(', Jr.', ' Jr.')
-    if ', Sr' in accused_str:
-        accused_str = accused_str.replace(', Sr.', ' Sr.')
-
-    if ' and ' in accused_str:
-        accused_str = accused_str.replace(' and ', ';')
-
-    if ';' in accused_str:
-        accused_people = accused_str.split(';')
-        accused_names = []
-        accused_ages = []
-        accused_locations = []
-        for accused_person in accused_people:
-            print('accused_person: ', accused_person)
-            accused_name = accused_person.split(',')[0].strip().split(' of ')[0].strip()
-            try:
-                accused_age = accused_person.split(',')[1].strip()
-            except IndexError:
-                accused_age = None
-            # if accused_age isn't a digit, it's probably a location
-            if accused_age and not accused_age.isdigit():
-                accused_age = None
-
-            if ' of ' in accused_name:
-                accused_location = accused_person.split(' of ')[1]
-                print('accused_location: ', accused_location)
-            elif accused_age:
-                print('accused_age: ', accused_age)
-                accused_location_index = 2
-                accused_location = None
-            else:
-                print('else')
-                accused_location_index = 1
-                accused_location = None
-
-            if not accused_location:
-                print('not accused_location')
-                try:
-                    accused_location = ', '.join(
-                        [i.strip() for i in accused_person.split(',')[accused_location_index:]])
-                    print('accused_location: ', accused_location)
-                    if accused_location[-1] == '.':
-                        accused_location = accused_location[:-1]
-                    if accused_location.startswith('of '):
-                        accused_location = accused_location[3:]
-                except IndexError:
-                    print('IndexError')
-                    if accused_location.strip() == '':
-                        accused_location = None
-                    else:
-                        print(accused_location)
-                        raise IndexError('accused_location was incorrectly formatted.')
-
-            if accused_name is None:
-                accused_name = 'N/A'
-            if accused_age is None:
-                accused_age = 'N/A'
-            if accused_location is None:
-                accused_location = 'N/A'
-
-            accused_names.append(accused_name)
-            accused_ages.append(accused_age)
-            accused_locations.append(accused_location)
-    else:
-        accused_name = accused_str.split(',')[0].strip().split(' of ')[0].strip()
-        try:
-            accused_age = accused_str.split(',')[1].strip()
-        except IndexError:
-            accused_age = None
-        # if accused_age isn't a digit, it's probably a location
-        if accused_age and not accused_age.isdigit():
-            accused_age = None
-
-        if ' of ' in accused_name:
-            accused_location = accused_name.split(' of ')[1]
-        elif accused_age:
-            accused_location_index = 2
-            accused_location = None
-        else:
-            accused_location_index = 1
-            accused_location = None
-
-        if not accused_location:
-            try:
-                accused_location = ', '.join([i.strip() for i in accused_str.split(',')[accused_location_index:]])
-                if accused_location[-1] == '.':
-                    accused_location = accused_location[:-1]
-                if accused_location.startswith('of '):
-                    accused_location = accused_location[3:]
-            except IndexError:
-                if accused_location.strip() == '':
-                    accused_location = None
-                else:
-                    print(accused_location)
-                    raise IndexError('accused_location was incorrectly formatted.')
-
-        accused_names = [accused_name]
-        accused_ages = [accused_age]
-        accused_locations = [accused_location]
-
-    return accused_names, accused_ages, accused_locations
-
-
-def scrape_structured_incident_details(article, DBsession):
+def parse_article_html_content(article):
+    return parse_article_body(article)
+
+
+def add_blotter_records_to_writer(article, records, DBsession, writer):
+    """Adds the incidents parse_blotter_html found, with dates and locations resolved locally."""
+    for record in records:
+        accused_names, accused_ages, accused_locations = parse_accused(record['accused'])
+        charges_str, details_str, legal_actions_str = clean_up_charges_details_and_legal_actions_records(
+            record['charges'], record['details'], record['legal_actions'] or 'N/A')
+
+        incident_date = check_if_details_references_a_relative_date(details_str, article.date_published)
+        if not incident_date:
+            incident_date = check_if_details_references_an_actual_date(details_str, article.date_published,
+                                                                       use_llm_fallback=False)
+        incident_location = resolve_incident_location(details_str)
+        response = get_lat_lng_of_addresses.get_lat_lng_of_address(incident_location, DBsession)
+        incident_lat, incident_lng = response if response else (None, None)
+
+        writer.add_incident(
+            dict(
+                cortlandStandardSource=article.url,
+                incident_reported_date=article.date_published,
+                accused_age=','.join([i for i in accused_ages if i]),
+                accused_name=','.join([i for i in accused_names if i]),
+                accused_location=','.join([i for i in accused_locations if i]),
+                charges=charges_str,
+                details=details_str,
+                legal_actions=legal_actions_str,
+                incident_date=incident_date,
+                incident_location=incident_location,
+                incident_location_lat=incident_lat,
+                incident_location_lng=incident_lng,
+            ),
+            dedup_on=('accused_name', 'incident_reported_date'),
+            update_on_duplicate=('incident_date', 'incident_location', 'incident_location_lat',
+                                 'incident_location_lng')
+        )
+
+    return
+
+
+def scrape_structured_incident_details_into_writer(article, DBsession, writer, soup=None,
+                                                   unstructured_fallback=True):
     """
-    Scrape incident details from article.
+    Adds the article's incidents to writer without marking it scraped; callers do that once everything they extract
+    from it has been added.  Articles whose labels don't line up are handed to the unstructured scraper, unless
+    unstructured_fallback is False because the caller extracts every article's unstructured incidents itself.
     """
-    # get already scraped urls
     print('Scraping structured incident details from ' + article.url + '...')
-    soup = BeautifulSoup(article.html_content, 'html.parser')
+    # most blotters parse with the rules in blotter_parser; the tag matching and the LLM below are for the rest
+    records = parse_blotter_html(get_article_body_html(article))
+    if records and all(is_complete(record) for record in records):
+        add_blotter_records_to_writer(article, records, DBsession, writer)
+        return
+
+    if soup is None:
+        soup = parse_article_html_content(article)
 
     # check for <strong> tags first
     accused = soup.find_all('strong', string=re.compile('Accused'))
@@ -279,17 +234,13 @@ def scrape_structured_incident_details(article, DBsession):
         main_body = soup.find('div', class_='body main-body clearfix')
         separate_incidents = main_body.find_all('p')
         for separate_incident in separate_incidents:
-            br_tags = str(separate_incident).replace('<br>', '<br/>').split('<br/>')
-            soupy_br_tags = [BeautifulSoup(br_tag, 'html.parser').text.strip() for br_tag in br_tags if
-                             br_tag.strip() != '']
-            scrape_separate_incident_details(soupy_br_tags, article, DBsession)
-        article.incidents_scraped = True
-        DBsession.commit()
+            scrape_separate_incident_details(split_at_br_tags(separate_incident), article, DBsession, writer)
         return
 
     if len(accused) != len(charges) or len(accused) != len(details) or len(accused) != len(legal_actions):
-        scrape_unstructured_incident_details(article.id, article.url, article.content, article.date_published,
-                                             DBsession)
+        if unstructured_fallback:
+            # into the same writer, so the article is still finished (and committed) once by the caller
+            scrape_unstructured_incident_details_into_writer(article, writer)
         return
 
     for index, accused in enumerate(accused):
@@ -322,7 +273,7 @@ def scrape_structured_incident_details(article, DBsession):
         # clean up accused record
         accused_name, accused_age, accused_location = clean_up_accused_record(article, accused_str, DBsession)
         accused_name = ','.join(accused_name)
-        accused_age = ','.join(accused_age)
+        accused_age = ','.join([i for i in accused_age if i])
         accused_location = ','.join([i for i in accused_location if i])
 
         # clean up charges, details, and legal actions records
@@ -335,55 +286,34 @@ def scrape_structured_incident_details(article, DBsession):
             # check if details references an actual date
             incident_date_response = check_if_details_references_an_actual_date(details_str, article.date_published)
 
-        incident_location = get_incident_location_from_details(details_str)
-        response = get_lat_lng_of_addresses.get_lat_lng_of_address(incident_location)
+        incident_location = resolve_incident_location(details_str)
+        response = get_lat_lng_of_addresses.get_lat_lng_of_address(incident_location, DBsession)
         if response:
             incident_lat, incident_lng = response
         else:
             incident_lat, incident_lng = None, None
 
-        incident = Incident(
-            cortlandStandardSource=article.url,
-            incident_reported_date=article.date_published,
-            accused_age=accused_age,
-            accused_name=accused_name,
-            accused_location=accused_location,
-            charges=charges_str,
-            details=details_str,
-            legal_actions=legal_actions_str,
-            incident_date=incident_date_response,
-            incident_location=incident_location,
-            incident_location_lat=incident_lat,
-            incident_location_lng=incident_lng,
+        # if the incident already exists, its date and location are updated instead
+        writer.add_incident(
+            dict(
+                cortlandStandardSource=article.url,
+                incident_reported_date=article.date_published,
+                accused_age=accused_age,
+                accused_name=accused_name,
+                accused_location=accused_location,
+                charges=charges_str,
+                details=details_str,
+                legal_actions=legal_actions_str,
+                incident_date=incident_date_response,
+                incident_location=incident_location,
+                incident_location_lat=incident_lat,
+                incident_location_lng=incident_lng,
+            ),
+            dedup_on=('accused_name', 'incident_reported_date'),
+            update_on_duplicate=('incident_date', 'incident_location', 'incident_location_lat',
+                                 'incident_location_lng')
         )
 
-        # add incident to database if it doesn't already exist
-        if DBsession.query(Incident).filter_by(accused_name=accused_name,
-                                               incident_reported_date=article.date_published).count() == 0:
-            try:
-                DBsession.add(incident)
-                DBsession.commit()
-            except IntegrityError as e:
-                print('Integrity error: ', e)
-                DBsession.rollback()
-        else:
-            print('Incident already exists. Updating if necessary.')
-            if incident_date_response:
-                update_incident_date_if_necessary(DBsession, incident_date_response, details_str)
-            incident_location = get_incident_location_from_details(details_str)
-            if incident_location:
-                lat, lng = get_lat_lng_of_addresses.get_lat_lng_of_address(incident_location)
-                existing_incident = DBsession.query(Incident).filter_by(details=details_str).first()
-                existing_incident.incident_location = incident_location
-                existing_incident.incident_location_lat = lat
-                existing_incident.incident_location_lng = lng
-                DBsession.add(existing_incident)
-                DBsession.commit()
-                print('Incident location updated for incident ID ' + str(existing_incident.id))
-
-        article.incidents_scraped = True
-        DBsession.commit()
-
     return
 
 
@@ -1,22 +1,36 @@
 import json
-import os
 
-from openai import OpenAI
-
-from sqlalchemy.exc import IntegrityError
 from tqdm import tqdm
 
 from database import get_database_session
-from models.incident import Incident
 from models.article import Article
+from police_fire.utilities.async_llm import AsyncLLMClient
+from police_fire.utilities.batched_extraction import extract_incidents, print_extraction_stats
+from police_fire.utilities.incident_writer import IncidentWriter
+from police_fire.utilities.utilities import get_openai_client
+
+ARTICLES_PER_COMMIT = 40
+
+
+def scrape_unstructured_incident_details(article, DBsession, writer=None):
+    # incidents are buffered in writer and committed together with the article's incidents_scraped flag
+    if writer is None:
+        writer = IncidentWriter(DBsession)
+    try:
+        scrape_unstructured_incident_details_into_writer(article, writer)
+        writer.mark_article_scraped(article.id)
+    except Exception:
+        writer.rollback()
+        raise
+    writer.finish_article()
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    return
 
 
-def scrape_unstructured_incident_details(article, DBsession):
+def scrape_unstructured_incident_details_into_writer(article, writer):
     # print('Article content: ', article.content)
 
-    completion = client.chat.completions.create(
+    completion = get_openai_client().chat.completions.create(
         model='gpt-3.5-turbo-1106',
         messages=[
             {'role': 'system',
@@ -47,7 +61,7 @@ def scrape_unstructured_incident_details(article, DBsession):
 
     for incident in jsonified_response['incidents']:
         print('incident: ', incident)
-        incident = Incident(
+        incident = dict(
             cortlandStandardSource=article.url,
             incident_reported_date=article.date_published,
             accused_name=incident['accused_name'],
@@ -57,55 +71,86 @@ def scrape_unstructured_incident_details(article, DBsession):
             details=incident['details'],
             legal_actions=incident['legal_actions'],
         )
-        incidents = DBsession.query(Incident).filter(
-            Incident.incident_reported_date == incident.incident_reported_date,
-            Incident.accused_name == incident.accused_name,
-        ).all()
 
-        if len(incidents) > 0:
-            print('Potential duplicate incident found.  Not adding to database.')
-            continue
+        print('Filtering for nulls before adding to database.')
+        if incident['accused_name'] == 'N/A':
+            print('No accused name found.  Not adding to database.')
+            return
+
+        if count_nulls(incident) > 4:
+            print('Too many nulls found.  Not adding to database.')
+            return
         else:
-            print('No potential duplicate incidents found.  Filtering for nulls before adding to database.')
-            nulls_found = 0
-            if incident.accused_name == 'N/A':
-                print('No accused name found.  Not adding to database.')
-                return
-            if incident.accused_age in ['N/A', '0', 0]:
-                nulls_found += 1
-            if incident.accused_location == 'N/A':
-                nulls_found += 1
-            if incident.charges == 'N/A':
-                nulls_found += 1
-            if incident.details == 'N/A':
-                nulls_found += 1
-            if incident.legal_actions == 'N/A':
-                nulls_found += 1
-
-            if nulls_found > 4:
-                print('Too many nulls found.  Not adding to database.')
-                return
-            else:
-                try:
-                    DBsession.add(incident)
-                    DBsession.commit()
-                except IntegrityError as e:
-                    print('Integrity error: ', e)
-                    DBsession.rollback()
-
-    article = DBsession.query(Article).filter_by(id=article.id).first()
-    article.incidents_scraped = True
-    DBsession.commit()
+            # potential duplicates (same reported date and accused name) are skipped when the writer flushes
+            writer.add_incident(incident, dedup_on=('incident_reported_date', 'accused_name'))
 
     return
 
 
-def main():
+def count_nulls(incident):
+    nulls_found = 0
+    if incident['accused_age'] in ['N/A', '0', 0]:
+        nulls_found += 1
+    for column in ['accused_location', 'charges', 'details', 'legal_actions']:
+        if incident[column] == 'N/A':
+            nulls_found += 1
+
+    return nulls_found
+
+
+def add_extracted_incidents_to_writer(article, extracted_incidents, writer):
+    """Adds incidents from batched extraction, which come with their incident_date and incident_location."""
+    for extracted_incident in extracted_incidents:
+        incident = dict(
+            cortlandStandardSource=article.url,
+            incident_reported_date=article.date_published,
+            **extracted_incident.model_dump(),
+        )
+        if count_nulls(incident) > 4:
+            print('Too many nulls found.  Not adding to database.')
+            continue
+        writer.add_incident(incident, dedup_on=('incident_reported_date', 'accused_name'))
+
+    return
+
+
+def scrape_unstructured_articles_batched(articles, writer, get_responses=None):
+    """
+    Extracts the incidents from several articles per request.  Articles whose extraction still fails after retries
+    aren't marked scraped, so the next run picks them up again.
+    """
+    extracted, failed = extract_incidents(articles, get_responses=get_responses)
+    for article in articles:
+        if article.id not in extracted:
+            print(f'Could not extract incidents from {article.url}.')
+            continue
+        add_extracted_incidents_to_writer(article, extracted[article.id], writer)
+        writer.mark_article_scraped(article.id)
+        writer.finish_article()
+
+    return failed
+
+
+def main(batched=True):
     DBsession, engine = get_database_session(environment='prod')
     # get articles & sort by dates published, descending
     police_fire_articles = DBsession.query(Article).where(Article.section == 'Police/Fire').order_by(
         Article.date_published.desc()).all()
     police_fire_articles = list(police_fire_articles)
+    if batched:
+        writer = IncidentWriter(DBsession)
+        llm_client = AsyncLLMClient()
+        # extracted and committed a few batches at a time, so an interrupted run keeps what it has done
+        for start in tqdm(range(0, len(police_fire_articles), ARTICLES_PER_COMMIT)):
+            scrape_unstructured_articles_batched(police_fire_articles[start:start + ARTICLES_PER_COMMIT], writer,
+                                                 get_responses=llm_client.get_responses)
+            writer.commit()
+        writer.print_stats()
+        print_extraction_stats()
+        llm_client.print_stats()
+        llm_client.close()
+        DBsession.close()
+        return
     index = 0
     for article in tqdm(police_fire_articles):
         print(article.url)
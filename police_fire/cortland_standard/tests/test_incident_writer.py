@@ -0,0 +1,118 @@
+import datetime
+
+from sqlalchemy.orm import sessionmaker
+
+from models.article import Article
+from models.charges import Charges
+from models.incident import Incident
+from police_fire.utilities.incident_writer import IncidentWriter
+
+from police_fire.test_database import setup_database
+
+REPORTED_DATE = datetime.date(2023, 5, 1)
+
+
+def drop_existing_rows(DBsession):
+    DBsession.query(Charges).delete()
+    DBsession.query(Incident).delete()
+    DBsession.query(Article).delete()
+    DBsession.commit()
+    return
+
+
+def make_incident(accused_name='John Smith', **columns):
+    return dict(cortlandStandardSource='https://www.cortlandstandard.com/stories/a,1',
+                incident_reported_date=REPORTED_DATE, accused_name=accused_name,
+                details=f'Police said {accused_name} took a bike.', **columns)
+
+
+def count_incidents_from_another_session(DBsession):
+    other_session = sessionmaker(bind=DBsession.get_bind())()
+    try:
+        return other_session.query(Incident).count()
+    finally:
+        other_session.close()
+
+
+def test_existing_incidents_are_skipped_with_one_lookup(setup_database):
+    DBsession = setup_database
+    drop_existing_rows(DBsession)
+    DBsession.add(Incident(**make_incident()))
+    DBsession.commit()
+
+    writer = IncidentWriter(DBsession)
+    writer.add_incident(make_incident())
+    writer.add_incident(make_incident('Jane Doe'))
+    writer.commit()
+
+    assert sorted(name for name, in DBsession.query(Incident.accused_name)) == ['Jane Doe', 'John Smith']
+    assert writer.stats['incidents_inserted'] == 1
+    assert writer.stats['incidents_skipped'] == 1
+
+
+def test_duplicates_within_a_batch_are_inserted_once(setup_database):
+    DBsession = setup_database
+    drop_existing_rows(DBsession)
+
+    writer = IncidentWriter(DBsession)
+    writer.add_incident(make_incident())
+    writer.add_incident(make_incident())
+    writer.commit()
+
+    assert DBsession.query(Incident).count() == 1
+    assert writer.stats['incidents_inserted'] == 1
+    assert writer.stats['incidents_skipped'] == 1
+
+
+def test_duplicates_get_their_update_on_duplicate_columns_updated(setup_database):
+    DBsession = setup_database
+    drop_existing_rows(DBsession)
+    DBsession.add(Incident(**make_incident(incident_location='Main Street, Cortland')))
+    DBsession.commit()
+
+    writer = IncidentWriter(DBsession)
+    writer.add_incident(make_incident(incident_date='2023-04-30', incident_location=None, charges='Petit larceny'),
+                        update_on_duplicate=('incident_date', 'incident_location', 'charges'))
+    writer.commit()
+
+    incident = DBsession.query(Incident).one()
+    assert incident.incident_date == datetime.date(2023, 4, 30)
+    # None doesn't overwrite what's already there
+    assert incident.incident_location == 'Main Street, Cortland'
+    assert incident.charges == 'Petit larceny'
+    assert writer.stats['incidents_updated'] == 1
+
+
+def test_rollback_drops_everything_buffered_for_the_article(setup_database):
+    DBsession = setup_database
+    drop_existing_rows(DBsession)
+    article = Article(url='https://www.cortlandstandard.com/stories/a,1', incidents_scraped=False)
+    DBsession.add(article)
+    DBsession.commit()
+
+    writer = IncidentWriter(DBsession)
+    writer.add_incident(make_incident())
+    writer.mark_article_scraped(article.id)
+    writer.rollback()
+    writer.commit()
+
+    assert DBsession.query(Incident).count() == 0
+    assert DBsession.query(Article.incidents_scraped).filter(Article.id == article.id).scalar() is False
+
+
+def test_articles_are_committed_every_commit_every_articles(setup_database):
+    DBsession = setup_database
+    drop_existing_rows(DBsession)
+
+    writer = IncidentWriter(DBsession, commit_every=2)
+    writer.add_incident(make_incident())
+    writer.finish_article()
+
+    assert writer.stats['commits'] == 0
+    assert count_incidents_from_another_session(DBsession) == 0
+
+    writer.add_incident(make_incident('Jane Doe'))
+    writer.finish_article()
+
+    assert writer.stats['commits'] == 1
+    assert count_incidents_from_another_session(DBsession) == 2
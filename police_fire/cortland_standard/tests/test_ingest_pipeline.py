@@ -0,0 +1,80 @@
+import datetime
+from types import SimpleNamespace
+
+from bs4 import BeautifulSoup
+from sqlalchemy import inspect
+
+from models.article import Article
+from police_fire.cortland_standard.ingest_pipeline import select_unscraped_articles, count_unscraped_articles, \
+    enrich_articles_batched
+
+from police_fire.test_database import setup_database
+
+
+def test_select_unscraped_articles_streams_only_unscraped_articles_most_recent_first(setup_database):
+    DBsession = setup_database
+    DBsession.query(Article).delete()
+    DBsession.add_all([
+        Article(url='https://www.cortlandstandard.com/stories/a,1', date_published=datetime.date(2023, 1, 1),
+                incidents_scraped=False, html_content='<html>a</html>', body_html=''),
+        Article(url='https://www.cortlandstandard.com/stories/b,2', date_published=datetime.date(2023, 1, 3),
+                incidents_scraped=None, html_content='<html>b</html>', body_html='<div class="main-body">b</div>'),
+        Article(url='https://www.cortlandstandard.com/stories/c,3', date_published=datetime.date(2023, 1, 2),
+                incidents_scraped=True),
+        Article(url='https://www.cortlandvoice.com/d', date_published=datetime.date(2023, 1, 4),
+                incidents_scraped=False),
+    ])
+    DBsession.commit()
+
+    articles = list(select_unscraped_articles(DBsession, batch_size=1))
+
+    assert [article.url for article in articles] == ['https://www.cortlandstandard.com/stories/b,2',
+                                                     'https://www.cortlandstandard.com/stories/a,1']
+    assert count_unscraped_articles(DBsession) == 2
+    # articles are detached so the session doesn't hold on to them
+    assert all(article not in DBsession for article in articles)
+    # the page around the main body is only loaded for the article without one
+    assert 'html_content' in inspect(articles[0]).unloaded
+    assert articles[1].html_content == '<html>a</html>'
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.incidents = []
+        self.scraped_article_ids = []
+        self.articles_finished = 0
+
+    def add_incident(self, row, dedup_on=(), update_on_duplicate=()):
+        self.incidents.append(row)
+
+    def mark_article_scraped(self, article_id):
+        self.scraped_article_ids.append(article_id)
+
+    def finish_article(self):
+        self.articles_finished += 1
+
+    def rollback(self):
+        self.incidents = []
+        self.scraped_article_ids = []
+
+
+def test_articles_stay_unscraped_when_batched_extraction_fails():
+    # an article without Accused/Charges labels, which the structured scraper reads as <br> formatting
+    html = ('<div class="body main-body clearfix">'
+            '<p>Police said a man was charged after a crash on Main Street.</p></div>')
+    article = SimpleNamespace(id=1, url='https://www.cortlandstandard.com/stories/a,1',
+                              content='Police said a man was charged after a crash on Main Street.',
+                              date_published=datetime.date(2023, 1, 1), html_content=html, body_html=html)
+    requests = []
+
+    def get_responses(queries):
+        requests.extend(queries)
+        return [RuntimeError('rate limited') for query in queries]
+
+    writer = RecordingWriter()
+    enrich_articles_batched([(article, BeautifulSoup(html, 'html.parser'))], None, writer,
+                            get_responses=get_responses)
+
+    assert requests
+    assert writer.scraped_article_ids == []
+    assert writer.articles_finished == 1
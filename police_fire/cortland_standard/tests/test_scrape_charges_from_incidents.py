@@ -1,5 +1,7 @@
+from models.charges import Charges
 from models.incident import Incident
-from police_fire.cortland_standard.scrape_charges_from_incidents import categorize_charges
+from police_fire.cortland_standard.scrape_charges_from_incidents import categorize_charges, extract_all_charges, \
+    get_charges_hash, get_incidents_to_extract
 
 from police_fire.test_database import setup_database
 
@@ -34,3 +36,38 @@ def test_assert_all_charges_are_categorized(setup_database):
     assert len(categorized_charges['misdemeanors']) == 1
     assert len(categorized_charges['violations']) == 1
 
+
+def test_only_new_and_edited_incidents_are_extracted(setup_database):
+    db_session = setup_database
+    db_session.query(Charges).delete()
+    db_session.query(Incident).delete()
+    db_session.commit()
+
+    def add_incident(accused_name, spellchecked_charges, extracted_from):
+        incident = Incident(accused_name=accused_name, incident_reported_date='2023-05-01',
+                            cortlandStandardSource='https://www.cortlandstandard.com/stories/a,1',
+                            charges=spellchecked_charges, spellchecked_charges=spellchecked_charges,
+                            charges_extracted_hash=get_charges_hash(extracted_from) if extracted_from else None)
+        db_session.add(incident)
+        db_session.flush()
+        if extracted_from:
+            db_session.add(Charges(incident_id=incident.id, charged_name=accused_name, crime=extracted_from,
+                                   charge_description=extracted_from))
+        return incident
+
+    unchanged = add_incident('John Smith', 'Petit larceny, a misdemeanor.', 'Petit larceny, a misdemeanor.')
+    edited = add_incident('Jane Doe', 'Criminal mischief, a misdemeanor.', 'Criminal mischef, a misdemeanor.')
+    new = add_incident('Bob Jones', 'Harassment, a violation.', None)
+    db_session.commit()
+
+    assert [incident.id for incident in get_incidents_to_extract(db_session)] == [edited.id, new.id]
+
+    assert extract_all_charges(db_session) == 2
+
+    assert get_incidents_to_extract(db_session) == []
+    # the unchanged incident's charges are left alone, the edited one's are replaced
+    assert [crime for crime, in db_session.query(Charges.crime).filter(Charges.incident_id == unchanged.id)] == [
+        'Petit larceny, a misdemeanor.']
+    edited_charges = db_session.query(Charges.charge_description).filter(Charges.incident_id == edited.id).all()
+    assert edited_charges and all('mischef' not in description for description, in edited_charges)
+    assert db_session.query(Charges).filter(Charges.incident_id == new.id).count() > 0
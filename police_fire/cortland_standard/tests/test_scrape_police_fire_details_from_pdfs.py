@@ -0,0 +1,39 @@
+from models.article import Article
+from models.incident import Incident
+from police_fire.cortland_standard.scrape_police_fire_details_from_pdfs import get_incident_from_record, \
+    parse_details_for_incident
+from police_fire.utilities import utilities
+from police_fire.utilities.blotter_parser import parse_blotter_text
+
+from police_fire.test_database import setup_database
+
+OCR_TEXT = """Police/Fire
+Accused: Mark Lee, 19, of McGraw
+Charges: Criminal mischief, a misdemeanor
+Details: Police said Lee broke a window
+of a house at 6 p.m. Friday.
+Legal actions: Lee was ticketed to appear in McGraw Village Court.
+"""
+
+
+def fail_on_llm_call(*args, **kwargs):
+    raise AssertionError('the rule-based PDF path called the LLM')
+
+
+def test_parsed_blotter_records_are_added_without_the_llm(setup_database, monkeypatch):
+    DBsession = setup_database
+    DBsession.query(Incident).delete()
+    DBsession.query(Article).filter(Article.path == 'pdfs/2018/12/03').delete()
+    DBsession.commit()
+    monkeypatch.setattr(utilities, 'get_incident_location_from_details', fail_on_llm_call)
+    monkeypatch.setattr(utilities, 'get_response_for_query', fail_on_llm_call)
+
+    for record in parse_blotter_text(OCR_TEXT):
+        parse_details_for_incident(get_incident_from_record(record), '2018-12-03', DBsession, use_llm_fallback=False)
+
+    incident = DBsession.query(Incident).one()
+    assert incident.accused_name == 'Mark Lee'
+    assert incident.accused_age == '19'
+    assert incident.cortlandStandardSource == 'pdfs/2018/12/03'
+    assert incident.incident_location is None
+    assert DBsession.query(Article).filter(Article.path == 'pdfs/2018/12/03').one().incidents_scraped
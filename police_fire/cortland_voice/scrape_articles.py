@@ -5,6 +5,7 @@ from bs4 import BeautifulSoup
 
 from database import get_database_session
 from models.article import Article
+from police_fire.utilities.scraped_url_index import ScrapedUrlIndex
 
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
@@ -50,21 +51,25 @@ def scrape_article(article_url, database_session):
     return
 
 
-def main():
+def main(scraped_urls=None):
     database_session, engine = get_database_session(environment='prod')
-    already_scraped_articles = database_session.query(Article.url).all()
-    already_scraped_articles = [url[0] for url in already_scraped_articles]
+    if scraped_urls is None:
+        scraped_urls = ScrapedUrlIndex.load(database_session)
     page = 1
     while True:
         article_urls = get_article_urls(page=page)
         if not article_urls:
             break
+        if scraped_urls.all_known(article_urls):
+            print('Every article on this page has already been scraped. Stopping.')
+            break
         for article_url in article_urls:
             print(article_url)
-            if article_url in already_scraped_articles:
+            if article_url in scraped_urls:
                 print('Article already in database.')
                 continue
             scrape_article(article_url, database_session)
+            scraped_urls.add(article_url)
         page += 1
 
     return
@@ -2,14 +2,17 @@ import datetime
 import json
 from datetime import timedelta
 
-from sqlalchemy import and_
+from sqlalchemy import and_, or_
 from tqdm import tqdm
 
 from database import get_database_session
 from models.article import Article
 from models.incident import Incident
+from police_fire.utilities import llm_cache
+from police_fire.utilities.async_llm import AsyncLLMClient
+from police_fire.utilities.batched_extraction import extract_incidents, print_extraction_stats
 from police_fire.utilities.utilities import get_response_for_query, check_if_details_references_a_relative_date, \
-    get_incident_location_from_details
+    resolve_incident_location, get_person_id
 
 
 def get_articles(DBsession):
@@ -25,13 +28,16 @@ def filter_incidents(DBsession, new_incident):
 
     first_name, last_name = new_incident['accused_name'].split()[0], new_incident['accused_name'].split()[-1]
 
+    same_name = and_(
+        # Match records where the accused_name starts with the first name
+        Incident.accused_name.ilike(f"{first_name}%"),
+        # And also contains the last name at the end.
+        Incident.accused_name.ilike(f"%{last_name}")
+    )
+    # if the name has been resolved to a person, their incidents under other variants of the name match too
+    person_id = get_person_id(DBsession, new_incident['accused_name'])
     incidents = DBsession.query(Incident).filter(
-        and_(
-            # Match records where the accused_name starts with the first name
-            Incident.accused_name.ilike(f"{first_name}%"),
-            # And also contains the last name at the end.
-            Incident.accused_name.ilike(f"%{last_name}")
-        )
+        or_(Incident.person_id == person_id, same_name) if person_id is not None else same_name
     ).order_by(Incident.incident_reported_date.asc()).all()
 
     new_incident_reported_date = new_incident['incident_reported_date']
@@ -122,7 +128,7 @@ def scrape_incidents_from_article(DBsession, article):
             continue
         else:
             already_scraped = False
-        incident['location'] = get_incident_location_from_details(incident['details'])
+        incident['location'] = resolve_incident_location(incident['details'])
 
         print('already scraped: ', already_scraped)
         if already_scraped:
@@ -179,17 +185,75 @@ def scrape_incidents_from_article(DBsession, article):
     return
 
 
-def main():
+def add_extracted_incident(DBsession, article, extracted_incident):
+    """Adds an incident from batched extraction, which already has its incident_date and incident_location."""
+    incident = extracted_incident.model_dump()
+    incident['incident_reported_date'] = article.date_published
+    if check_if_incident_already_scraped(DBsession, incident, article.url):
+        return
+    if incident['incident_date'] is None:
+        incident['incident_date'] = check_if_details_references_a_relative_date(incident['details'],
+                                                                                article.date_published)
+    if incident['incident_date'] is None:
+        print('Incident date is not a date.  Using reported date.')
+        incident['incident_date'] = incident['incident_reported_date']
+
+    DBsession.add(Incident(
+        cortlandVoiceSource=article.url,
+        incident_reported_date=incident['incident_reported_date'],
+        accused_name=incident['accused_name'],
+        accused_age=incident['accused_age'],
+        accused_location=incident['accused_location'],
+        charges=normalize_charges(incident['charges']),
+        details=incident['details'],
+        legal_actions=incident['legal_actions'],
+        incident_date=incident['incident_date'],
+        incident_location=incident['incident_location'] or 'N/A',
+    ))
+
+    return
+
+
+def scrape_incidents_from_articles_batched(DBsession, articles, get_responses=None):
+    extracted, failed = extract_incidents(articles, get_responses=get_responses)
+    for article in articles:
+        if article.id not in extracted:
+            print(f'Could not extract incidents from {article.url}.')
+            continue
+        try:
+            for extracted_incident in extracted[article.id]:
+                add_extracted_incident(DBsession, article, extracted_incident)
+            article.incidents_scraped = True
+            DBsession.add(article)
+            DBsession.commit()
+        except Exception as e:
+            print('Error adding incidents to database: ', e)
+            DBsession.rollback()
+
+    return failed
+
+
+def main(batched=True):
     DB_session, engine = get_database_session(environment='prod')
     articles = get_articles(DB_session)
-    for article in tqdm(articles):
-        scrape_incidents_from_article(DB_session, article)
+    if batched:
+        llm_client = AsyncLLMClient()
+        # every batch is sent at once, as fast as the rate limits allow
+        scrape_incidents_from_articles_batched(DB_session, articles, get_responses=llm_client.get_responses)
+        print_extraction_stats()
+        llm_client.print_stats()
+        llm_client.close()
+    else:
+        for article in tqdm(articles):
+            scrape_incidents_from_article(DB_session, article)
+    llm_cache.print_cache_stats()
 
 
-def rescrape_article(url):
-    DB_session, engine = get_database_session(environment='prod')
-    article = DB_session.query(Article).filter(Article.url == url).first()
-    scrape_incidents_from_article(DB_session, article)
+def rescrape_article(url, DBsession=None):
+    if DBsession is None:
+        DBsession, engine = get_database_session(environment='prod')
+    article = DBsession.query(Article).filter(Article.url == url).first()
+    scrape_incidents_from_article(DBsession, article)
 
 
 if __name__ == '__main__':
@@ -1,15 +1,8 @@
-import os
-
-from openai import OpenAI
 from tqdm import tqdm
 
 from database import get_database_session
 from models.charges import Charges
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
-DBsession, engine = get_database_session(environment='prod')
-
 charge_types = {
     'DUI/DWI': [],
     'Traffic Violations': [],
@@ -55,7 +48,7 @@ def get_manual_response():
 
     return response
 
-def categorize_charge(charge):
+def categorize_charge(charge, DBsession):
     response_dict = {
         '1': 'DUI/DWI',
         '2': 'Traffic Violations',
@@ -137,14 +130,15 @@ def categorize_charge(charge):
     return
 
 
-def main():
+def main(environment='prod'):
+    DBsession, engine = get_database_session(environment=environment)
     # get charges one after another where category is null
     charges = DBsession.query(Charges).filter_by(category=None).all()
 
     # get charges where category is 'Other'
     # charges = DBsession.query(Charges).filter_by(category='Other').all()
     for charge in tqdm(charges):
-        categorize_charge(charge)
+        categorize_charge(charge, DBsession)
 
     pass
 
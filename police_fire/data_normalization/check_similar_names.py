@@ -1,36 +1,33 @@
 # step 1: get all distinct names from Charges table
-# step 2: split the names into first and last names - if last name is 'Jr/Sr' then use the second to last name as last name
-# step 3: print all the split names
+# step 2: split the names into first and last names with parse_name, which handles suffixes and 'Last, First'
+# step 3: print the first and last names shared by more than one name
+# resolve_people links the names that are the same person; this is for checking what it will see.
+from collections import Counter
 from pprint import pprint
 
 from database import get_database_session
 from models.charges import Charges
+from police_fire.utilities.person_names import parse_name
 
 
 def get_distinct_names_from_charges_table(DBsession):
-    names = DBsession.query(Charges).distinct(Charges.charged_name).all()
+    names = [charged_name for charged_name, in DBsession.query(Charges.charged_name).distinct()]
     return names
 
 
 def split_names(names):
     split_names_array = []
     for name in names:
-        split_name = name.charged_name.split(' ')
-        if split_name[-1] == 'Jr.' or split_name[-1] == 'Sr.' or split_name[-1] == 'Jr' or split_name[-1] == 'Sr' or \
-                split_name[-1] == 'II' or split_name[-1] == 'III' or split_name[-1] == 'IV' or split_name[-1] == 'V':
-            last_name = split_name[-2]
-        else:
-            last_name = split_name[-1]
-        first_name = split_name[0]
-        split_names_array.append(f'{first_name} {last_name}')
+        parsed_name = parse_name(name)
+        if parsed_name is not None:
+            split_names_array.append(f"{parsed_name['first']} {parsed_name['last']}")
     return split_names_array
 
 
 def check_for_duplicate_names(split_names_array):
-    duplicate_names = []
-    for name in split_names_array:
-        if split_names_array.count(name) > 1:
-            duplicate_names.append(name)
+    # one pass to count, instead of a list.count per name
+    name_counts = Counter(split_names_array)
+    duplicate_names = [name for name in split_names_array if name_counts[name] > 1]
     return duplicate_names
 
 
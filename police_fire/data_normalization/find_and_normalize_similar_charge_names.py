@@ -1,56 +1,66 @@
-# step 1: get all unique charge names
-# step 2: find similar charge names
-# step 3: normalize charge names
-# step 4: update database with normalized charge names
+# suggests canonical names for similar crimes in the charges table.  Crimes are clustered with
+# police_fire/utilities/charge_name_clusters.py and saved in charge_name_cluster, so later runs only match the crimes
+# that are new since against the saved canonical names.  Suggestions are printed, not applied; accepted ones belong in
+# charge_renames.json, which renormalize_charge_names applies.
+#   python -m police_fire.data_normalization.find_and_normalize_similar_charge_names [--rebuild]
+import datetime
+import sys
 
-from fuzzywuzzy import process
-from tqdm import tqdm
+from sqlalchemy import func
 
 from database import get_database_session
+from models.charge_name_cluster import ChargeNameCluster
 from models.charges import Charges
+from police_fire.utilities.charge_name_clusters import cluster_crimes, get_cluster_members
 
-DBsession, engine = get_database_session(environment='prod')
 
+def get_crime_counts(DBsession):
+    return dict(DBsession.query(Charges.crime, func.count(Charges.id)).filter(Charges.crime.isnot(None))
+                .group_by(Charges.crime).all())
 
-# step 1: get all unique charge names
-def get_unique_charge_names():
-    unique_charge_names = DBsession.query(Charges.crime).distinct().all()
-    unique_charge_names = [charge_name[0] for charge_name in unique_charge_names]
-    return unique_charge_names
 
+def update_charge_name_clusters(DBsession, rebuild=False):
+    """Clusters the crimes that aren't in charge_name_cluster yet, or all of them with rebuild."""
+    if rebuild:
+        DBsession.query(ChargeNameCluster).delete()
+    crime_counts = get_crime_counts(DBsession)
+    saved_crimes = {crime for crime, in DBsession.query(ChargeNameCluster.crime)}
+    canonical_crimes = [crime for crime, in DBsession.query(ChargeNameCluster.canonical_crime).distinct()]
+    new_crimes = [crime for crime in crime_counts if crime not in saved_crimes]
 
-# step 2: find similar charge names
-def find_similar_charge_names(charge_name, unique_charge_names):
-    print(f'charge_name: {charge_name}')
-    similar_charge_names = process.extract(charge_name, unique_charge_names, limit=5)
-    return similar_charge_names
+    clusters = cluster_crimes(new_crimes, counts=crime_counts, canonical_crimes=canonical_crimes)
+    created_at = datetime.datetime.now()
+    DBsession.add_all([
+        ChargeNameCluster(crime=crime, canonical_crime=canonical_crime, similarity=similarity, created_at=created_at)
+        for crime, (canonical_crime, similarity) in clusters.items()
+    ])
+    DBsession.commit()
+    print(f'{len(crime_counts)} unique charge names, {len(clusters)} clustered.')
 
+    return clusters
 
-# step 3: normalize charge names
-def normalize_charge_name(charge_name, similar_charge_names):
-    print(f'charge_name: {charge_name}')
-    return similar_charge_names[0][0]
 
+def print_cluster_suggestions(DBsession):
+    clusters = {crime: (canonical_crime, similarity) for crime, canonical_crime, similarity
+                in DBsession.query(ChargeNameCluster.crime, ChargeNameCluster.canonical_crime,
+                                   ChargeNameCluster.similarity)}
+    for canonical_crime, crimes in sorted(get_cluster_members(clusters).items()):
+        print(canonical_crime)
+        for crime in crimes:
+            if crime != canonical_crime:
+                print(f'  {crime} ({clusters[crime][1]})')
 
-# step 4: update database with normalized charge names
-def update_database_with_normalized_charge_names(unique_charge_names):
-    for charge_name in unique_charge_names:
-        similar_charge_names = find_similar_charge_names(charge_name, unique_charge_names)
-        normalized_charge_name = normalize_charge_name(charge_name, similar_charge_names)
-        print(f'{charge_name} -> {normalized_charge_name}')
-        # DBsession.query(Charges).filter(Charges.crime == charge_name).update({Charges.crime: normalized_charge_name})
-        # DBsession.commit()
+    return
 
 
-def main():
-    unique_charge_names = get_unique_charge_names()
-    for charge_name in tqdm(unique_charge_names):
-        print('---')
-        similar_charge_names = find_similar_charge_names(charge_name, unique_charge_names)
-        for similar_charge_name in similar_charge_names:
-            print(similar_charge_name)
-        input('Press Enter to continue...')
+def main(rebuild=False):
+    DBsession, engine = get_database_session(environment='prod')
+    update_charge_name_clusters(DBsession, rebuild=rebuild)
+    print_cluster_suggestions(DBsession)
+    DBsession.close()
+
+    return
 
 
 if __name__ == '__main__':
-    main()
+    main(rebuild='--rebuild' in sys.argv)
@@ -8,10 +8,9 @@ from tqdm import tqdm
 from database import get_database_session
 from models.incident import Incident
 
-DBsession, engine = get_database_session(environment='prod')
 
-
-def spellcheck_charges(source=None):
+def spellcheck_charges(source=None, environment='prod'):
+    DBsession, engine = get_database_session(environment=environment)
     correct_words = ['first-degree', 'second-degree', 'third-degree', 'fourth-degree', ]
     corrected_words = {}
 
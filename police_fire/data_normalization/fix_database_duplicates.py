@@ -1,170 +1,132 @@
-from sqlalchemy import func
-
-from database import get_database_session, Incident
-
-
-def delete_one_incident_if_names_are_same_except_for_commas(matching_incidents):
-    deleted = False
-    if matching_incidents[0].accused_name.replace(',', '') == matching_incidents[1].accused_name.replace(',', ''):
-        if ',' in matching_incidents[0].accused_name:
-            print(
-                f"  Deleting Incident ID: {matching_incidents[0].id}, Accused Name: {matching_incidents[0].accused_name}")
-            # DBsession.delete(matching_incidents[0])
-            # DBsession.commit()
-            deleted = True
-            return deleted
-        elif ',' in matching_incidents[1].accused_name:
-            print(
-                f"  Deleting Incident ID: {matching_incidents[1].id}, Accused Name: {matching_incidents[1].accused_name}")
-            # DBsession.delete(matching_incidents[1])
-            # DBsession.commit()
-            deleted = True
-            return deleted
-
-    return deleted
-
-
-def delete_one_incident_if_two_exist_for_split_names(DBsession, matching_incidents):
-    print('delete_one_incident_if_two_exist_for_split_names')
-    # reorder the matching incidents so that the one with the most names is first
-    if len(matching_incidents[0].accused_name.split(',')) < len(matching_incidents[1].accused_name.split(',')):
-        matching_incidents = [matching_incidents[1], matching_incidents[0]]
-    else:
-        pass
-
-    print(vars(matching_incidents[0]))
-    split_names = [i.strip() for i in matching_incidents[0].accused_name.split(',')]
-    split_ages = [i.strip() for i in matching_incidents[0].accused_age.split(',')]
-    split_locations = [i.strip() for i in matching_incidents[0].accused_location.split(',')]
-    split_charges = [i.strip() for i in matching_incidents[0].charges.split(',')]
-    split_legal_actions = [i.strip() for i in matching_incidents[0].legal_actions.split(',')]
-
-    if len(split_charges) == 1:
-        split_charges = [split_charges[0] for i in range(len(split_names))]
-    if len(split_legal_actions) == 1:
-        split_legal_actions = [split_legal_actions[0] for i in range(len(split_names))]
-
-    for index, name in enumerate(split_names):
-        location = split_locations[index] if index < len(split_locations) else split_locations[-1]
-        new_incident = Incident(
-            incident_reported_date=matching_incidents[0].incident_reported_date,
-            accused_name=name,
-            accused_age=split_ages[index],
-            accused_location=location,
-            charges=split_charges[index],
-            details=matching_incidents[0].details,
-            legal_actions=split_legal_actions[index],
-            incident_date=matching_incidents[0].incident_date,
-            incident_location=matching_incidents[0].incident_location,
-            incident_location_lat=matching_incidents[0].incident_location_lat,
-            incident_location_lng=matching_incidents[0].incident_location_lng,
-            source=matching_incidents[0].source,
-        )
-        DBsession.add(new_incident)
+# finds and merges duplicate incidents.  Fingerprints are computed once for incidents that don't have one, every
+# incident is read in one query, and police_fire/utilities/incident_dedup.py plans the merges, so no group needs a
+# query of its own.  By default the plan is only printed:
+#   python -m police_fire.data_normalization.fix_database_duplicates [--apply]
+import sys
+
+from database import get_database_session
+from models.charges import Charges
+from models.details_fingerprint import get_details_fingerprint
+from models.incident import Incident
+from police_fire.utilities.incident_dedup import plan_merges, split_accused_names
+
+COPIED_COLUMNS = ['incident_reported_date', 'details', 'incident_date', 'incident_location', 'incident_location_lat',
+                  'incident_location_lng', 'cortlandStandardSource', 'cortlandVoiceSource']
+
+
+def backfill_details_fingerprints(DBsession, batch_size=1000):
+    updated = 0
+    last_id = 0
+    while True:
+        # keyed on id, since incidents with blank details are left without a fingerprint
+        incidents = DBsession.query(Incident).filter(
+            Incident.details_fingerprint.is_(None),
+            Incident.details.isnot(None),
+            Incident.id > last_id,
+        ).order_by(Incident.id).limit(batch_size).all()
+        if not incidents:
+            break
+        for incident in incidents:
+            incident.details_fingerprint = get_details_fingerprint(incident.details)
+        last_id = incidents[-1].id
         DBsession.commit()
-        print(f'Incident added for {name}.')
+        updated += len(incidents)
+        print(f'{updated} details fingerprints computed.')
 
-    # delete incident with multiple names
-    print(f'  Deleting Incident ID: {matching_incidents[0].id}, Accused Name: {matching_incidents[0].accused_name}')
-    DBsession.delete(matching_incidents[0])
-    DBsession.commit()
+    return updated
 
 
-def delete_one_incident_if_name_is_shorter(DBsession, matching_incidents):
-    if len(matching_incidents[0].accused_name) < len(matching_incidents[1].accused_name):
-        print(
-            f"  Deleting Incident ID: {matching_incidents[0].id}, Accused Name: {matching_incidents[0].accused_name}")
-        deleted = True
-        DBsession.delete(matching_incidents[0])
-        DBsession.commit()
-    elif len(matching_incidents[1].accused_name) < len(matching_incidents[0].accused_name):
-        print(
-            f"  Deleting Incident ID: {matching_incidents[1].id}, Accused Name: {matching_incidents[1].accused_name}")
-        deleted = True
-        DBsession.delete(matching_incidents[1])
+def find_duplicates(DBsession):
+    incidents = DBsession.query(Incident.id, Incident.accused_name, Incident.incident_reported_date,
+                                Incident.details, Incident.details_fingerprint).all()
+    print(f'{len(incidents)} incidents checked for duplicates.')
+
+    return plan_merges(incidents)
+
+
+def print_merge_plan(plan):
+    for group in plan:
+        print(f"Incidents {group['incident_ids']} ({', '.join(group['rules'])}): keeping {group['keep']}, "
+              f"deleting {group['delete']}")
+        for split in group['split']:
+            print(f"  Splitting {', '.join(split['names'])} out of incident {split['incident_id']}")
+    print(f"{len(plan)} groups of duplicates, {sum(len(group['delete']) for group in plan)} incidents to delete, "
+          f"{sum(len(split['names']) for group in plan for split in group['split'])} to split out.")
+
+    return
+
+
+def split_value(value, index, count):
+    """The index-th of count comma-separated values, or the whole value if it doesn't have count of them."""
+    if value is None:
+        return None
+    values = [i.strip() for i in value.split(',')]
+
+    return values[index] if len(values) == count else value
+
+
+def split_incident(incident, names):
+    """New incidents for names, who are among the several people incident lists."""
+    all_names = split_accused_names(incident.accused_name)
+    new_incidents = []
+    for name in names:
+        index = all_names.index(name)
+        new_incident = Incident(
+            accused_name=name,
+            accused_age=split_value(incident.accused_age, index, len(all_names)),
+            accused_location=split_value(incident.accused_location, index, len(all_names)),
+            charges=incident.charges,
+            spellchecked_charges=incident.spellchecked_charges,
+            legal_actions=incident.legal_actions,
+            **{column: getattr(incident, column) for column in COPIED_COLUMNS}
+        )
+        new_incidents.append(new_incident)
+
+    return new_incidents
+
+
+def apply_merge_plan(DBsession, plan):
+    """Applies the whole plan in one transaction."""
+    try:
+        for group in plan:
+            for split in group['split']:
+                incident = DBsession.get(Incident, split['incident_id'])
+                DBsession.add_all(split_incident(incident, split['names']))
+            # kept incidents have charges of their own, and split-out ones have theirs extracted by
+            # scrape_charges_from_incidents, since they don't have a charges_extracted_hash yet
+            DBsession.query(Charges).filter(Charges.incident_id.in_(group['delete'])).delete(
+                synchronize_session=False)
+            DBsession.query(Incident).filter(Incident.id.in_(group['delete'])).delete(synchronize_session=False)
         DBsession.commit()
-    else:
-        print('  No deletion criteria met.')
-        deleted = False
+    except Exception:
+        DBsession.rollback()
+        raise
+    print(f"{sum(len(group['delete']) for group in plan)} duplicate incidents deleted.")
 
-    return deleted
+    return
 
 
-def delete_duplicates_by_details_and_name():
+def delete_duplicates_by_details_and_name(environment='prod', dry_run=True):
     """
     Searchs for & deletes duplicate records from the database by comparing the details and accused_name fields.
-    :return:
+    With dry_run, the merge plan is printed but not applied.
     """
-    DBsession, engine = get_database_session(environment='prod')
-
-    normalized_details = func.regexp_replace(Incident.details, '\\s+', ' ', 'g')
-
-    # Query to find potential duplicates based on normalized 'details'
-    potential_duplicates = (DBsession.query(normalized_details, func.count())
-                            .group_by(normalized_details)
-                            .having(func.count() > 1)
-                            .all())
-
-    for duplicate in potential_duplicates:
-        normalized_detail, count = duplicate
-        if count > 1:
-            print(f"Normalized Details: {normalized_detail}, Count: {count}")
-            # Query to find all incidents with these details
-            matching_incidents = DBsession.query(Incident).filter(
-                func.regexp_replace(Incident.details, '\\s+', ' ', 'g') == normalized_detail).all()
-            for incident in matching_incidents:
-                print(f"  Incident ID: {incident.id}, Accused Name: {incident.accused_name}")
-            # if the name is N/A, just move on
-            if matching_incidents[0].accused_name == 'N/A':
-                continue
-            if len(matching_incidents) == 2:
-                # if the names in the matching incidents are the same except for commas, delete the one with commas
-                deleted = delete_one_incident_if_names_are_same_except_for_commas(matching_incidents)
-                if deleted:
-                    continue
-                # if there are 2 names in one incident and 1 name in the other, delete the one with 2 names
-                if ',' in matching_incidents[0].accused_name and ',' not in matching_incidents[1].accused_name:
-                    deleted = delete_one_incident_if_two_exist_for_split_names(DBsession, matching_incidents)
-                elif ',' in matching_incidents[1].accused_name and ',' not in matching_incidents[0].accused_name:
-                    deleted = delete_one_incident_if_two_exist_for_split_names(DBsession, matching_incidents)
-                if deleted:
-                    continue
-                # if the details are the same but there's only one name, delete the one with the shorter name
-                if len(matching_incidents[0].accused_name) < len(matching_incidents[1].accused_name):
-                    # split the names and compare. If they're different, move on.
-                    if matching_incidents[0].accused_name.split()[0] == matching_incidents[1].accused_name.split()[0]:
-                        if matching_incidents[0].accused_name.split()[-1] == matching_incidents[1].accused_name.split()[-1]:
-                            print('Names are the same. Deleting incident with higher ID.')
-                            deleted = delete_one_incident_if_name_is_shorter(DBsession, matching_incidents)
-                        else:
-                            print('Names are different. Not deleting.')
-                    else:
-                        print('Names are different. Not deleting.')
-                if deleted:
-                    continue
-                # if the details & name are the same, delete the one with the higher ID
-                if matching_incidents[0].accused_name == matching_incidents[1].accused_name:
-                    if matching_incidents[0].id > matching_incidents[1].id:
-                        print(
-                            f"  Deleting Incident ID: {matching_incidents[0].id}, Accused Name: {matching_incidents[0].accused_name}")
-                        DBsession.delete(matching_incidents[0])
-                        DBsession.commit()
-                    else:
-                        print(
-                            f"  Deleting Incident ID: {matching_incidents[1].id}, Accused Name: {matching_incidents[1].accused_name}")
-                        DBsession.delete(matching_incidents[1])
-                        DBsession.commit()
-                else:
-                    print('  No deletion criteria met.')
+    DBsession, engine = get_database_session(environment=environment)
+    backfill_details_fingerprints(DBsession)
+    plan = find_duplicates(DBsession)
+    print_merge_plan(plan)
+    if not dry_run:
+        apply_merge_plan(DBsession, plan)
+    DBsession.close()
 
-    return
+    return plan
 
 
-def main():
-    delete_duplicates_by_details_and_name()
+def main(dry_run=True):
+    delete_duplicates_by_details_and_name(dry_run=dry_run)
 
     return
 
 
 if __name__ == '__main__':
-    main()
+    main(dry_run='--apply' not in sys.argv)
@@ -0,0 +1,36 @@
+# re-applies charge_renames.json to every crime in the charges table, e.g. after adding new renames.
+# distinct crimes are normalized in one batch and each changed crime is updated with a single UPDATE.
+from sqlalchemy import update
+
+from database import get_database_session
+from models.charges import Charges
+from police_fire.utilities.charge_normalizer import get_charge_normalizer
+
+
+def renormalize_charge_names(DBsession, substrings=False, dry_run=False):
+    unique_charge_names = [crime for crime, in DBsession.query(Charges.crime).distinct() if crime is not None]
+    normalizer = get_charge_normalizer()
+    normalized_charge_names = normalizer.normalize_many(unique_charge_names, substrings=substrings)
+
+    renames = {charge_name: normalized_charge_name for charge_name, normalized_charge_name
+               in zip(unique_charge_names, normalized_charge_names) if charge_name != normalized_charge_name}
+    for charge_name, normalized_charge_name in renames.items():
+        print(f'{charge_name} -> {normalized_charge_name}')
+        if not dry_run:
+            DBsession.execute(update(Charges).where(Charges.crime == charge_name).values(crime=normalized_charge_name))
+    if not dry_run:
+        DBsession.commit()
+    print(f'{len(unique_charge_names)} unique charge names, {len(renames)} renamed.')
+
+    return renames
+
+
+def main(substrings=False, dry_run=True):
+    DBsession, engine = get_database_session(environment='prod')
+    renormalize_charge_names(DBsession, substrings=substrings, dry_run=dry_run)
+
+    return
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# links incidents and charges to people.  Names that aren't in person_name yet are resolved with
+# police_fire/utilities/person_names.py against the people already saved, and new people are added for the rest.
+# Then incident.person_id and charges.person_id are set with one UPDATE ... FROM person_name each, so the person and
+# recidivism pages join on person_id instead of matching names with LIKE.
+#   python -m police_fire.data_normalization.resolve_people [--rebuild]
+import datetime
+import sys
+
+from sqlalchemy import func, update
+
+from database import get_database_session
+from models.charges import Charges
+from models.incident import Incident
+from models.person import Person
+from models.person_name import PersonName
+from police_fire.utilities.incident_dedup import split_accused_names
+from police_fire.utilities.person_names import parse_name, resolve_names
+
+
+def get_name_counts(DBsession):
+    """Each accused_name of an incident with one accused, and each charged_name, with how often it was used."""
+    name_counts = {}
+    for accused_name, count in DBsession.query(Incident.accused_name, func.count(Incident.id)) \
+            .group_by(Incident.accused_name):
+        if accused_name and len(split_accused_names(accused_name)) == 1:
+            name_counts[accused_name] = name_counts.get(accused_name, 0) + count
+    for charged_name, count in DBsession.query(Charges.charged_name, func.count(Charges.id)) \
+            .group_by(Charges.charged_name):
+        if charged_name:
+            name_counts[charged_name] = name_counts.get(charged_name, 0) + count
+
+    return name_counts
+
+
+def add_people(DBsession, person_keys, canonical_names):
+    """Saves the new people resolve_names made up, and returns their ids by person key."""
+    created_at = datetime.datetime.now()
+    people = {}
+    for person_key, canonical_name in canonical_names.items():
+        parsed_name = parse_name(canonical_name)
+        people[person_key] = Person(
+            canonical_name=canonical_name,
+            first_name=parsed_name['first'],
+            middle_name=parsed_name['middle'],
+            last_name=parsed_name['last'],
+            suffix=parsed_name['suffix'],
+            created_at=created_at,
+        )
+    DBsession.add_all(people.values())
+    DBsession.flush()
+
+    return {person_key: person.id for person_key, person in people.items()}
+
+
+def link_people(DBsession):
+    """Sets person_id on every incident and charge whose name has been resolved."""
+    incidents = DBsession.execute(
+        update(Incident).where(
+            Incident.accused_name == PersonName.name,
+            Incident.person_id.is_distinct_from(PersonName.person_id),
+        ).values(person_id=PersonName.person_id)
+    ).rowcount
+    charges = DBsession.execute(
+        update(Charges).where(
+            Charges.charged_name == PersonName.name,
+            Charges.person_id.is_distinct_from(PersonName.person_id),
+        ).values(person_id=PersonName.person_id)
+    ).rowcount
+    print(f'{incidents} incidents and {charges} charges linked to people.')
+
+    return incidents, charges
+
+
+def resolve_people(DBsession, rebuild=False):
+    try:
+        if rebuild:
+            DBsession.query(Incident).update({Incident.person_id: None}, synchronize_session=False)
+            DBsession.query(Charges).update({Charges.person_id: None}, synchronize_session=False)
+            DBsession.query(PersonName).delete(synchronize_session=False)
+            DBsession.query(Person).delete(synchronize_session=False)
+        name_counts = get_name_counts(DBsession)
+        saved_names = DBsession.query(PersonName.person_id, PersonName.name).all()
+        resolved_names = {name for person_id, name in saved_names}
+        new_names = [name for name in name_counts if name not in resolved_names]
+
+        person_keys, canonical_names = resolve_names(new_names, counts=name_counts, people=saved_names)
+        person_ids = add_people(DBsession, person_keys, canonical_names)
+        DBsession.add_all([
+            PersonName(name=name, person_id=person_ids.get(person_key, person_key))
+            for name, person_key in person_keys.items() if name not in resolved_names
+        ])
+        DBsession.flush()
+        print(f'{len(name_counts)} names, {len(new_names)} new; {len(person_ids)} people added.')
+        link_people(DBsession)
+        DBsession.commit()
+    except Exception:
+        DBsession.rollback()
+        raise
+
+    return
+
+
+def main(environment='prod', rebuild=False):
+    DBsession, engine = get_database_session(environment=environment)
+    resolve_people(DBsession, rebuild=rebuild)
+    DBsession.close()
+
+    return
+
+
+if __name__ == '__main__':
+    main(rebuild='--rebuild' in sys.argv)
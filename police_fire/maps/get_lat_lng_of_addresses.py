@@ -1,28 +1,157 @@
+import datetime
 import os
-from time import sleep
+import re
 
 import requests
 from tqdm import tqdm
 
 from database import get_database_session
+from models.geocode_cache import GeocodeCache
 from models.incident import Incident
 from police_fire.utilities.utilities import get_incident_location_from_details
 
+# addresses the geocoder couldn't find are cached too, but are retried after this many days
+NEGATIVE_RESULT_TTL_DAYS = 30
+# statuses that mean the address itself is bad, as opposed to a quota or key problem that should be retried
+NEGATIVE_STATUSES = ['ZERO_RESULTS', 'INVALID_REQUEST']
 
-def get_lat_lng_of_address(address):
+state_suffix_pattern = re.compile(r'(\s+(new york|ny|n y|usa|united states))+$')
+street_abbreviations = {
+    'street': 'st',
+    'road': 'rd',
+    'avenue': 'ave',
+    'drive': 'dr',
+    'lane': 'ln',
+    'boulevard': 'blvd',
+    'place': 'pl',
+    'court': 'ct',
+    'parkway': 'pkwy',
+    'highway': 'hwy',
+}
+
+
+def normalize_address(address):
+    """Cache key for an address: lowercase, no punctuation, abbreviated street types, no state/country suffix."""
+    if address is None:
+        return None
+    normalized_address = address.lower()
+    normalized_address = re.sub(r'[^a-z0-9 ]', ' ', normalized_address)
+    normalized_address = ' '.join(
+        street_abbreviations.get(word, word) for word in normalized_address.split())
+    normalized_address = state_suffix_pattern.sub('', normalized_address)
+
+    return normalized_address.strip()
+
+
+def google_geocoder(address):
     response = requests.get(
-        f'https://maps.googleapis.com/maps/api/geocode/json?address={address}&key={os.getenv("GOOGLE_MAPS_API_KEY")}')
+        'https://maps.googleapis.com/maps/api/geocode/json',
+        params={'address': address, 'key': os.getenv("GOOGLE_MAPS_API_KEY")})
     resp_json_payload = response.json()
 
     if resp_json_payload['status'] == 'OK':
         lat = resp_json_payload['results'][0]['geometry']['location']['lat']
         lng = resp_json_payload['results'][0]['geometry']['location']['lng']
-        return lat, lng
+        return lat, lng, 'OK'
     else:
         print('get_lat_lng_of_address: ', resp_json_payload['status'])
         with open('get_lat_lng_of_address_errors.txt', 'a') as f:
             f.write(f'{address}\n')
+        return None, None, resp_json_payload['status']
+
+
+def make_stub_geocoder(known_locations):
+    """Offline geocoder for tests. known_locations maps addresses to (lat, lng); anything else is ZERO_RESULTS."""
+    known_locations = {normalize_address(address): lat_lng for address, lat_lng in known_locations.items()}
+    calls = []
+
+    def stub_geocoder(address):
+        calls.append(address)
+        lat_lng = known_locations.get(normalize_address(address))
+        if lat_lng is None:
+            return None, None, 'ZERO_RESULTS'
+        return lat_lng[0], lat_lng[1], 'OK'
+
+    stub_geocoder.calls = calls
+
+    return stub_geocoder
+
+
+def is_geocodable(address):
+    return address is not None and address.strip() not in ['', 'N/A']
+
+
+def cache_entry_is_fresh(cache_entry, now):
+    if cache_entry.lat is not None:
+        return True
+    return cache_entry.updated_at > now - datetime.timedelta(days=NEGATIVE_RESULT_TTL_DAYS)
+
+
+def geocode_addresses(addresses, DBsession, geocoder=None):
+    """
+    Geocodes a whole batch of addresses at once.  Addresses are de-duplicated by their normalized form,
+    looked up in the geocode_cache table with a single query, and only the unique misses are sent to the geocoder.
+    Returns a dict of address -> (lat, lng), with (None, None) for addresses that couldn't be geocoded.
+    """
+    if geocoder is None:
+        geocoder = google_geocoder
+    now = datetime.datetime.now()
+
+    addresses_by_key = {}
+    for address in addresses:
+        if is_geocodable(address):
+            addresses_by_key.setdefault(normalize_address(address), address)
+
+    cache_entries = {}
+    if addresses_by_key:
+        cache_entries = {
+            cache_entry.normalized_address: cache_entry for cache_entry in
+            DBsession.query(GeocodeCache).filter(GeocodeCache.normalized_address.in_(list(addresses_by_key))).all()
+        }
+
+    results_by_key = {}
+    misses = 0
+    for normalized_address, address in addresses_by_key.items():
+        cache_entry = cache_entries.get(normalized_address)
+        if cache_entry and cache_entry_is_fresh(cache_entry, now):
+            results_by_key[normalized_address] = (cache_entry.lat, cache_entry.lng)
+            continue
+
+        misses += 1
+        lat, lng, status = geocoder(address)
+        results_by_key[normalized_address] = (lat, lng)
+        if status != 'OK' and status not in NEGATIVE_STATUSES:
+            # don't cache quota/key errors, they say nothing about the address
+            continue
+        if cache_entry is None:
+            cache_entry = GeocodeCache(normalized_address=normalized_address)
+            DBsession.add(cache_entry)
+        cache_entry.address = address
+        cache_entry.lat = lat
+        cache_entry.lng = lng
+        cache_entry.status = status
+        cache_entry.updated_at = now
+
+    if misses:
+        DBsession.commit()
+    print(f'geocode_addresses: {len(addresses_by_key)} unique addresses, {misses} geocoded, '
+          f'{len(addresses_by_key) - misses} from cache.')
+
+    return {address: results_by_key.get(normalize_address(address), (None, None)) if is_geocodable(address)
+            else (None, None) for address in addresses}
+
+
+def get_lat_lng_of_address(address, DBsession=None, geocoder=None):
+    if not is_geocodable(address):
         return None, None
+    if DBsession is None:
+        # no session to cache in, go straight to the geocoder
+        if geocoder is None:
+            geocoder = google_geocoder
+        lat, lng, status = geocoder(address)
+        return lat, lng
+
+    return geocode_addresses([address], DBsession, geocoder=geocoder)[address]
 
 
 def get_incident_location(DBsession, incident):
@@ -44,24 +173,27 @@ def main():
         f.write('address\n')
     DBsession, engine = get_database_session(environment='prod')
     incidents = DBsession.query(Incident).filter(Incident.incident_location_lat == None,).all()
+    incident_locations = {}
     for incident in tqdm(incidents):
         incident_location = get_incident_location(DBsession, incident)
-        if incident_location.strip() == 'N/A':
+        if not incident_location or incident_location.strip() == 'N/A':
+            print('No incident location found for incident ' + str(incident.id))
             continue
-        if incident_location:
-            print(incident_location)
-            lat_lng = get_lat_lng_of_address(incident_location)
-            if lat_lng:
-                print(lat_lng)
-                incident.incident_location_lat = lat_lng[0]
-                incident.incident_location_lng = lat_lng[1]
-                DBsession.add(incident)
-                DBsession.commit()
-                sleep(1)
-            else:
-                print('No lat/lng found for ' + incident_location)
-        else:
-            print('No incident location found for ' + incident.url)
+        incident_locations[incident.id] = incident_location
+
+    lat_lngs = geocode_addresses(list(incident_locations.values()), DBsession)
+    for incident in incidents:
+        incident_location = incident_locations.get(incident.id)
+        if not incident_location:
+            continue
+        lat, lng = lat_lngs[incident_location]
+        if lat is None:
+            print('No lat/lng found for ' + incident_location)
+            continue
+        incident.incident_location_lat = lat
+        incident.incident_location_lng = lng
+    DBsession.commit()
+
     return
 
 
@@ -5,6 +5,9 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from base import Base
+# incident.person_id and charges.person_id reference person, so create_all needs it in the metadata
+from models.person import Person
+from models.person_name import PersonName
 
 database_username = os.getenv('DATABASE_USERNAME')
 database_password = os.getenv('DATABASE_PASSWORD')
@@ -0,0 +1,53 @@
+# the trimmed main body of Cortland Standard articles.  html_content is the whole prettified page, a few hundred KB
+# of navigation, ads and scripts around a div.main-body of a few KB.  The body is cut out once, with a SoupStrainer
+# so only that div is built into a tree, and stored in article.body_html ('' when there isn't one); the scrapers
+# parse that instead.
+# lxml is used when it's installed, since it parses several times faster than html.parser.
+import importlib.util
+import re
+
+from bs4 import BeautifulSoup, Comment, NavigableString, SoupStrainer
+
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+# a pattern, since newer versions of bs4 match the strainer against the whole class attribute
+MAIN_BODY = SoupStrainer('div', class_=re.compile(r'(^|\s)main-body(\s|$)'))
+
+
+def extract_main_body_html(html_content):
+    """The html of the article's div.main-body, or '' if it doesn't have one."""
+    if not html_content:
+        return ''
+    soup = BeautifulSoup(html_content, HTML_PARSER, parse_only=MAIN_BODY)
+    main_body = soup.find('div', class_='main-body')
+    if main_body is None:
+        return ''
+
+    return str(main_body)
+
+
+def get_article_body_html(article):
+    """
+    The html the scrapers parse.  body_html is cut out of html_content the first time it's needed if the article
+    doesn't have it yet, and html_content is used for articles without a main body.
+    """
+    if article.body_html is None:
+        article.body_html = extract_main_body_html(article.html_content)
+
+    return article.body_html or article.html_content
+
+
+def parse_article_body(article):
+    return BeautifulSoup(get_article_body_html(article), HTML_PARSER)
+
+
+def split_at_br_tags(tag):
+    """The text of tag between its <br> tags, stripped, without parsing each piece again."""
+    segments = ['']
+    for element in tag.descendants:
+        if element.name == 'br':
+            segments.append('')
+        elif isinstance(element, NavigableString) and not isinstance(element, Comment):
+            segments[-1] += element
+
+    return [segment.strip() for segment in segments if segment.strip()]
+
@@ -0,0 +1,191 @@
+# concurrent chat completions for backfills.  Requests run on an AsyncOpenAI client, at most max_concurrency at a
+# time, and are paced by two token buckets, one for requests and one for tokens per minute, so a long run keeps the
+# rate limit busy instead of waiting on one network round trip after another.  429s, 5xx responses and connection
+# errors are retried with exponential backoff and jitter, honoring Retry-After up to MAX_DELAY_SECONDS.  A request
+# gives up its concurrency slot while it backs off, so one rate-limited query doesn't hold up the others.  Responses
+# go through the same on-disk cache as get_response_for_query.
+#
+# limits are read from the environment:
+#   LLM_REQUESTS_PER_MINUTE  - requests started per minute
+#   LLM_TOKENS_PER_MINUTE    - prompt plus completion tokens per minute
+#   LLM_MAX_CONCURRENCY      - requests in flight at once
+import asyncio
+import contextlib
+import os
+import random
+import time
+
+from police_fire.utilities import llm_cache
+from police_fire.utilities.rate_limiting import TokenBucket
+
+DEFAULT_MODEL = 'gpt-4-1106-preview'
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 150000
+DEFAULT_MAX_CONCURRENCY = 16
+MAX_RETRIES = 6
+BASE_DELAY_SECONDS = 1
+MAX_DELAY_SECONDS = 60
+# budgeted for each completion before its real usage is known
+EXPECTED_COMPLETION_TOKENS = 500
+RETRYABLE_STATUS_CODES = [408, 409, 429]
+
+
+def estimate_tokens(query):
+    # about four characters per token for English text
+    return len(query) // 4 + EXPECTED_COMPLETION_TOKENS
+
+
+def is_retryable_error(e):
+    status_code = getattr(e, 'status_code', None)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+    import openai
+    return isinstance(e, (openai.APIConnectionError, ConnectionError, TimeoutError))
+
+
+def get_retry_after(e):
+    """Seconds the server asked us to wait, from the Retry-After header of a rate-limited response, if any."""
+    response = getattr(e, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+
+def get_backoff_delay(attempt, retry_after=None, max_delay=MAX_DELAY_SECONDS):
+    if retry_after is not None:
+        return min(max_delay, max(0, retry_after))
+    delay = min(max_delay, BASE_DELAY_SECONDS * 2 ** attempt)
+    # full jitter, so requests that failed together don't retry together
+    return random.uniform(0, delay)
+
+
+class AsyncLLMClient:
+    def __init__(self, client=None, requests_per_minute=None, tokens_per_minute=None, max_concurrency=None,
+                 max_retries=MAX_RETRIES, sleep=asyncio.sleep):
+        if client is None:
+            from openai import AsyncOpenAI
+            client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        if requests_per_minute is None:
+            requests_per_minute = float(os.getenv('LLM_REQUESTS_PER_MINUTE', DEFAULT_REQUESTS_PER_MINUTE))
+        if tokens_per_minute is None:
+            tokens_per_minute = float(os.getenv('LLM_TOKENS_PER_MINUTE', DEFAULT_TOKENS_PER_MINUTE))
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv('LLM_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY))
+        self.client = client
+        self.request_bucket = TokenBucket(rate=requests_per_minute / 60, capacity=max(1, requests_per_minute / 60))
+        self.token_bucket = TokenBucket(rate=tokens_per_minute / 60, capacity=tokens_per_minute / 60)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.sleep = sleep
+        # every get_responses call runs on this one loop.  The AsyncOpenAI client's connection pool is bound to the
+        # loop it was first used on, so a fresh loop per call would fail on the pooled connections
+        self.loop = None
+        # one entry per API call: latency in seconds, prompt and completion tokens, and the status it ended with
+        self.calls = []
+
+    async def attempt_completion(self, arguments, estimated_tokens, semaphore):
+        # only the request itself holds a concurrency slot, not the backoff before a retry
+        async with semaphore:
+            await self.request_bucket.acquire()
+            await self.token_bucket.acquire(estimated_tokens)
+            start = time.perf_counter()
+            try:
+                return await self.client.chat.completions.create(**arguments), start
+            except Exception as e:
+                self.calls.append({'latency': time.perf_counter() - start, 'prompt_tokens': 0,
+                                   'completion_tokens': 0, 'status': getattr(e, 'status_code', type(e).__name__)})
+                raise
+
+    async def create_completion(self, query, model, json, temperature, semaphore=None):
+        arguments = dict(model=model, messages=[{'role': 'system', 'content': query}], temperature=temperature)
+        if json:
+            arguments['response_format'] = {'type': 'json_object'}
+        estimated_tokens = estimate_tokens(query)
+        if semaphore is None:
+            semaphore = contextlib.nullcontext()
+        for attempt in range(self.max_retries + 1):
+            try:
+                completion, start = await self.attempt_completion(arguments, estimated_tokens, semaphore)
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable_error(e):
+                    raise
+                delay = get_backoff_delay(attempt, get_retry_after(e))
+                print(f"LLM request failed with {getattr(e, 'status_code', type(e).__name__)}.  "
+                      f"Retrying in {delay:.1f}s.")
+                await self.sleep(delay)
+                continue
+
+            usage = getattr(completion, 'usage', None)
+            prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+            completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+            self.calls.append({'latency': time.perf_counter() - start, 'prompt_tokens': prompt_tokens,
+                               'completion_tokens': completion_tokens, 'status': 200})
+            # charge the token budget for whatever the estimate missed
+            if prompt_tokens + completion_tokens > estimated_tokens:
+                self.token_bucket.reserve(prompt_tokens + completion_tokens - estimated_tokens)
+
+            return completion.choices[0].message.content.strip()
+
+    async def get_response(self, query, json=True, model=DEFAULT_MODEL, temperature=0, semaphore=None):
+        response_format = 'json_object' if json else None
+        cache_key = llm_cache.get_cache_key(model, query, response_format, temperature)
+        cached_response = llm_cache.get_cached_response(cache_key)
+        if cached_response is not None:
+            return cached_response
+
+        response = await self.create_completion(query, model, json, temperature, semaphore=semaphore)
+        llm_cache.store_response(cache_key, model, response)
+
+        return response
+
+    async def get_responses_async(self, queries, json=True, model=DEFAULT_MODEL, temperature=0):
+        """Returns one response per query, in order.  A query that fails for good gets its exception instead."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        return await asyncio.gather(
+            *[self.get_response(query, json=json, model=model, temperature=temperature, semaphore=semaphore)
+              for query in queries],
+            return_exceptions=True
+        )
+
+    def get_responses(self, queries, json=True, model=DEFAULT_MODEL, temperature=0):
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+        return self.loop.run_until_complete(
+            self.get_responses_async(queries, json=json, model=model, temperature=temperature))
+
+    def close(self):
+        close_client = getattr(self.client, 'close', None)
+        if self.loop is not None:
+            if close_client is not None:
+                self.loop.run_until_complete(close_client())
+            self.loop.close()
+            self.loop = None
+
+        return
+
+    def get_stats(self):
+        latencies = sorted(call['latency'] for call in self.calls if call['status'] == 200)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else 0
+
+        return {
+            'calls': len(self.calls),
+            'succeeded': len(latencies),
+            'failed': len(self.calls) - len(latencies),
+            'prompt_tokens': sum(call['prompt_tokens'] for call in self.calls),
+            'completion_tokens': sum(call['completion_tokens'] for call in self.calls),
+            'p50_latency': percentile(0.5),
+            'p95_latency': percentile(0.95),
+        }
+
+    def print_stats(self):
+        stats = self.get_stats()
+        print(f"LLM client: {stats['calls']} calls, {stats['succeeded']} succeeded, {stats['failed']} failed, "
+              f"{stats['prompt_tokens']} prompt and {stats['completion_tokens']} completion tokens, "
+              f"latency p50 {stats['p50_latency']:.2f}s, p95 {stats['p95_latency']:.2f}s.")
+
+        return
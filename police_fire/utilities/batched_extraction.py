@@ -0,0 +1,192 @@
+# batched incident extraction: several short Police/Fire articles are packed into one chat completion that returns
+# every incident with its date and location, instead of one completion per article plus follow-up calls for each
+# incident's location and date.  The response is validated per article against a pydantic schema, and only the
+# articles that are missing or invalid are sent again, in smaller batches.
+import datetime
+import json
+import re
+
+from pydantic import BaseModel, ValidationError, field_validator
+
+# articles are packed until the batch has this many characters of article text, or this many articles
+MAX_BATCH_CHARACTERS = 12000
+MAX_BATCH_ARTICLES = 8
+MAX_RETRIES = 2
+
+date_formatted_pattern = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+extraction_stats = {'api_calls': 0, 'articles': 0, 'articles_failed': 0, 'articles_retried': 0, 'incidents': 0}
+
+
+class ExtractedIncident(BaseModel):
+    accused_name: str
+    accused_age: str = 'N/A'
+    accused_location: str = 'N/A'
+    charges: str = 'N/A'
+    details: str = 'N/A'
+    legal_actions: str = 'N/A'
+    incident_date: str | None = None
+    incident_location: str | None = None
+
+    @field_validator('accused_age', 'accused_location', 'charges', 'details', 'legal_actions', mode='before')
+    @classmethod
+    def to_string(cls, value):
+        # ages come back as numbers and charges as lists often enough that they're coerced instead of retried
+        if value is None:
+            return 'N/A'
+        if isinstance(value, list):
+            return ', '.join(str(item) for item in value)
+        return str(value)
+
+    @field_validator('incident_date', mode='before')
+    @classmethod
+    def to_date_or_none(cls, value):
+        if isinstance(value, str) and date_formatted_pattern.match(value.strip()):
+            try:
+                return datetime.date.fromisoformat(value.strip()).isoformat()
+            except ValueError:
+                return None
+        return None
+
+    @field_validator('incident_location', mode='before')
+    @classmethod
+    def to_location_or_none(cls, value):
+        if not isinstance(value, str) or value.strip() in ['', 'N/A']:
+            return None
+        return value.strip()
+
+
+class ArticleExtraction(BaseModel):
+    article_id: int
+    incidents: list[ExtractedIncident]
+
+
+def get_batch_query(articles, attempt=0):
+    query = (
+        "Each article below is a Police/Fire report, introduced by a line like ARTICLE 12 (published 2022-10-28). "
+        "List every incident in every article.  Respond with JSON of the form "
+        '{"articles": [{"article_id": 12, "incidents": [{"accused_name": "", "accused_age": "", '
+        '"accused_location": "", "charges": "", "details": "", "legal_actions": "", "incident_date": "", '
+        '"incident_location": ""}]}]}. '
+        "Include every article_id exactly once; if an article is not about a crime, its incidents list is empty. "
+        "Use the original language of the article and strings for every value, with N/A when a value isn't given. "
+        "incident_date is the date the incident happened as YYYY-MM-DD, worked out from the published date when the "
+        "article gives a weekday or a month and day.  incident_location is the address, city and state (full name, "
+        "not abbreviation) where the incident happened.  accused_location is where the accused lives.\n"
+    )
+    if attempt:
+        # also keeps a retry from being answered with the cached invalid response
+        query += f"Attempt {attempt + 1}: an earlier response left these articles out or didn't match the format.\n"
+    for article in articles:
+        query += f'\nARTICLE {article.id} (published {article.date_published}):\n{article.content}\n'
+
+    return query
+
+
+def pack_articles(articles, max_characters=MAX_BATCH_CHARACTERS, max_articles=MAX_BATCH_ARTICLES):
+    """Groups articles into batches in order.  An article longer than max_characters gets a batch of its own."""
+    batches = []
+    batch = []
+    batch_characters = 0
+    for article in articles:
+        characters = len(article.content or '')
+        if batch and (batch_characters + characters > max_characters or len(batch) >= max_articles):
+            batches.append(batch)
+            batch = []
+            batch_characters = 0
+        batch.append(article)
+        batch_characters += characters
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+def parse_batch_response(response, article_ids):
+    """Returns ({article_id: [ExtractedIncident]}, [article_ids that are missing or failed validation])."""
+    try:
+        articles = json.loads(response).get('articles')
+    except (json.JSONDecodeError, AttributeError):
+        return {}, list(article_ids)
+    if not isinstance(articles, list):
+        return {}, list(article_ids)
+
+    extracted = {}
+    for article in articles:
+        try:
+            extraction = ArticleExtraction.model_validate(article)
+        except ValidationError as e:
+            print(f'Invalid extraction: {e}')
+            continue
+        if extraction.article_id in article_ids:
+            extracted[extraction.article_id] = [incident for incident in extraction.incidents
+                                                if incident.accused_name not in ['', 'N/A']]
+
+    return extracted, [article_id for article_id in article_ids if article_id not in extracted]
+
+
+def get_responses_one_at_a_time(queries, get_response=None):
+    if get_response is None:
+        from police_fire.utilities.utilities import get_response_for_query as get_response
+    responses = []
+    for query in queries:
+        try:
+            responses.append(get_response(query))
+        except Exception as e:
+            responses.append(e)
+
+    return responses
+
+
+def extract_incidents(articles, get_response=None, get_responses=None, max_characters=MAX_BATCH_CHARACTERS,
+                      max_articles=MAX_BATCH_ARTICLES, max_retries=MAX_RETRIES):
+    """
+    Returns ({article_id: [ExtractedIncident]}, [articles that still failed after max_retries]).  Failed articles are
+    retried in batches half the size of the last attempt, so a bad article ends up on its own.
+
+    get_responses takes a list of queries and returns their responses, or exceptions, in order; pass
+    AsyncLLMClient().get_responses to send each attempt's batches concurrently.  Otherwise they're sent one at a time
+    with get_response, which defaults to get_response_for_query.
+    """
+    if get_responses is None:
+        def get_responses(queries):
+            return get_responses_one_at_a_time(queries, get_response=get_response)
+
+    extracted = {}
+    pending = list(articles)
+    extraction_stats['articles'] += len(pending)
+    for attempt in range(max_retries + 1):
+        failed = []
+        batches = pack_articles(pending, max_characters=max_characters, max_articles=max_articles)
+        responses = get_responses([get_batch_query(batch, attempt=attempt) for batch in batches])
+        extraction_stats['api_calls'] += len(batches)
+        for batch, response in zip(batches, responses):
+            article_ids = [article.id for article in batch]
+            if isinstance(response, Exception):
+                print(f'Extraction request failed: {response}')
+                batch_extracted, failed_article_ids = {}, article_ids
+            else:
+                batch_extracted, failed_article_ids = parse_batch_response(response, article_ids)
+            extracted.update(batch_extracted)
+            failed.extend(article for article in batch if article.id in failed_article_ids)
+        if not failed:
+            break
+        if attempt < max_retries:
+            extraction_stats['articles_retried'] += len(failed)
+        pending = failed
+        max_articles = max(1, max_articles // 2)
+
+    extraction_stats['articles_failed'] += len(failed)
+    extraction_stats['incidents'] += sum(len(incidents) for incidents in extracted.values())
+
+    return extracted, failed
+
+
+def print_extraction_stats():
+    incidents = extraction_stats['incidents']
+    calls_per_incident = extraction_stats['api_calls'] / incidents if incidents else 0
+    print(f"Batched extraction: {extraction_stats['articles']} articles, {incidents} incidents in "
+          f"{extraction_stats['api_calls']} API calls ({calls_per_incident:.2f} per incident), "
+          f"{extraction_stats['articles_retried']} retried, {extraction_stats['articles_failed']} failed.")
+
+    return
@@ -0,0 +1,217 @@
+# rule-based parser for blotters with labeled fields:
+#   Accused: Julie M. Conners, 34, of Cold Brook Road, Homer
+#   Charges: Driving while intoxicated, a misdemeanor
+#   Details: Cortland County sheriff's officers found Conners' vehicle ...
+#   Legal actions: Conners was ticketed to appear Nov. 27 in Cortlandville Town Court.
+# article html in either the <strong> or the <br> layout is first flattened to text, with a line break for each
+# <br> and a blank line between paragraphs, so both layouts and the OCR text of PDF pages are parsed the same way:
+# a field runs from its label to the next label or the end of the paragraph.
+import re
+from html.parser import HTMLParser
+
+FIELDS = {
+    'accused': 'accused',
+    'charges': 'charges',
+    'charged': 'charges',
+    'charge': 'charges',
+    'details': 'details',
+    'legal action': 'legal_actions',
+    'legal actions': 'legal_actions',
+}
+BLOCK_TAGS = ['p', 'div', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote']
+
+label_pattern = re.compile(r'\b(Accused|Charges|Charged|Charge|Details|Legal [Aa]ctions?)\s*:')
+paragraph_break_pattern = re.compile(r'\n[ \t\xa0]*\n')
+whitespace_pattern = re.compile(r'\s+')
+
+
+class BlotterTextParser(HTMLParser):
+    """Collects the text of an article, and separately the text of its main body if it has one."""
+
+    def __init__(self):
+        super().__init__()
+        self.text = []
+        self.body_text = []
+        self.div_depth = 0
+        self.body_depth = None
+        self.skip_depth = 0
+
+    def append(self, text):
+        self.text.append(text)
+        if self.body_depth is not None:
+            self.body_text.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ['script', 'style']:
+            self.skip_depth += 1
+        elif tag == 'br':
+            self.append('\n')
+        elif tag in BLOCK_TAGS:
+            self.append('\n\n')
+        if tag == 'div':
+            self.div_depth += 1
+            if self.body_depth is None and 'main-body' in (dict(attrs).get('class') or ''):
+                self.body_depth = self.div_depth
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == 'br':
+            self.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in ['script', 'style']:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.append('\n\n')
+        if tag == 'div':
+            if self.body_depth == self.div_depth:
+                self.body_depth = None
+            self.div_depth -= 1
+
+    def handle_data(self, data):
+        # whitespace in html, newlines included, is just a space; only tags break lines
+        if not self.skip_depth:
+            self.append(whitespace_pattern.sub(' ', data))
+
+
+def html_to_text(html):
+    parser = BlotterTextParser()
+    parser.feed(html)
+    parser.close()
+
+    return ''.join(parser.body_text or parser.text)
+
+
+def get_field_value(text):
+    # a value can start on the line after its label, as when the label is in a <strong> of its own
+    text = text.lstrip()
+    match = paragraph_break_pattern.search(text)
+    if match:
+        text = text[:match.start()]
+
+    return ' '.join(text.split())
+
+
+def parse_blotter_text(text):
+    """
+    Returns a dict with accused, charges, details and legal_actions for each 'Accused:' in text.  Fields that
+    aren't found are None.
+    """
+    records = []
+    labels = list(label_pattern.finditer(text))
+    for index, label in enumerate(labels):
+        field = FIELDS[label.group(1).lower()]
+        end = labels[index + 1].start() if index + 1 < len(labels) else len(text)
+        value = get_field_value(text[label.end():end])
+        if field == 'accused':
+            records.append({'accused': value, 'charges': None, 'details': None, 'legal_actions': None})
+        elif records and records[-1][field] is None:
+            records[-1][field] = value
+
+    return records
+
+
+def parse_blotter_html(html):
+    return parse_blotter_text(html_to_text(html))
+
+
+def is_complete(record):
+    return all(record[field] for field in ['accused', 'charges', 'details'])
+
+
+def parse_accused(accused_str):
+    """Splits 'Julie M. Conners, 34, of Cold Brook Road, Homer' into lists of names, ages and locations."""
+    accused_str = accused_str.replace(': ', '')
+    if ', Jr' in accused_str:
+        accused_str = accused_str.replace(', Jr.', ' Jr.')
+    if ', Sr' in accused_str:
+        accused_str = accused_str.replace(', Sr.', ' Sr.')
+
+    if ' and ' in accused_str:
+        accused_str = accused_str.replace(' and ', ';')
+
+    if ';' in accused_str:
+        # '; and ' between two people leaves an empty part behind
+        accused_people = [i for i in accused_str.split(';') if i.strip()]
+        accused_names = []
+        accused_ages = []
+        accused_locations = []
+        for accused_person in accused_people:
+            accused_name = accused_person.split(',')[0].strip().split(' of ')[0].strip()
+            try:
+                accused_age = accused_person.split(',')[1].strip()
+            except IndexError:
+                accused_age = None
+            # if accused_age isn't a digit, it's probably a location
+            if accused_age and not accused_age.isdigit():
+                accused_age = None
+
+            if ' of ' in accused_name:
+                accused_location = accused_person.split(' of ')[1]
+            elif accused_age:
+                accused_location_index = 2
+                accused_location = None
+            else:
+                accused_location_index = 1
+                accused_location = None
+
+            if not accused_location:
+                try:
+                    accused_location = ', '.join(
+                        [i.strip() for i in accused_person.split(',')[accused_location_index:]])
+                    if accused_location[-1] == '.':
+                        accused_location = accused_location[:-1]
+                    if accused_location.startswith('of '):
+                        accused_location = accused_location[3:]
+                except IndexError:
+                    if accused_location.strip() == '':
+                        accused_location = None
+                    else:
+                        raise IndexError('accused_location was incorrectly formatted.')
+
+            if accused_name is None:
+                accused_name = 'N/A'
+            if accused_age is None:
+                accused_age = 'N/A'
+            if accused_location is None:
+                accused_location = 'N/A'
+
+            accused_names.append(accused_name)
+            accused_ages.append(accused_age)
+            accused_locations.append(accused_location)
+    else:
+        accused_name = accused_str.split(',')[0].strip().split(' of ')[0].strip()
+        try:
+            accused_age = accused_str.split(',')[1].strip()
+        except IndexError:
+            accused_age = None
+        # if accused_age isn't a digit, it's probably a location
+        if accused_age and not accused_age.isdigit():
+            accused_age = None
+
+        if ' of ' in accused_name:
+            accused_location = accused_name.split(' of ')[1]
+        elif accused_age:
+            accused_location_index = 2
+            accused_location = None
+        else:
+            accused_location_index = 1
+            accused_location = None
+
+        if not accused_location:
+            try:
+                accused_location = ', '.join([i.strip() for i in accused_str.split(',')[accused_location_index:]])
+                if accused_location[-1] == '.':
+                    accused_location = accused_location[:-1]
+                if accused_location.startswith('of '):
+                    accused_location = accused_location[3:]
+            except IndexError:
+                if accused_location.strip() == '':
+                    accused_location = None
+                else:
+                    raise IndexError('accused_location was incorrectly formatted.')
+
+        accused_names = [accused_name]
+        accused_ages = [accused_age]
+        accused_locations = [accused_location]
+
+    return accused_names, accused_ages, accused_locations
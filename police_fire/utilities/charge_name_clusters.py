@@ -0,0 +1,57 @@
+# clusters the crime names in the charges table around canonical names.  Similarities are scored with rapidfuzz's
+# cdist, a block of crimes against every canonical candidate at a time in native code, instead of a
+# process.extract per crime.  Crimes are taken most common first, and each one joins the most similar canonical name
+# that scores at least SIMILARITY_THRESHOLD, or becomes a canonical name itself.  Canonical names already saved in
+# charge_name_cluster are passed in as canonical_crimes, so new crimes are matched against them incrementally.
+import numpy as np
+from rapidfuzz import fuzz, process, utils
+
+# token_sort_ratio, unlike WRatio, doesn't score 'harassment' and 'aggravated harassment' as a match
+SIMILARITY_THRESHOLD = 90
+CHUNK_SIZE = 500
+
+
+def get_similarities(crimes, choices):
+    """Yields (index into crimes, scores against every choice), CHUNK_SIZE crimes per cdist call."""
+    for start in range(0, len(crimes), CHUNK_SIZE):
+        scores = process.cdist(crimes[start:start + CHUNK_SIZE], choices, scorer=fuzz.token_sort_ratio,
+                               processor=utils.default_process, dtype=np.uint8, workers=-1)
+        for offset, row in enumerate(scores):
+            yield start + offset, row
+
+
+def cluster_crimes(crimes, counts=None, canonical_crimes=(), threshold=SIMILARITY_THRESHOLD):
+    """
+    Returns {crime: (canonical crime, similarity)} for crimes.  counts, {crime: number of charges}, decides which
+    crime of a cluster is its canonical name; without it crimes are taken in the order given.
+    """
+    canonical_crimes = list(canonical_crimes)
+    saved_crimes = set(canonical_crimes)
+    crimes = [crime for crime in dict.fromkeys(crimes) if crime not in saved_crimes]
+    if counts is not None:
+        crimes.sort(key=lambda crime: -counts.get(crime, 0))
+    choices = canonical_crimes + crimes
+    is_canonical = np.zeros(len(choices), dtype=bool)
+    is_canonical[:len(canonical_crimes)] = True
+
+    clusters = {}
+    for index, scores in get_similarities(crimes, choices):
+        position = len(canonical_crimes) + index
+        candidate_scores = np.where(is_canonical, scores, 0)
+        best = int(candidate_scores.argmax())
+        if candidate_scores[best] >= threshold:
+            clusters[crimes[index]] = (choices[best], int(candidate_scores[best]))
+        else:
+            is_canonical[position] = True
+            clusters[crimes[index]] = (crimes[index], 100)
+
+    return clusters
+
+
+def get_cluster_members(clusters):
+    """{canonical crime: [crimes]} for the clusters with more than one crime."""
+    members = {}
+    for crime, (canonical_crime, similarity) in clusters.items():
+        members.setdefault(canonical_crime, []).append(crime)
+
+    return {canonical_crime: crimes for canonical_crime, crimes in members.items() if len(crimes) > 1}
@@ -0,0 +1,134 @@
+# canonical names for charge descriptions.  The mapping lives in charge_renames.json and is loaded once; whole
+# descriptions are looked up in a dict and known descriptions inside longer strings are found with an Aho-Corasick
+# automaton, so each string is scanned once no matter how many names there are.
+import json
+import os
+from collections import deque
+
+CHARGE_RENAMES_PATH = os.path.join(os.path.dirname(__file__), 'charge_renames.json')
+
+
+class AhoCorasick:
+    def __init__(self, patterns):
+        # goto[state] maps a character to the next state; output[state] is the longest pattern ending at state
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]
+        for pattern in patterns:
+            self.add(pattern)
+        self.build()
+
+    def add(self, pattern):
+        state = 0
+        for character in pattern:
+            if character not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.goto[state][character] = len(self.goto) - 1
+            state = self.goto[state][character]
+        self.output[state] = pattern
+
+    def build(self):
+        states = deque(self.goto[0].values())
+        while states:
+            state = states.popleft()
+            for character, next_state in self.goto[state].items():
+                states.append(next_state)
+                fail_state = self.fail[state]
+                while fail_state and character not in self.goto[fail_state]:
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.goto[fail_state].get(character, 0)
+                if self.output[next_state] is None:
+                    self.output[next_state] = self.output[self.fail[next_state]]
+
+    def find_all(self, text):
+        """Yields (start, end, pattern) for every occurrence of every pattern in text."""
+        state = 0
+        for index, character in enumerate(text):
+            while state and character not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(character, 0)
+            output_state = state
+            while output_state:
+                pattern = self.output[output_state]
+                if pattern is None:
+                    break
+                yield index + 1 - len(pattern), index + 1, pattern
+                # shorter patterns ending here are reachable through the failure links
+                output_state = self.fail[output_state]
+                while output_state and self.output[output_state] == pattern:
+                    output_state = self.fail[output_state]
+
+
+def is_word_boundary(text, start, end):
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+class ChargeNormalizer:
+    def __init__(self, renames):
+        self.renames = renames
+        self.automaton = AhoCorasick(renames)
+        # descriptions that didn't match, for reviewing and adding to charge_renames.json
+        self.unmatched = set()
+
+    def normalize(self, charge_description):
+        """Returns the canonical name for a whole charge description, or the description unchanged."""
+        stripped_description = charge_description.strip()
+        if stripped_description in self.renames:
+            return self.renames[stripped_description]
+        self.unmatched.add(stripped_description)
+
+        return charge_description
+
+    def canonicalize_substrings(self, text):
+        """Replaces every known charge description inside text, preferring the leftmost, then longest, match."""
+        matches = sorted(
+            (start, -end, pattern) for start, end, pattern in self.automaton.find_all(text)
+            if is_word_boundary(text, start, end)
+        )
+        canonicalized = []
+        position = 0
+        for start, negative_end, pattern in matches:
+            if start < position:
+                continue
+            canonicalized.append(text[position:start])
+            canonicalized.append(self.renames[pattern])
+            position = -negative_end
+        canonicalized.append(text[position:])
+
+        return ''.join(canonicalized)
+
+    def normalize_many(self, charge_descriptions, substrings=False):
+        """Normalizes a list of descriptions, looking each distinct description up only once."""
+        normalize = self.canonicalize_substrings if substrings else self.normalize
+        normalized = {}
+        for charge_description in charge_descriptions:
+            if charge_description is not None and charge_description not in normalized:
+                normalized[charge_description] = normalize(charge_description)
+
+        return [normalized.get(charge_description) for charge_description in charge_descriptions]
+
+
+def load_charge_renames(path=CHARGE_RENAMES_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+_charge_normalizer = None
+
+
+def get_charge_normalizer():
+    global _charge_normalizer
+    if _charge_normalizer is None:
+        _charge_normalizer = ChargeNormalizer(load_charge_renames())
+
+    return _charge_normalizer
+
+
+def normalize_charge(charge_description):
+    return get_charge_normalizer().normalize(charge_description)
+
+
+def normalize_many(charge_descriptions, substrings=False):
+    return get_charge_normalizer().normalize_many(charge_descriptions, substrings=substrings)
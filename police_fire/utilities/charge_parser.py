@@ -0,0 +1,211 @@
+# single-pass parser for incident charge strings such as
+#   'Two counts of third-degree burglary, felonies; Smith was charged with petit larceny, a misdemeanor.'
+# the string is tokenized once with one compiled pattern.  Charges are then read off the token list: the text before
+# each class word (felony, misdemeanor, violation, infraction) is split on commas, 'and' and semicolons into single
+# charges, and each charge's count, degree and named defendant are taken from its tokens.
+import re
+
+from police_fire.utilities.charge_normalizer import normalize_charge
+
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+}
+ORDINAL_WORDS = {
+    'first': 1, 'second': 2, 'third': 3, 'fourth': 4, 'fifth': 5,
+    'sixth': 6, 'seventh': 7, 'eighth': 8, 'ninth': 9, 'tenth': 10,
+}
+# names used in 'X was charged with' that mean every accused person was charged
+EVERYONE = ['each', 'all', 'both']
+
+token_pattern = re.compile(r'''
+    (?P<charge_class>(?i:felonies|felony|misdemeanors|misdemeanor|midemeanor|misdemean-or|traffic\ infractions?
+        |traffic\ violations|violations|a?\ ?violation|infractions?))
+    |(?P<named>(?P<name>\w+)\ (?i:was|were)\ (?i:charged\ with)\ )
+    |(?P<counts>(?P<count>\w+)[-\ ](?i:counts?)\b(?:\ of\b)?)
+    |(?P<degree>(?i:(?P<ordinal>first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth)[-\ ]degree))
+    |(?P<dollars>\$\d+(?:,\d{3})+)
+    |(?P<and>(?<=\ )and\ )
+    |(?P<comma>,)
+    |(?P<semicolon>;)
+    |(?P<parenthetical>\([^)]*\)?|\))
+    |(?P<word>\w+|\s+|.)
+''', re.VERBOSE | re.DOTALL)
+
+
+def get_charge_class(class_word):
+    # stored in charges.charge_class as the plural names scrape_charges_from_incidents has always used
+    class_word = class_word.lower()
+    if 'felon' in class_word:
+        return 'felonies'
+    if 'demean' in class_word:
+        return 'misdemeanors'
+    if 'violation' in class_word:
+        return 'violations'
+
+    return 'traffic_infraction'
+
+
+def tokenize(charges):
+    """Returns a list of (kind, text, value) tuples covering the whole string."""
+    tokens = []
+    for match in token_pattern.finditer(charges):
+        kind = match.lastgroup
+        text = match.group()
+        value = None
+        if kind == 'charge_class':
+            value = get_charge_class(text)
+        elif kind == 'named':
+            value = match.group('name')
+        elif kind == 'counts':
+            count = match.group('count')
+            value = int(count) if count.isdigit() else NUMBER_WORDS.get(count.lower(), 1)
+        elif kind == 'degree':
+            value = ORDINAL_WORDS[match.group('ordinal').lower()]
+        elif kind == 'dollars':
+            # '$1,000' is one amount, not two charges
+            kind, text = 'word', text.replace(',', '')
+        tokens.append((kind, text, value))
+
+    return tokens
+
+
+def split_tokens(tokens, separators):
+    parts = [[]]
+    for token in tokens:
+        if token[0] in separators:
+            parts.append([])
+        else:
+            parts[-1].append(token)
+
+    return [part for part in parts if part]
+
+
+def tokens_to_text(tokens):
+    return ''.join(text for kind, text, value in tokens).strip()
+
+
+def is_separator(token):
+    return token[0] == 'comma' or token[1].strip() in ['', '–', '-']
+
+
+def strip_segment(tokens):
+    # ', a misdemeanor' and ', all misdemeanors' leave a dangling ', a' or ', all' in front of the class word
+    end = len(tokens)
+    while end and is_separator(tokens[end - 1]):
+        end -= 1
+    if end and tokens[end - 1][0] == 'word' and tokens[end - 1][1].lower() in ['a', 'all']:
+        article_end = end - 1
+        while article_end and not tokens[article_end - 1][1].strip():
+            article_end -= 1
+        if article_end == 0 or is_separator(tokens[article_end - 1]):
+            end = article_end
+            while end and is_separator(tokens[end - 1]):
+                end -= 1
+
+    start = 0
+    while start < end and (tokens[start][0] == 'semicolon' or is_separator(tokens[start])):
+        start += 1
+
+    return tokens[start:end]
+
+
+def get_segments(tokens):
+    """Yields (charge_class, tokens) for the text before each class word."""
+    segment = []
+    found_class = False
+    for token in tokens:
+        if token[0] == 'charge_class':
+            found_class = True
+            yield token[2], strip_segment(segment)
+            segment = []
+        else:
+            segment.append(token)
+    if not found_class:
+        yield 'uncategorized', segment
+
+    return
+
+
+def is_charged(named_defendant, accused_name):
+    if named_defendant is None or named_defendant.lower() in EVERYONE:
+        return True
+
+    return named_defendant.lower() == accused_name.split()[-1].lower()
+
+
+def parse_charge(tokens, charge_class, accused_name):
+    named_defendant = None
+    counts = 1
+    degree = None
+    crime_tokens = []
+    for kind, text, value in tokens:
+        if kind == 'named':
+            named_defendant = value
+        elif kind == 'counts':
+            counts = value
+        elif kind == 'degree' and degree is None:
+            degree = value
+        elif kind != 'parenthetical':
+            crime_tokens.append(text)
+    if tokens and tokens[0][0] == 'word' and tokens[0][1] == 'All':
+        named_defendant = 'all'
+
+    crime = ' '.join(''.join(crime_tokens).split()).strip(' .-_')
+    if crime.lower().startswith('of '):
+        crime = crime[3:]
+    if not crime:
+        return None
+    crime = normalize_charge(crime[0].upper() + crime[1:])
+    if crime == 'N/A':
+        return None
+
+    return {
+        'charge_description': tokens_to_text(tokens),
+        'crime': crime,
+        'charge_class': charge_class,
+        'degree': degree,
+        'counts': counts,
+        'charged_name': accused_name,
+        'named_defendant': named_defendant,
+    }
+
+
+def split_segment(tokens):
+    """Splits the text before a class word into single charges on commas, 'and' and semicolons."""
+    # renames are applied to the whole segment, then to each comma-separated part, then to each crime, because some
+    # renames chain ('Failure to obey traffic device' -> 'Failure to obey a traffic control device' -> ...).
+    # a known description like 'speed not reasonable and prudent' is renamed before it can be split on 'and'.
+    segment_text = tokens_to_text(tokens)
+    renamed_text = normalize_charge(segment_text)
+    if renamed_text != segment_text:
+        tokens = tokenize(renamed_text)
+
+    charges = []
+    for part in split_tokens(tokens, ['comma']):
+        part_text = tokens_to_text(part)
+        renamed_text = normalize_charge(part_text)
+        if renamed_text != part_text:
+            part = tokenize(renamed_text)
+        charges.extend(split_tokens(part, ['and', 'semicolon']))
+
+    return charges
+
+
+def parse_charges(charges, accused_name):
+    """
+    Returns one dict per charge with the charge_description, crime, charge_class, degree, counts and charged_name
+    columns of the charges table, plus the named_defendant from 'X was charged with', if any.  Charges naming
+    someone other than accused_name are left out.
+    """
+    if not charges:
+        return []
+    records = []
+    for charge_class, segment in get_segments(tokenize(charges)):
+        for charge_tokens in split_segment(segment):
+            record = parse_charge(charge_tokens, charge_class, accused_name)
+            if record is None or not is_charged(record['named_defendant'], accused_name):
+                continue
+            records.append(record)
+
+    return records
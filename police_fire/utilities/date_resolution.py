@@ -0,0 +1,111 @@
+# resolves the incident date referenced in an incident's details ("Monday", "yesterday", "on Oct. 9", ...)
+# relative to the date the article was published, without asking the LLM.
+import datetime
+import re
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+MONTHS = {
+    'january': 1, 'jan': 1,
+    'february': 2, 'feb': 2,
+    'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4,
+    'may': 5,
+    'june': 6, 'jun': 6,
+    'july': 7, 'jul': 7,
+    'august': 8, 'aug': 8,
+    'september': 9, 'sept': 9, 'sep': 9,
+    'october': 10, 'oct': 10,
+    'november': 11, 'nov': 11,
+    'december': 12, 'dec': 12,
+}
+
+weekday_pattern = re.compile(r'\b(' + '|'.join(WEEKDAYS) + r')\b')
+# month names are matched case-sensitively so that e.g. 'may 3' in 'may 3 people' isn't read as a date
+month_day_pattern = re.compile(
+    r'\b(January|February|March|April|May|June|July|August|September|October|November|December|'
+    r'Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sept|Sep|Oct|Nov|Dec)\.? (\d{1,2})(?:st|nd|rd|th)?\b(?:,? (\d{4})\b)?'
+)
+yesterday_pattern = re.compile(r'\b(yesterday|last night)\b', re.IGNORECASE)
+today_pattern = re.compile(r'\b(today|this morning|this afternoon|tonight)\b', re.IGNORECASE)
+last_week_pattern = re.compile(r'\blast week\b', re.IGNORECASE)
+iso_date_pattern = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+
+
+def to_date(value):
+    """Accepts a date, datetime or 'YYYY-MM-DD' string (the pdf scraper uses unpadded 'YYYY-M-D')."""
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    match = iso_date_pattern.match(str(value).strip())
+    if not match:
+        raise ValueError(f'Could not parse date: {value}')
+    year, month, day = match.groups()
+
+    return datetime.date(int(year), int(month), int(day))
+
+
+def get_last_weekday_before(day_of_week, date):
+    """Returns the most recent day_of_week strictly before date."""
+    date = to_date(date)
+    days_back = (date.weekday() - WEEKDAYS.index(day_of_week.capitalize())) % 7
+    if days_back == 0:
+        days_back = 7
+
+    return date - datetime.timedelta(days=days_back)
+
+
+def resolve_month_day_date(details_str, article_date):
+    """'on Oct. 9' -> the most recent Oct. 9 on or before the article date, unless a year is given."""
+    if not details_str:
+        return None
+    match = month_day_pattern.search(details_str)
+    if not match:
+        return None
+    article_date = to_date(article_date)
+    month_str, day_str, year_str = match.groups()
+    month = MONTHS[month_str.lower()]
+    day = int(day_str)
+    year = int(year_str) if year_str else article_date.year
+    try:
+        resolved_date = datetime.date(year, month, day)
+    except ValueError:
+        return None
+    if not year_str and resolved_date > article_date:
+        # a December incident reported in a January article happened the year before
+        try:
+            resolved_date = datetime.date(year - 1, month, day)
+        except ValueError:
+            return None
+
+    return resolved_date
+
+
+def resolve_relative_date(details_str, article_date):
+    """Resolves 'yesterday', 'today', weekday names and 'last week' against the article date."""
+    if not details_str:
+        return None
+    article_date = to_date(article_date)
+    if yesterday_pattern.search(details_str):
+        return article_date - datetime.timedelta(days=1)
+    if today_pattern.search(details_str):
+        return article_date
+    weekday_match = weekday_pattern.search(details_str)
+    if weekday_match:
+        return get_last_weekday_before(weekday_match.group(1), article_date)
+    if last_week_pattern.search(details_str):
+        return article_date - datetime.timedelta(days=7)
+
+    return None
+
+
+def resolve_incident_date(details_str, article_date):
+    """Returns the incident date as a datetime.date, or None if the details don't reference a date we can parse."""
+    resolved_date = resolve_month_day_date(details_str, article_date)
+    if resolved_date:
+        return resolved_date
+
+    return resolve_relative_date(details_str, article_date)
@@ -0,0 +1,112 @@
+# incident locations from details, without the LLM.  Streets are found by their suffix ('Riley Road', '14 Main St.')
+# or as state routes and I-81, and the municipality from the Cortland County places in cortland_county_gazetteer.json,
+# or from the agency that responded ('city police' means the city of Cortland).  Locations come back in the same
+# 'street, municipality, state' form get_incident_location_from_details asks the LLM for.
+import json
+import os
+import re
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), 'cortland_county_gazetteer.json')
+
+STREET_SUFFIXES = ['Street', 'St.', 'Avenue', 'Ave.', 'Road', 'Rd.', 'Drive', 'Dr.', 'Lane', 'Place', 'Terrace',
+                   'Boulevard', 'Way', 'Court', 'Parkway', 'Circle', 'Highway', 'Extension', 'Alley', 'Trail']
+# '... Court' that is a courtroom, not a street
+COURT_WORDS = ['Town', 'City', 'Village', 'County', 'Family', 'Supreme', 'Justice', 'Drug', 'Treatment']
+# capitalized at the start of a sentence, but not part of the street name
+LEADING_WORDS = ['On', 'At', 'In', 'Near', 'Along', 'From', 'To', 'The', 'Monday', 'Tuesday', 'Wednesday',
+                 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+route_pattern = re.compile(r"\b(?:(?:State|County|U\.S\.|US)\s+)?Route\s+\d+[A-Z]?\b|\bInterstate\s+81\b|\bI-81\b")
+
+
+class Gazetteer:
+    def __init__(self, gazetteer):
+        self.state = gazetteer['state']
+        self.municipalities = {}
+        for municipality, aliases in gazetteer['municipalities'].items():
+            self.municipalities[municipality.lower()] = municipality
+            for alias in aliases:
+                self.municipalities[alias.lower()] = municipality
+        self.agencies = {agency.lower(): municipality for agency, municipality in gazetteer['agencies'].items()}
+
+        streets_without_suffix = '|'.join(re.escape(street) for street in gazetteer['streets_without_suffix'])
+        suffixes = '|'.join(re.escape(suffix).replace(r'\.', r'\.?') for suffix in STREET_SUFFIXES)
+        self.street_pattern = re.compile(
+            r"\b(?:\d+[A-Za-z]?\s+)?(?:(?:North|South|East|West|N\.|S\.|E\.|W\.)\s+)?"
+            rf"(?:(?:[A-Z][\w'’.-]*\s+){{1,3}}(?:{suffixes})(?![\w-])|(?:{streets_without_suffix})\b)"
+        )
+        names = sorted(self.municipalities, key=len, reverse=True)
+        # a place name followed by one of these is an agency, a court or the county, not where the incident was
+        self.municipality_pattern = re.compile(
+            r'\b(' + '|'.join(re.escape(name) for name in names) + r')\b'
+            r'(?!\s+(?:County|Standard|Town Court|City Court|Village Court|[Pp]olice|Sheriff|Fire))',
+            re.IGNORECASE
+        )
+        self.agency_pattern = re.compile(r'\b(' + '|'.join(re.escape(agency) for agency in self.agencies) + r')\b',
+                                         re.IGNORECASE)
+
+    def find_street(self, details):
+        """Returns (street, start, end), or (None, 0, 0)."""
+        for match in self.street_pattern.finditer(details):
+            words = match.group().split()
+            if words[-1] == 'Court' and words[-2] in COURT_WORDS:
+                continue
+            start = match.start()
+            while len(words) > 2 and words[0] in LEADING_WORDS:
+                start = details.index(words[1], start + len(words[0]))
+                words = words[1:]
+            return ' '.join(words).rstrip('.'), start, match.end()
+        match = route_pattern.search(details)
+        if match:
+            return match.group(), match.start(), match.end()
+
+        return None, 0, 0
+
+    def find_municipality(self, details, street_start=0, street_end=0):
+        """The first place named after the street, else the first one named anywhere, else the agency's."""
+        # a place named in the street, as in 'Homer Avenue', doesn't count
+        matches = [match for match in self.municipality_pattern.finditer(details)
+                   if match.end() <= street_start or match.start() >= street_end]
+        for match in matches:
+            if match.start() >= street_end:
+                return self.municipalities[match.group(1).lower()]
+        if matches:
+            return self.municipalities[matches[0].group(1).lower()]
+        match = self.agency_pattern.search(details)
+        if match:
+            return self.agencies[match.group(1).lower()]
+
+        return None
+
+    def get_incident_location(self, details):
+        """Returns 'street, municipality, state', or 'municipality, state', or None if neither can be found."""
+        if not details:
+            return None
+        street, street_start, street_end = self.find_street(details)
+        municipality = self.find_municipality(details, street_start, street_end)
+        if municipality is None:
+            return None
+        if street is None:
+            return f'{municipality}, {self.state}'
+
+        return f'{street}, {municipality}, {self.state}'
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+_gazetteer = None
+
+
+def get_gazetteer():
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer(load_gazetteer())
+
+    return _gazetteer
+
+
+def get_incident_location(details):
+    return get_gazetteer().get_incident_location(details)
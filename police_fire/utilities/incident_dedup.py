@@ -0,0 +1,204 @@
+# finds duplicate incidents and plans how to merge them.  Incidents are only compared within blocks: the same
+# details_fingerprint (the md5 of their whitespace- and case-normalized details), or the same accused last name
+# reported in the same week.  A pair is a duplicate if its details match, or are nearly the same, and its names
+# pass the rules fix_database_duplicates has always used:
+#   - the names are the same, or the same except for commas ('John Smith, Jr.' and 'John Smith Jr.')
+#   - one incident lists several people, one of them the other incident's accused
+#   - the names have the same first and last name ('John Smith' and 'John A. Smith')
+# duplicates are grouped, of any size, and each group gets one incident per person: the one without commas, then
+# with the longest name, then the oldest.  Incidents listing several people are split into one incident for each
+# person no other incident in the group already has.
+import datetime
+import difflib
+import re
+
+from models.details_fingerprint import normalize_details
+
+NAME_SUFFIXES = ['Jr.', 'Sr.', 'Jr', 'Sr', 'II', 'III', 'IV', 'V']
+# details that differ by no more than a rescrape or a re-typed word
+SIMILAR_DETAILS_RATIO = 0.9
+
+name_separator_pattern = re.compile(r'[,;]')
+
+
+def split_accused_names(accused_name):
+    """'John Smith, Jr.,Jane Doe' -> ['John Smith Jr.', 'Jane Doe']"""
+    names = []
+    for part in name_separator_pattern.split(accused_name or ''):
+        part = part.strip()
+        if not part:
+            continue
+        if part in NAME_SUFFIXES and names:
+            names[-1] = f'{names[-1]} {part}'
+        else:
+            names.append(part)
+
+    return names
+
+
+def get_last_name(name):
+    split_name = name.split()
+    if len(split_name) > 1 and split_name[-1] in NAME_SUFFIXES:
+        return split_name[-2]
+
+    return split_name[-1] if split_name else ''
+
+
+def get_person_key(name):
+    """First and last name, so 'John Smith' and 'John A. Smith Jr.' are the same person."""
+    split_name = name.split()
+    if not split_name:
+        return None
+
+    return split_name[0].lower(), get_last_name(name).lower()
+
+
+def get_reported_week(reported_date):
+    if not isinstance(reported_date, datetime.date):
+        return None
+
+    return reported_date - datetime.timedelta(days=reported_date.weekday())
+
+
+def is_valid_name(accused_name):
+    return bool(accused_name) and accused_name.strip() not in ['N/A', '']
+
+
+def block_incidents(incidents):
+    """Pairs of incident ids that share a fingerprint, or a last name and reported week."""
+    blocks = {}
+    for incident in incidents:
+        if not is_valid_name(incident.accused_name):
+            continue
+        if incident.details_fingerprint:
+            blocks.setdefault(('details', incident.details_fingerprint), []).append(incident.id)
+        week = get_reported_week(incident.incident_reported_date)
+        if week is None:
+            continue
+        for last_name in {get_last_name(name).lower() for name in split_accused_names(incident.accused_name)}:
+            blocks.setdefault(('name', last_name, week), []).append(incident.id)
+
+    pairs = set()
+    for incident_ids in blocks.values():
+        for index, incident_id in enumerate(incident_ids):
+            for other_id in incident_ids[index + 1:]:
+                if incident_id != other_id:
+                    pairs.add((min(incident_id, other_id), max(incident_id, other_id)))
+
+    return pairs
+
+
+def details_match(incident, other):
+    if incident.details_fingerprint and incident.details_fingerprint == other.details_fingerprint:
+        return True
+    if not incident.details or not other.details:
+        return False
+    matcher = difflib.SequenceMatcher(None, normalize_details(incident.details), normalize_details(other.details),
+                                      autojunk=False)
+
+    return matcher.quick_ratio() >= SIMILAR_DETAILS_RATIO and matcher.ratio() >= SIMILAR_DETAILS_RATIO
+
+
+def get_duplicate_rule(incident, other):
+    """The name rule that makes the two incidents duplicates, or None if they aren't."""
+    if not details_match(incident, other):
+        return None
+    if incident.accused_name == other.accused_name:
+        return 'same name'
+    if incident.accused_name.replace(',', '') == other.accused_name.replace(',', ''):
+        return 'same name except for commas'
+    names = split_accused_names(incident.accused_name)
+    other_names = split_accused_names(other.accused_name)
+    if len(names) == 1 and len(other_names) == 1:
+        if get_person_key(names[0]) == get_person_key(other_names[0]):
+            return 'same first and last name'
+        return None
+    person_keys = {get_person_key(name) for name in names}
+    other_person_keys = {get_person_key(name) for name in other_names}
+    if person_keys & other_person_keys:
+        return 'several accused'
+
+    return None
+
+
+def group_duplicates(incidents, pairs):
+    """Groups of incidents joined by duplicate pairs, with the rules that joined them."""
+    incidents_by_id = {incident.id: incident for incident in incidents}
+    parents = {}
+
+    def find(incident_id):
+        parents.setdefault(incident_id, incident_id)
+        while parents[incident_id] != incident_id:
+            parents[incident_id] = parents[parents[incident_id]]
+            incident_id = parents[incident_id]
+        return incident_id
+
+    rules = {}
+    for incident_id, other_id in sorted(pairs):
+        rule = get_duplicate_rule(incidents_by_id[incident_id], incidents_by_id[other_id])
+        if rule is None:
+            continue
+        parents[find(other_id)] = find(incident_id)
+        rules.setdefault((incident_id, other_id), rule)
+
+    groups = {}
+    for incident_id in parents:
+        groups.setdefault(find(incident_id), []).append(incidents_by_id[incident_id])
+    group_rules = {}
+    for (incident_id, other_id), rule in rules.items():
+        group_rules.setdefault(find(incident_id), set()).add(rule)
+
+    return [(sorted(group, key=lambda incident: incident.id), sorted(group_rules[root]))
+            for root, group in groups.items() if len(group) > 1]
+
+
+def get_keep_order(incident):
+    return ',' in incident.accused_name, -len(incident.accused_name), incident.id
+
+
+def plan_group(group, rules):
+    """
+    Returns {'incident_ids', 'rules', 'keep', 'delete', 'split'}, where split is a list of
+    {'incident_id', 'names'} for incidents listing several people, some of whom no other incident has.
+    """
+    single = [incident for incident in group if len(split_accused_names(incident.accused_name)) == 1]
+    several = [incident for incident in group if len(split_accused_names(incident.accused_name)) > 1]
+
+    keep = []
+    kept_person_keys = set()
+    for incident in sorted(single, key=get_keep_order):
+        person_key = get_person_key(split_accused_names(incident.accused_name)[0])
+        if person_key not in kept_person_keys:
+            kept_person_keys.add(person_key)
+            keep.append(incident.id)
+
+    if not keep:
+        # every incident lists several people, so one of the lists is kept as it is
+        kept = min(several, key=get_keep_order)
+        keep.append(kept.id)
+        kept_person_keys.update(get_person_key(name) for name in split_accused_names(kept.accused_name))
+
+    split = []
+    for incident in several:
+        if incident.id in keep:
+            continue
+        names = [name for name in split_accused_names(incident.accused_name)
+                 if get_person_key(name) not in kept_person_keys]
+        kept_person_keys.update(get_person_key(name) for name in names)
+        if names:
+            split.append({'incident_id': incident.id, 'names': names})
+
+    return {
+        'incident_ids': [incident.id for incident in group],
+        'rules': rules,
+        'keep': sorted(keep),
+        'delete': [incident.id for incident in group if incident.id not in keep],
+        'split': split,
+    }
+
+
+def plan_merges(incidents):
+    """incidents need id, accused_name, incident_reported_date, details and details_fingerprint."""
+    pairs = block_incidents(incidents)
+
+    return [plan_group(group, rules) for group, rules in group_duplicates(incidents, pairs)]
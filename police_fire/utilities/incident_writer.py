@@ -0,0 +1,214 @@
+# buffers the incidents and charges scraped from an article and writes them in one transaction.
+# duplicates are resolved with one lookup query per flush instead of a count() per row, the remaining rows are
+# inserted with a single INSERT ... ON CONFLICT DO NOTHING, and a failure part-way through an article rolls back
+# everything buffered for it instead of leaving a half-scraped article behind.
+import hashlib
+import re
+
+from sqlalchemy import func, update
+from sqlalchemy.dialects.postgresql import insert
+
+from models.article import Article
+from models.charges import Charges
+from models.details_fingerprint import get_details_fingerprint
+from models.incident import Incident
+from police_fire.utilities.date_resolution import to_date
+
+CHARGE_KEY_COLUMNS = ('charge_description', 'crime', 'charge_class', 'degree', 'charged_name', 'counts',
+                      'incident_id')
+DATE_COLUMNS = ('incident_date', 'incident_reported_date')
+
+date_formatted_pattern = re.compile(r'^\d{4}-\d{1,2}-\d{1,2}$')
+
+
+def clean_incident_row(row):
+    """LLM responses sometimes put 'N/A' or prose in date fields, which would fail the whole batch."""
+    for column in DATE_COLUMNS:
+        value = row.get(column)
+        if isinstance(value, str) and not date_formatted_pattern.match(value.strip()):
+            print(f'{column} was not date-formatted: {value}.  Not saving it.')
+            row[column] = None
+
+    return row
+
+
+def key_value(column, value):
+    # dates come back from the database as date objects but are scraped as 'YYYY-MM-DD' or 'YYYY-M-D' strings
+    if value is not None and column in DATE_COLUMNS:
+        try:
+            return to_date(value).isoformat()
+        except ValueError:
+            pass
+    return str(value)
+
+
+def fill_missing_columns(rows):
+    # a multi-row INSERT needs every row to have the same columns
+    columns = set()
+    for row in rows:
+        columns.update(row.keys())
+
+    return [{column: row.get(column) for column in columns} for row in rows]
+
+
+class IncidentWriter:
+    def __init__(self, DBsession, commit_every=1):
+        self.DBsession = DBsession
+        # number of articles (or incidents, for charge extraction) to buffer before committing
+        self.commit_every = commit_every
+        self.pending_incidents = []
+        self.pending_charges = []
+        self.pending_scraped_article_ids = []
+        self.articles_since_commit = 0
+        self.stats = {'incidents_inserted': 0, 'incidents_updated': 0, 'incidents_skipped': 0,
+                      'charges_inserted': 0, 'charges_skipped': 0, 'commits': 0}
+
+    def add_incident(self, row, dedup_on=('accused_name', 'incident_reported_date'), update_on_duplicate=()):
+        """
+        Buffers an incident.  An existing incident with the same values for the dedup_on columns counts as a
+        duplicate; its update_on_duplicate columns are updated with any non-null values from row.
+        """
+        self.pending_incidents.append((clean_incident_row(dict(row)), tuple(dedup_on), tuple(update_on_duplicate)))
+
+        return
+
+    def add_charge(self, row):
+        self.pending_charges.append(dict(row))
+
+        return
+
+    def mark_article_scraped(self, article_id):
+        self.pending_scraped_article_ids.append(article_id)
+
+        return
+
+    def finish_article(self):
+        self.articles_since_commit += 1
+        if self.articles_since_commit >= self.commit_every:
+            self.commit()
+
+        return
+
+    def get_existing_incidents(self, dedup_on, rows):
+        query = self.DBsession.query(Incident.id, *[getattr(Incident, column) for column in dedup_on])
+        for column in dedup_on:
+            values = {row[column] for row in rows if row.get(column) is not None}
+            if column == 'details':
+                # details are too long for a btree; ix_incident_details_md5 indexes their hash instead
+                hashes = {hashlib.md5(value.encode('utf-8')).hexdigest() for value in values}
+                query = query.filter(func.md5(Incident.details).in_(hashes), Incident.details.in_(values))
+            else:
+                query = query.filter(getattr(Incident, column).in_(values))
+
+        return {tuple(key_value(column, value) for column, value in zip(dedup_on, existing[1:])): existing[0]
+                for existing in query}
+
+    def flush_incidents(self):
+        rows_by_dedup_on = {}
+        for row, dedup_on, update_on_duplicate in self.pending_incidents:
+            rows_by_dedup_on.setdefault(dedup_on, []).append((row, update_on_duplicate))
+
+        new_rows = []
+        updates = []
+        for dedup_on, rows in rows_by_dedup_on.items():
+            existing_incidents = self.get_existing_incidents(dedup_on, [row for row, _ in rows])
+            seen_keys = set()
+            for row, update_on_duplicate in rows:
+                key = tuple(key_value(column, row.get(column)) for column in dedup_on)
+                if key in existing_incidents:
+                    values = {column: row[column] for column in update_on_duplicate if row.get(column) is not None}
+                    if values:
+                        values['id'] = existing_incidents[key]
+                        updates.append(values)
+                    else:
+                        self.stats['incidents_skipped'] += 1
+                    continue
+                if key in seen_keys:
+                    # the same incident was scraped twice from this batch
+                    self.stats['incidents_skipped'] += 1
+                    continue
+                seen_keys.add(key)
+                # core inserts skip the ORM event that sets it on Incident objects
+                row['details_fingerprint'] = get_details_fingerprint(row.get('details'))
+                new_rows.append(row)
+
+        if new_rows:
+            # rows ON CONFLICT DO NOTHING dropped aren't in the rowcount
+            inserted = self.DBsession.execute(
+                insert(Incident).values(fill_missing_columns(new_rows)).on_conflict_do_nothing()).rowcount
+            self.stats['incidents_inserted'] += inserted
+            self.stats['incidents_skipped'] += len(new_rows) - inserted
+        for values in updates:
+            self.DBsession.execute(update(Incident).where(Incident.id == values.pop('id')).values(**values))
+        self.stats['incidents_updated'] += len(updates)
+        self.pending_incidents = []
+
+        return
+
+    def flush_charges(self):
+        incident_ids = {row['incident_id'] for row in self.pending_charges}
+        existing_charges = {
+            tuple(existing) for existing in self.DBsession.query(
+                *[getattr(Charges, column) for column in CHARGE_KEY_COLUMNS]
+            ).filter(Charges.incident_id.in_(incident_ids))
+        }
+
+        new_rows = []
+        for row in self.pending_charges:
+            key = tuple(row.get(column) for column in CHARGE_KEY_COLUMNS)
+            if key in existing_charges:
+                self.stats['charges_skipped'] += 1
+                continue
+            existing_charges.add(key)
+            new_rows.append(row)
+
+        if new_rows:
+            inserted = self.DBsession.execute(
+                insert(Charges).values(fill_missing_columns(new_rows)).on_conflict_do_nothing()).rowcount
+            self.stats['charges_inserted'] += inserted
+            self.stats['charges_skipped'] += len(new_rows) - inserted
+        self.pending_charges = []
+
+        return
+
+    def flush(self):
+        if self.pending_incidents:
+            self.flush_incidents()
+        if self.pending_charges:
+            self.flush_charges()
+        if self.pending_scraped_article_ids:
+            self.DBsession.execute(
+                update(Article).where(Article.id.in_(self.pending_scraped_article_ids)).values(incidents_scraped=True))
+            self.pending_scraped_article_ids = []
+
+        return
+
+    def commit(self):
+        try:
+            self.flush()
+            self.DBsession.commit()
+        except Exception:
+            print('Error writing buffered incidents.  Rolling back.')
+            self.rollback()
+            raise
+        self.articles_since_commit = 0
+        self.stats['commits'] += 1
+
+        return
+
+    def rollback(self):
+        self.pending_incidents = []
+        self.pending_charges = []
+        self.pending_scraped_article_ids = []
+        self.articles_since_commit = 0
+        self.DBsession.rollback()
+
+        return
+
+    def print_stats(self):
+        print(f"IncidentWriter: {self.stats['incidents_inserted']} incidents inserted, "
+              f"{self.stats['incidents_updated']} updated, {self.stats['incidents_skipped']} skipped; "
+              f"{self.stats['charges_inserted']} charges inserted, {self.stats['charges_skipped']} skipped; "
+              f"{self.stats['commits']} commits.")
+
+        return
@@ -0,0 +1,179 @@
+# on-disk, content-addressed cache for the chat completions sent through get_response_for_query.
+# re-running the scrapers over articles/pdfs that have already been processed sends the exact same prompts,
+# so the responses are stored in a sqlite file keyed by a hash of everything that affects the completion.
+#
+# configuration is read from the environment:
+#   LLM_CACHE_PATH          - location of the sqlite file
+#   LLM_CACHE_MODE          - 'readwrite' (default), 'replay' (read-only, misses raise) or 'off'
+#   LLM_CACHE_MAX_ENTRIES   - entries kept after eviction, least recently used are dropped first
+#   LLM_CACHE_MAX_AGE_DAYS  - entries not used for longer than this are dropped
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cortland_scraper', 'llm_cache.sqlite3')
+DEFAULT_MAX_ENTRIES = 250000
+DEFAULT_MAX_AGE_DAYS = 365
+# run eviction after this many new entries have been written
+EVICT_EVERY_N_WRITES = 500
+
+cache_stats = {'hits': 0, 'misses': 0, 'writes': 0, 'evictions': 0}
+
+_connections = {}
+_writes_since_eviction = 0
+
+
+class LLMCacheMissError(Exception):
+    """Raised in replay mode when a query has no cached response."""
+    pass
+
+
+def get_cache_path():
+    return os.getenv('LLM_CACHE_PATH', DEFAULT_CACHE_PATH)
+
+
+def get_cache_mode():
+    mode = os.getenv('LLM_CACHE_MODE', 'readwrite').lower()
+    if mode not in ['readwrite', 'replay', 'off']:
+        print(f'Unknown LLM_CACHE_MODE {mode}.  Defaulting to readwrite.')
+        mode = 'readwrite'
+    return mode
+
+
+def get_cache_key(model, query, response_format, temperature):
+    payload = json.dumps({
+        'model': model,
+        'query': query,
+        'response_format': response_format,
+        'temperature': temperature,
+    }, sort_keys=True)
+
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_connection(cache_path=None):
+    if cache_path is None:
+        cache_path = get_cache_path()
+    connection = _connections.get(cache_path)
+    if connection is None:
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        connection = sqlite3.connect(cache_path, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS llm_response ('
+            ' cache_key TEXT PRIMARY KEY,'
+            ' model TEXT,'
+            ' response TEXT NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' last_used_at REAL NOT NULL)'
+        )
+        connection.execute('CREATE INDEX IF NOT EXISTS ix_llm_response_last_used_at ON llm_response (last_used_at)')
+        connection.commit()
+        _connections[cache_path] = connection
+
+    return connection
+
+
+def close_connections():
+    for connection in _connections.values():
+        connection.close()
+    _connections.clear()
+
+    return
+
+
+def get_cached_response(cache_key, cache_path=None, mode=None):
+    """Return the cached response for cache_key, or None on a miss.
+
+    In replay mode a miss raises LLMCacheMissError instead, so that a replayed run never reaches the API.
+    """
+    if mode is None:
+        mode = get_cache_mode()
+    if mode == 'off':
+        return None
+
+    connection = get_connection(cache_path)
+    row = connection.execute('SELECT response FROM llm_response WHERE cache_key = ?', (cache_key,)).fetchone()
+    if row is None:
+        cache_stats['misses'] += 1
+        if mode == 'replay':
+            raise LLMCacheMissError(f'No cached response for {cache_key} in replay mode.')
+        return None
+
+    cache_stats['hits'] += 1
+    if mode == 'readwrite':
+        connection.execute('UPDATE llm_response SET last_used_at = ? WHERE cache_key = ?', (time.time(), cache_key))
+        connection.commit()
+
+    return row[0]
+
+
+def store_response(cache_key, model, response, cache_path=None, mode=None):
+    global _writes_since_eviction
+    if mode is None:
+        mode = get_cache_mode()
+    if mode != 'readwrite':
+        return
+
+    now = time.time()
+    connection = get_connection(cache_path)
+    connection.execute(
+        'INSERT OR REPLACE INTO llm_response (cache_key, model, response, created_at, last_used_at) '
+        'VALUES (?, ?, ?, ?, ?)',
+        (cache_key, model, response, now, now)
+    )
+    connection.commit()
+    cache_stats['writes'] += 1
+
+    _writes_since_eviction += 1
+    if _writes_since_eviction >= EVICT_EVERY_N_WRITES:
+        evict(cache_path=cache_path)
+        _writes_since_eviction = 0
+
+    return
+
+
+def evict(max_entries=None, max_age_days=None, cache_path=None):
+    """Drop entries unused for longer than max_age_days, then the least recently used beyond max_entries."""
+    if max_entries is None:
+        max_entries = int(os.getenv('LLM_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+    if max_age_days is None:
+        max_age_days = float(os.getenv('LLM_CACHE_MAX_AGE_DAYS', DEFAULT_MAX_AGE_DAYS))
+
+    connection = get_connection(cache_path)
+    oldest_allowed = time.time() - max_age_days * 24 * 60 * 60
+    evicted = connection.execute('DELETE FROM llm_response WHERE last_used_at < ?', (oldest_allowed,)).rowcount
+    evicted += connection.execute(
+        'DELETE FROM llm_response WHERE cache_key IN ('
+        ' SELECT cache_key FROM llm_response ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)',
+        (max_entries,)
+    ).rowcount
+    connection.commit()
+    cache_stats['evictions'] += evicted
+
+    return evicted
+
+
+def get_cache_size(cache_path=None):
+    connection = get_connection(cache_path)
+    return connection.execute('SELECT count(*) FROM llm_response').fetchone()[0]
+
+
+def reset_cache_stats():
+    for key in cache_stats:
+        cache_stats[key] = 0
+
+    return
+
+
+def print_cache_stats():
+    lookups = cache_stats['hits'] + cache_stats['misses']
+    hit_rate = cache_stats['hits'] / lookups if lookups else 0
+    print(f"LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses ({hit_rate:.0%} hit rate), "
+          f"{cache_stats['writes']} writes, {cache_stats['evictions']} evictions.")
+
+    return
@@ -0,0 +1,183 @@
+# resolves accused and charged names to people.  Names are parsed into first, middle, last and suffix ('Smith, John
+# A. Jr.' and 'John A Smith, Jr' are the same parse), then only compared within blocks that share the soundex of the
+# last name and the first letter of the first name, or the first three letters of both.  Two parses are the same
+# person if their last names sound and are spelled nearly the same, one first name is the other or starts with it ('Chris' and
+# 'Christopher'), and their middle initials and suffixes don't conflict, with every name already joined to either.
+# People already saved are passed in with their names, so new names join them instead of starting over.
+import difflib
+import re
+
+NAME_SUFFIXES = {'jr': 'Jr.', 'sr': 'Sr.', 'ii': 'II', 'iii': 'III', 'iv': 'IV', 'v': 'V'}
+# for last names that sound the same, so a misspelling like 'Hynes' for 'Hines' still matches
+SIMILAR_LAST_NAME_RATIO = 0.8
+SOUNDEX_CODES = {letter: str(code) for code, letters in enumerate(
+    ['aeiouy', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r']) for letter in letters}
+
+nickname_pattern = re.compile(r'["“”(][^"“”)]*["“”)]')
+token_pattern = re.compile(r"[A-Za-z][A-Za-z'’-]*")
+
+
+def get_tokens(text):
+    return [token.replace('’', "'") for token in token_pattern.findall(text)]
+
+
+def capitalize(token):
+    return token.capitalize() if token.islower() else token
+
+
+def parse_name(name):
+    """Returns {'first', 'middle', 'last', 'suffix'}, or None for names that aren't a first and last name."""
+    name = nickname_pattern.sub(' ', name or '')
+    parts = [part for part in name.split(',') if part.strip()]
+    suffix = None
+    if len(parts) > 1 and get_tokens(parts[-1]) and get_tokens(parts[-1])[0].lower() in NAME_SUFFIXES \
+            and len(get_tokens(parts[-1])) == 1:
+        suffix = NAME_SUFFIXES[get_tokens(parts[-1])[0].lower()]
+        parts = parts[:-1]
+    if len(parts) == 2 and len(get_tokens(parts[0])) == 1:
+        # 'Smith, John A. Jr.'
+        tokens = get_tokens(parts[1])
+        last_name = get_tokens(parts[0])
+    elif len(parts) == 1:
+        tokens = get_tokens(parts[0])
+        last_name = []
+    else:
+        return None
+    if len(tokens) + len(last_name) > 2 and tokens[-1].lower() in NAME_SUFFIXES:
+        suffix = NAME_SUFFIXES[tokens[-1].lower()]
+        tokens = tokens[:-1]
+    tokens += last_name
+    # 'N/A' and bare initials
+    if len(tokens) < 2 or len(tokens[-1]) < 2:
+        return None
+
+    return {
+        'first': capitalize(tokens[0]),
+        'middle': ' '.join(capitalize(token) for token in tokens[1:-1]) or None,
+        'last': capitalize(tokens[-1]),
+        'suffix': suffix,
+    }
+
+
+def format_name(parsed_name):
+    first, middle = parsed_name['first'], parsed_name['middle']
+    if len(first) == 1:
+        first += '.'
+    if middle and len(middle) == 1:
+        middle += '.'
+
+    return ' '.join(part for part in [first, middle, parsed_name['last'], parsed_name['suffix']] if part)
+
+
+def soundex(word):
+    word = re.sub('[^a-z]', '', word.lower())
+    if not word:
+        return ''
+    codes = [SOUNDEX_CODES.get(letter, '') for letter in word]
+    encoded = word[0].upper()
+    previous = codes[0]
+    for letter, code in zip(word[1:], codes[1:]):
+        if code and code != '0' and code != previous:
+            encoded += code
+        # h and w don't separate letters with the same code, vowels do
+        if letter not in 'hw':
+            previous = code
+
+    return (encoded + '000')[:4]
+
+
+def get_blocking_keys(parsed_name):
+    first = parsed_name['first'].lower()
+    last = parsed_name['last'].lower()
+
+    return [('soundex', soundex(last), first[0]), ('trigram', last[:3], first[:3])]
+
+
+def get_middle_initial(parsed_name):
+    return parsed_name['middle'][0].lower() if parsed_name['middle'] else None
+
+
+def is_same_person(parsed_name, other):
+    last, other_last = parsed_name['last'].lower(), other['last'].lower()
+    if last != other_last and (soundex(last) != soundex(other_last) or
+                               difflib.SequenceMatcher(None, last, other_last).ratio() < SIMILAR_LAST_NAME_RATIO):
+        return False
+    first, other_first = parsed_name['first'].lower(), other['first'].lower()
+    if not (first.startswith(other_first) or other_first.startswith(first)):
+        return False
+    if min(len(first), len(other_first)) < 3 and first != other_first:
+        return False
+    middle, other_middle = get_middle_initial(parsed_name), get_middle_initial(other)
+    if middle and other_middle and middle != other_middle:
+        return False
+    if parsed_name['suffix'] and other['suffix'] and parsed_name['suffix'] != other['suffix']:
+        return False
+
+    return True
+
+
+def get_canonical_name(parsed_names, counts):
+    """The most common way a person's name was written, the most complete one on a tie."""
+    return max(parsed_names, key=lambda name: (counts.get(name, 0), bool(parsed_names[name]['middle']),
+                                               bool(parsed_names[name]['suffix']), name))
+
+
+def resolve_names(names, counts=None, people=()):
+    """
+    Returns ({name: person key}, {new person key: canonical name}).  people are (person id, name) pairs for the
+    people already saved, one for each of their names, and keep their ids as keys; new people are numbered -1, -2,
+    ...  Names that can't be parsed aren't resolved.
+    """
+    counts = counts or {}
+    parsed_names = {}
+    clusters = {}
+    for person_id, name in people:
+        parsed_name = parse_name(name)
+        if parsed_name is not None:
+            parsed_names[name] = parsed_name
+            clusters.setdefault(('person', person_id), []).append(name)
+    person_roots = {name: root for root, members in clusters.items() for name in members}
+    for name in dict.fromkeys(names):
+        parsed_name = parse_name(name)
+        if parsed_name is not None and name not in parsed_names:
+            parsed_names[name] = parsed_name
+            clusters[name] = [name]
+    roots = {name: person_roots.get(name, name) for name in parsed_names}
+
+    blocks = {}
+    for name, parsed_name in parsed_names.items():
+        for blocking_key in get_blocking_keys(parsed_name):
+            blocks.setdefault(blocking_key, []).append(name)
+
+    for names_in_block in blocks.values():
+        for index, name in enumerate(names_in_block):
+            for other in names_in_block[index + 1:]:
+                root, other_root = roots[name], roots[other]
+                # saved people aren't merged with each other
+                if root == other_root or (isinstance(root, tuple) and isinstance(other_root, tuple)):
+                    continue
+                # every name of one has to be the same person as every name of the other, so 'John A. Smith' and
+                # 'John B. Smith' aren't joined through 'John Smith'
+                if all(is_same_person(parsed_names[a], parsed_names[b])
+                       for a in clusters[root] for b in clusters[other_root]):
+                    if not isinstance(root, tuple):
+                        root, other_root = other_root, root
+                    for member in clusters[other_root]:
+                        roots[member] = root
+                    clusters[root].extend(clusters.pop(other_root))
+
+    person_keys = {}
+    canonical_names = {}
+    new_person_key = 0
+    for root, members in clusters.items():
+        if isinstance(root, tuple):
+            person_key = root[1]
+        else:
+            new_person_key -= 1
+            person_key = new_person_key
+            canonical_names[person_key] = format_name(
+                parsed_names[get_canonical_name({name: parsed_names[name] for name in members}, counts)])
+        for name in members:
+            person_keys[name] = person_key
+
+    return person_keys, canonical_names
@@ -0,0 +1,48 @@
+# token-bucket rate limiter shared by the article fetchers and the LLM client.
+# tokens refill continuously at `rate` per second up to `capacity`; callers wait until enough tokens are available.
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep, async_sleep=asyncio.sleep):
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0.')
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        # clock and the sleeps can be replaced in tests
+        self.sleep = sleep
+        self.async_sleep = async_sleep
+        self.tokens = capacity
+        self.last_refill = clock()
+        self.lock = threading.Lock()
+
+    def refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def reserve(self, tokens=1):
+        """Takes `tokens` from the bucket and returns how many seconds the caller must wait before using them."""
+        with self.lock:
+            self.refill()
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def wait(self, tokens=1):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            self.sleep(delay)
+
+        return
+
+    async def acquire(self, tokens=1):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await self.async_sleep(delay)
+
+        return
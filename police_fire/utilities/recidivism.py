@@ -0,0 +1,67 @@
+# recidivism rates from per-offender timelines.  An offender is a person resolve_people linked the incident to, or the
+# normalized accused_name of an unlinked incident with one accused.  Each of an offender's incidents is stored in
+# offense_timeline with the days to their next incident, so a new incident only rewrites that offender's rows.  An
+# offender reoffended within a threshold if any of their gaps is at most that many days; the smallest gap of each
+# offender is sorted once, and each threshold is answered with a binary search instead of refiltering every incident.
+import bisect
+
+from police_fire.utilities.incident_dedup import is_valid_name, split_accused_names
+
+RECIDIVISM_THRESHOLDS = [30, 60, 180, 365, 1000, 10000]
+
+
+def get_offender_key(person_id, accused_name):
+    """'person:<id>', 'name:<normalized accused_name>', or None for incidents with no name or several accused."""
+    if person_id is not None:
+        return f'person:{person_id}'
+    if not is_valid_name(accused_name):
+        return None
+    names = split_accused_names(accused_name)
+    if len(names) != 1:
+        return None
+
+    return 'name:' + ' '.join(names[0].split()).lower()
+
+
+def get_timeline(incidents):
+    """One offender's (incident_id, incident_date) -> [(incident_id, incident_date, days_to_next)] in date order."""
+    incidents = sorted((incident_date, incident_id) for incident_id, incident_date in incidents)
+    timeline = []
+    for index, (incident_date, incident_id) in enumerate(incidents):
+        days_to_next = None
+        if index + 1 < len(incidents):
+            days_to_next = (incidents[index + 1][0] - incident_date).days
+        timeline.append((incident_id, incident_date, days_to_next))
+
+    return timeline
+
+
+def get_min_gaps(timeline_rows, start_date=None, end_date=None):
+    """
+    timeline_rows are (offender_key, incident_date, days_to_next).  Returns (the sorted smallest gap of each offender
+    who reoffended, number of offenders), counting the incidents between start_date and end_date; a gap counts if its
+    first incident does, wherever the next one falls.
+    """
+    offenders = set()
+    min_gaps = {}
+    for offender_key, incident_date, days_to_next in timeline_rows:
+        if (start_date and incident_date < start_date) or (end_date and incident_date > end_date):
+            continue
+        offenders.add(offender_key)
+        if days_to_next is not None and days_to_next < min_gaps.get(offender_key, days_to_next + 1):
+            min_gaps[offender_key] = days_to_next
+
+    return sorted(min_gaps.values()), len(offenders)
+
+
+def get_recidivism_rates(sorted_gaps, offender_count, thresholds=RECIDIVISM_THRESHOLDS):
+    rates = []
+    for threshold in thresholds:
+        reoffenders = bisect.bisect_right(sorted_gaps, threshold)
+        rates.append({
+            'threshold': threshold,
+            'reoffenders': reoffenders,
+            'rate': reoffenders / offender_count if offender_count else 0.0,
+        })
+
+    return rates
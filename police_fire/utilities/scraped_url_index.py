@@ -0,0 +1,36 @@
+# in-memory index of article urls that are already in the database.  It's loaded with a single query at the
+# start of a crawl and updated as articles are added, so crawlers don't have to query the article table per url.
+from models.article import Article
+
+
+class ScrapedUrlIndex:
+    def __init__(self, urls=()):
+        self.urls = set(urls)
+
+    @classmethod
+    def load(cls, DBsession, url_prefix=None):
+        query = DBsession.query(Article.url)
+        if url_prefix:
+            query = query.filter(Article.url.like(url_prefix + '%'))
+        index = cls(url for (url,) in query)
+        print(f'{len(index)} already scraped urls loaded.')
+
+        return index
+
+    def __contains__(self, url):
+        return url in self.urls
+
+    def __len__(self):
+        return len(self.urls)
+
+    def add(self, url):
+        self.urls.add(url)
+
+        return
+
+    def all_known(self, urls):
+        """True if every url on a listing page has already been scraped, meaning older pages have been too."""
+        return len(urls) > 0 and all(url in self.urls for url in urls)
+
+    def unknown(self, urls):
+        return [url for url in urls if url not in self.urls]
@@ -4,17 +4,29 @@ import os
 import re
 
 import sqlalchemy
-from openai import OpenAI
-from openai.types.chat.completion_create_params import ResponseFormat
 from requests import Session
-from tqdm import tqdm
 
 from database import get_database_session
 from models.incident import Incident
 from models.incidents_with_errors import IncidentsWithErrors
 from models.article import Article
+from models.person import Person
+from models.person_name import PersonName
+from police_fire.utilities import date_resolution, gazetteer, llm_cache
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+DEFAULT_MODEL = 'gpt-4-1106-preview'
+
+_client = None
+
+
+def get_openai_client():
+    # openai is imported and the client made on first use, so importing a scraper doesn't pay for either
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+    return _client
 
 
 def delete_table_contents(DBsession, engine):
@@ -59,50 +71,52 @@ def clean_up_charges_details_and_legal_actions_records(charges_str, details_str,
 
 def search_for_day_of_week_in_details(details_str):
     """if the details contain a day of the week, return the day that matched"""
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    for day in days:
-        if day in details_str:
-            return day
+    match = date_resolution.weekday_pattern.search(details_str)
+    if match:
+        return match.group(1)
 
 
-def get_response_for_query(query, client=None, json=True):
+def get_response_for_query(query, client=None, json=True, model=DEFAULT_MODEL, temperature=0):
+    response_format = 'json_object' if json else None
+    # identical prompts are answered from the on-disk cache instead of the API
+    cache_key = llm_cache.get_cache_key(model, query, response_format, temperature)
+    cached_response = llm_cache.get_cached_response(cache_key)
+    if cached_response is not None:
+        print('cached response', cached_response)
+        return cached_response
+
     if client is None:
-        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        client = get_openai_client()
 
     if json:
         completion = client.chat.completions.create(
-            model='gpt-4-1106-preview',
+            model=model,
             messages=[
                 {'role': 'system',
                  'content': query},
             ],
-            temperature=0,
-            response_format=ResponseFormat(type='json_object')
+            temperature=temperature,
+            response_format={'type': 'json_object'}
         )
     else:
         completion = client.chat.completions.create(
-            model='gpt-4-1106-preview',
+            model=model,
             messages=[
                 {'role': 'system',
                  'content': query},
             ],
-            temperature=0,
+            temperature=temperature,
         )
     response = completion.choices[0].message.content.strip()
     print('response', response)
+    llm_cache.store_response(cache_key, model, response)
 
     return response
 
 
 def get_last_date_of_day_of_week_before_date(day_of_week, date):
     # find the last time that day of the week occurred before the date
-    query = "What was the most recent " + day_of_week + " that occurred before " + str(
-        date) + "? Return ONLY the date in JSON format, with the key as 'date', as a string formatted YYYY-MM-DD. If none, return N/A."
-
-    response = get_response_for_query(query)
-    response = ast.literal_eval(response)
-
-    return response['date']
+    return date_resolution.get_last_weekday_before(day_of_week, date).isoformat()
 
 
 def check_if_details_references_a_relative_date(details_str, incident_reported_date):
@@ -116,8 +130,15 @@ def check_if_details_references_a_relative_date(details_str, incident_reported_d
     return response
 
 
-def check_if_details_references_an_actual_date(details_str, article_published_date):
+def check_if_details_references_an_actual_date(details_str, article_published_date, use_llm_fallback=True):
     """if the details contain a date, return the date that matched + the year the article was published"""
+    resolved_date = date_resolution.resolve_incident_date(details_str, article_published_date)
+    if resolved_date:
+        return resolved_date.isoformat()
+    if not use_llm_fallback:
+        return None
+
+    # fall back to the LLM for phrasing the local resolver can't parse
     query = f"What was the date of the incident: {details_str}? Return only the date as YYYY-MM-DD as JSON with the key 'date'. Use the year in the article published date as the year: {article_published_date}"
     response = get_response_for_query(query)
     response = ast.literal_eval(response)
@@ -164,28 +185,23 @@ def get_incident_location_from_details(details_str):
     return response['location']
 
 
-def link_persons_to_incident(DBsession):
-    index = 0
-    persons = DBsession.query(Persons).all()
-    for person in tqdm(persons):
-        incidents = DBsession.query(Incident).filter_by(accused_name=person.name).all()
-        for incident in incidents:
-            incident.accused_person_id = person.id
-            DBsession.add(incident)
-            DBsession.commit()
-            print(f"Person ID: {person.id} linked to Incident ID: {incident.id}")
-            index += 1
+def resolve_incident_location(details_str, use_llm_fallback=True):
+    """The location from the Cortland County gazetteer, or from the LLM when the gazetteer can't place it."""
+    location = gazetteer.get_incident_location(details_str)
+    if location is not None or not use_llm_fallback:
+        return location
+
+    return get_incident_location_from_details(details_str)
 
-    return
 
+def get_person_id(DBsession, name):
+    """The person police_fire/data_normalization/resolve_people.py resolved name to, or None."""
+    person_id = DBsession.query(PersonName.person_id).filter(PersonName.name == name).scalar()
+    if person_id is None:
+        person_id = DBsession.query(Person.id).filter(Person.canonical_name == name).order_by(Person.id).limit(1) \
+            .scalar()
 
-def add_or_get_person(session, name):
-    person = session.query(Persons).filter_by(name=name).first()
-    if person is None:
-        person = Persons(name=name)
-        session.add(person)
-        session.commit()
-    return person.id
+    return person_id
 
 
 def login():
@@ -42,7 +42,7 @@ def handle_incorrect_number_of_incidents(article):
         legal_actions = input("Legal Actions: ")
         incident_date = input("Incident Date: ")
         incident_location = input("Incident Location: ")
-        incident_location_lat, incident_location_lng = get_lat_lng_of_addresses.get_lat_lng_of_address(incident_location)
+        incident_location_lat, incident_location_lng = get_lat_lng_of_addresses.get_lat_lng_of_address(incident_location, DBsession)
         source = article.url
 
         # create a new Incident object and add it to the database
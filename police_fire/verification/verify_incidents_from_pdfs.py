@@ -97,7 +97,7 @@ def handle_incorrect_number_of_incidents(pdf_object, date_published, pdf_path):
         incident_date = input("Incident Date: ")
         incident_location = input("Incident Location: ")
         incident_location_lat, incident_location_lng = get_lat_lng_of_addresses.get_lat_lng_of_address(
-            incident_location)
+            incident_location, DBsession)
         source = pdf_path
 
         # create a new Incident object and add it to the database
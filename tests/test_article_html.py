@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+
+from bs4 import BeautifulSoup
+
+from police_fire.utilities.article_html import extract_main_body_html, get_article_body_html, split_at_br_tags
+
+PAGE = """
+<html><head><script>var ads = [];</script></head>
+<body>
+<div class="nav"><p>Accused: not in the article</p></div>
+<div class="body main-body clearfix">
+<p>Accused: John Smith, 22, of Cortland<br/>Charges: <span>Petit larceny</span>, a misdemeanor<br/><!-- ad -->
+Details: City police said Smith took items from a store.</p>
+</div>
+</body></html>
+"""
+
+
+def test_only_the_main_body_is_kept():
+    body_html = extract_main_body_html(PAGE)
+
+    assert body_html.startswith('<div class="body main-body clearfix">')
+    assert 'nav' not in body_html
+    assert 'ads' not in body_html
+    assert extract_main_body_html('<html><body><p>No body here.</p></body></html>') == ''
+
+
+def test_body_html_is_set_the_first_time_it_is_needed():
+    article = SimpleNamespace(html_content=PAGE, body_html=None)
+
+    assert get_article_body_html(article) == article.body_html == extract_main_body_html(PAGE)
+
+    article = SimpleNamespace(html_content='<p>Accused: no main body</p>', body_html='')
+    assert get_article_body_html(article) == '<p>Accused: no main body</p>'
+
+
+def test_paragraphs_are_split_at_br_tags():
+    paragraph = BeautifulSoup(PAGE, 'html.parser').find('div', class_='main-body').find('p')
+
+    assert split_at_br_tags(paragraph) == ['Accused: John Smith, 22, of Cortland',
+                                           'Charges: Petit larceny, a misdemeanor',
+                                           'Details: City police said Smith took items from a store.']
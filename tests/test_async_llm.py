@@ -0,0 +1,166 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from police_fire.utilities.async_llm import MAX_DELAY_SECONDS, AsyncLLMClient
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f'status {status_code}')
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={'retry-after': retry_after} if retry_after else {})
+
+
+class FakeCompletions:
+    """Stands in for AsyncOpenAI().chat.completions: fails each query with the scripted errors, then answers it."""
+
+    def __init__(self, errors=None, latency=0.01):
+        self.errors = errors or {}
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def create(self, model, messages, temperature, response_format=None):
+        query = messages[0]['content']
+        self.requests.append(query)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if self.errors.get(query):
+                raise self.errors[query].pop(0)
+        finally:
+            self.in_flight -= 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f'{{"answer": "{query}"}}'))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+        )
+
+
+def make_client(completions, **kwargs):
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    client = AsyncLLMClient(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+                            requests_per_minute=60000, tokens_per_minute=10 ** 9, sleep=sleep, **kwargs)
+    return client, sleeps
+
+
+@pytest.fixture(autouse=True)
+def no_llm_cache(monkeypatch):
+    monkeypatch.setenv('LLM_CACHE_MODE', 'off')
+
+
+def test_queries_run_concurrently_up_to_the_limit_and_keep_their_order():
+    completions = FakeCompletions()
+    client, sleeps = make_client(completions, max_concurrency=3)
+
+    responses = client.get_responses([f'query {i}' for i in range(9)])
+
+    assert responses == [f'{{"answer": "query {i}"}}' for i in range(9)]
+    assert completions.max_in_flight == 3
+    stats = client.get_stats()
+    assert stats['calls'] == 9
+    assert stats['prompt_tokens'] == 90
+    assert stats['completion_tokens'] == 45
+
+
+def test_rate_limits_and_server_errors_are_retried_with_backoff():
+    completions = FakeCompletions(errors={
+        'query 0': [FakeAPIError(429, retry_after='2'), FakeAPIError(503)],
+    })
+    client, sleeps = make_client(completions, max_concurrency=2)
+
+    responses = client.get_responses(['query 0', 'query 1'])
+
+    assert responses[0] == '{"answer": "query 0"}'
+    assert completions.requests.count('query 0') == 3
+    # Retry-After is honored; otherwise the delay is jittered below the exponential cap
+    assert sleeps[0] == 2.0
+    assert 0 <= sleeps[1] <= 2
+    assert client.get_stats()['failed'] == 2
+
+
+def test_bad_requests_are_returned_without_retrying():
+    bad_request = FakeAPIError(400)
+    completions = FakeCompletions(errors={'query 0': [bad_request]})
+    client, sleeps = make_client(completions)
+
+    responses = client.get_responses(['query 0', 'query 1'])
+
+    assert responses[0] is bad_request
+    assert responses[1] == '{"answer": "query 1"}'
+    assert completions.requests.count('query 0') == 1
+    assert sleeps == []
+
+
+def test_requests_are_paced_by_the_request_budget():
+    client, sleeps = make_client(FakeCompletions(latency=0))
+    client.request_bucket.capacity = client.request_bucket.tokens = 1
+    client.request_bucket.rate = 100
+
+    began = time.monotonic()
+    client.get_responses([f'query {i}' for i in range(5)])
+
+    # one request up front, then one every 10ms
+    assert time.monotonic() - began >= 0.04
+
+
+def test_retry_after_is_capped_at_the_max_backoff():
+    completions = FakeCompletions(errors={'query 0': [FakeAPIError(429, retry_after='3600')]})
+    client, sleeps = make_client(completions)
+
+    client.get_responses(['query 0'])
+
+    assert sleeps == [MAX_DELAY_SECONDS]
+
+
+def test_backoff_gives_up_the_concurrency_slot():
+    completions = FakeCompletions(errors={'query 0': [FakeAPIError(429, retry_after='1')]}, latency=0)
+    requested_during_backoff = []
+
+    async def sleep(seconds):
+        await asyncio.sleep(0.05)
+        requested_during_backoff.extend(completions.requests)
+
+    client = AsyncLLMClient(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)),
+                            requests_per_minute=60000, tokens_per_minute=10 ** 9, max_concurrency=1, sleep=sleep)
+
+    responses = client.get_responses(['query 0', 'query 1'])
+
+    assert responses == ['{"answer": "query 0"}', '{"answer": "query 1"}']
+    # query 1 ran while query 0 was waiting to retry
+    assert 'query 1' in requested_during_backoff
+
+
+class LoopBoundCompletions(FakeCompletions):
+    """Like AsyncOpenAI's connection pool, only works on the event loop it was first used on."""
+
+    def __init__(self):
+        super().__init__()
+        self.loop = None
+
+    async def create(self, model, messages, temperature, response_format=None):
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        elif self.loop is not asyncio.get_running_loop():
+            raise RuntimeError('Event loop is closed')
+        return await super().create(model, messages, temperature, response_format=response_format)
+
+
+def test_get_responses_can_be_called_more_than_once():
+    completions = LoopBoundCompletions()
+    client, sleeps = make_client(completions, max_concurrency=2)
+
+    first_responses = client.get_responses(['query 0', 'query 1'])
+    second_responses = client.get_responses(['query 2'])
+    client.close()
+
+    assert first_responses == ['{"answer": "query 0"}', '{"answer": "query 1"}']
+    assert second_responses == ['{"answer": "query 2"}']
@@ -0,0 +1,77 @@
+import datetime
+import json
+from types import SimpleNamespace
+
+from police_fire.utilities.batched_extraction import extract_incidents, pack_articles, parse_batch_response
+
+
+def make_article(article_id, content='Police/Fire'):
+    return SimpleNamespace(id=article_id, content=content, date_published=datetime.date(2022, 10, 28),
+                           url=f'https://www.cortlandstandard.com/stories/{article_id}')
+
+
+def make_response(article_ids):
+    return json.dumps({'articles': [
+        {'article_id': article_id, 'incidents': [{
+            'accused_name': f'John Smith {article_id}', 'accused_age': 34, 'accused_location': 'Cortland',
+            'charges': ['petit larceny', 'trespass'], 'details': 'Smith stole a bike on Monday.',
+            'legal_actions': 'Ticketed', 'incident_date': '2022-10-24', 'incident_location': 'Main Street, Cortland',
+        }]} for article_id in article_ids
+    ]})
+
+
+def test_articles_are_packed_by_length_and_count():
+    articles = [make_article(1, 'a' * 60), make_article(2, 'b' * 60), make_article(3, 'c' * 200),
+                make_article(4, 'd'), make_article(5, 'e')]
+
+    batches = pack_articles(articles, max_characters=150, max_articles=2)
+
+    assert [[article.id for article in batch] for batch in batches] == [[1, 2], [3], [4, 5]]
+
+
+def test_response_is_validated_per_article():
+    response = json.dumps({'articles': [
+        json.loads(make_response([1]))['articles'][0],
+        {'article_id': 2, 'incidents': 'not a list'},
+        {'article_id': 3, 'incidents': [{'accused_name': 'N/A'}]},
+    ]})
+
+    extracted, failed = parse_batch_response(response, [1, 2, 3, 4])
+
+    assert failed == [2, 4]
+    assert extracted[3] == []
+    incident = extracted[1][0]
+    assert incident.accused_age == '34'
+    assert incident.charges == 'petit larceny, trespass'
+    assert incident.incident_date == '2022-10-24'
+    assert parse_batch_response('not json', [1]) == ({}, [1])
+
+
+def test_only_failed_articles_are_retried():
+    queries = []
+
+    def get_response(query):
+        queries.append(query)
+        article_ids = [int(line.split()[1]) for line in query.splitlines() if line.startswith('ARTICLE ')]
+        # article 2 is left out of the first response
+        if len(queries) == 1:
+            article_ids.remove(2)
+        return make_response(article_ids)
+
+    articles = [make_article(article_id) for article_id in range(1, 5)]
+    extracted, failed = extract_incidents(articles, get_response=get_response, max_articles=4)
+
+    assert failed == []
+    assert sorted(extracted) == [1, 2, 3, 4]
+    assert len(queries) == 2
+    assert [line for line in queries[1].splitlines() if line.startswith('ARTICLE ')] == \
+        ['ARTICLE 2 (published 2022-10-28):']
+
+
+def test_articles_that_keep_failing_are_returned():
+    articles = [make_article(1), make_article(2)]
+
+    extracted, failed = extract_incidents(articles, get_response=lambda query: '{"articles": []}', max_retries=1)
+
+    assert extracted == {}
+    assert [article.id for article in failed] == [1, 2]
@@ -0,0 +1,85 @@
+from police_fire.utilities.blotter_parser import is_complete, parse_accused, parse_blotter_html, parse_blotter_text
+from police_fire.utilities.gazetteer import get_incident_location
+
+STRONG_LAYOUT = """
+<div class="main-body">
+<p><strong>Accused:</strong> Julie M. Conners, 34, of Cold Brook Road, Homer</p>
+<p><strong>Charges:</strong> Driving while intoxicated, a misdemeanor</p>
+<p><strong>Details:</strong> Cortland County sheriff's officers found Conners' vehicle on Riley Road in
+Cortlandville at 11:40 p.m. Saturday.</p>
+<p><strong>Legal actions:</strong> Conners was ticketed to appear Nov. 27 in Cortlandville Town Court.</p>
+</div>
+<div class="related">Accused: not part of the article</div>
+"""
+
+BR_LAYOUT = """
+<p>Accused: John Smith, 22, of 14 Main St., Cortland; and Jane Doe, 25, of Homer<br>
+Charges: Petit larceny, a misdemeanor<br>
+Details: City police said Smith and Doe took items from a store on<br>
+Main Street at 2 p.m. Monday.<br>
+Legal actions: Both were ticketed.</p>
+<p>Accused: Robert Jones, 40, of Marathon<br>
+Charges: Harassment, a violation<br>
+Details: State police said Jones struck a man on Route 11 in Marathon.</p>
+"""
+
+OCR_TEXT = """Police/Fire
+Accused: Mark Lee, 19, of McGraw
+Charges: Criminal mischief, a misdemeanor
+Details: McGraw police said Lee broke a window
+at 6 p.m. Friday.
+Legal actions: Lee was ticketed to appear in McGraw Village Court.
+"""
+
+
+def test_strong_layout_is_read_from_the_main_body():
+    records = parse_blotter_html(STRONG_LAYOUT)
+
+    assert len(records) == 1
+    assert records[0]['accused'] == 'Julie M. Conners, 34, of Cold Brook Road, Homer'
+    assert records[0]['charges'] == 'Driving while intoxicated, a misdemeanor'
+    assert records[0]['details'].endswith('Cortlandville at 11:40 p.m. Saturday.')
+    assert records[0]['legal_actions'] == 'Conners was ticketed to appear Nov. 27 in Cortlandville Town Court.'
+
+
+def test_br_layout_splits_records_at_each_accused():
+    records = parse_blotter_html(BR_LAYOUT)
+
+    assert [record['accused'] for record in records] == [
+        'John Smith, 22, of 14 Main St., Cortland; and Jane Doe, 25, of Homer', 'Robert Jones, 40, of Marathon']
+    assert records[0]['details'] == ('City police said Smith and Doe took items from a store on Main Street at '
+                                     '2 p.m. Monday.')
+    assert records[1]['legal_actions'] is None
+    assert all(is_complete(record) for record in records)
+
+    accused_names, accused_ages, accused_locations = parse_accused(records[0]['accused'])
+    assert ','.join(accused_names) == 'John Smith,Jane Doe'
+    assert ','.join(accused_ages) == '22,25'
+    assert ','.join(accused_locations) == '14 Main St., Cortland,Homer'
+
+
+def test_ocr_text_with_wrapped_lines():
+    records = parse_blotter_text(OCR_TEXT)
+
+    assert records[0]['details'] == 'McGraw police said Lee broke a window at 6 p.m. Friday.'
+    assert is_complete(records[0])
+    assert not is_complete({'accused': 'Mark Lee', 'charges': None, 'details': 'Details', 'legal_actions': None})
+
+
+def test_accused_is_split_into_names_ages_and_locations():
+    assert parse_accused('Julie M. Conners, 34, of Cold Brook Road, Homer') == \
+        (['Julie M. Conners'], ['34'], ['Cold Brook Road, Homer'])
+    assert parse_accused('John Smith Jr., 22, of Cortland and Jane Doe, 25, of Homer') == \
+        (['John Smith Jr.', 'Jane Doe'], ['22', '25'], ['Cortland', 'Homer'])
+    # no age comes back as None, which the writers leave out of accused_age
+    assert parse_accused('Mark Lee, of McGraw') == (['Mark Lee'], [None], ['McGraw'])
+
+
+def test_incident_locations_come_from_the_gazetteer():
+    assert get_incident_location("Sheriff's officers found the car on Riley Road in Cortlandville.") == \
+        'Riley Road, Cortlandville, New York'
+    assert get_incident_location('City police said Smith took items from 14 Main St. on Monday.') == \
+        '14 Main St, Cortland, New York'
+    assert get_incident_location('State police said Jones struck a man on Route 11 in Marathon.') == \
+        'Route 11, Marathon, New York'
+    assert get_incident_location('Smith was sent to Cortland City Court.') is None
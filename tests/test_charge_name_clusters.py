@@ -0,0 +1,24 @@
+from police_fire.utilities.charge_name_clusters import cluster_crimes, get_cluster_members
+
+COUNTS = {'Petit larceny': 10, 'petit larceny': 3, 'Petit larcany': 1, 'Harassment': 5, 'harrassment': 1,
+          'Aggravated harassment': 2}
+
+
+def test_crimes_join_the_most_common_similar_crime():
+    clusters = cluster_crimes(list(COUNTS), counts=COUNTS)
+
+    assert clusters['Petit larcany'] == ('Petit larceny', 92)
+    assert clusters['petit larceny'] == ('Petit larceny', 100)
+    assert clusters['harrassment'][0] == 'Harassment'
+    # a different crime, not a misspelling
+    assert clusters['Aggravated harassment'] == ('Aggravated harassment', 100)
+    assert get_cluster_members(clusters) == {'Petit larceny': ['Petit larceny', 'petit larceny', 'Petit larcany'],
+                                             'Harassment': ['Harassment', 'harrassment']}
+
+
+def test_new_crimes_are_matched_against_saved_canonical_names():
+    clusters = cluster_crimes(['petit larcenyy', 'Burglary', 'Harassment'],
+                              canonical_crimes=['Petit larceny', 'Harassment'])
+
+    # saved crimes aren't clustered again
+    assert clusters == {'petit larcenyy': ('Petit larceny', 96), 'Burglary': ('Burglary', 100)}
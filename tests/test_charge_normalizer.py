@@ -0,0 +1,35 @@
+from police_fire.utilities.charge_normalizer import AhoCorasick, ChargeNormalizer, normalize_charge, normalize_many
+
+renames = {
+    'DWI': 'Driving while intoxicated',
+    'Aggravated DWI': 'Aggravated driving while intoxicated',
+    'speed not reasonable and prudent': 'speed not reasonable or prudent',
+}
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+
+    assert sorted(automaton.find_all('ushers')) == [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')]
+
+
+def test_normalize_only_renames_whole_descriptions():
+    normalizer = ChargeNormalizer(renames)
+
+    assert normalizer.normalize(' DWI ') == 'Driving while intoxicated'
+    assert normalizer.normalize('Aggravated DWI') == 'Aggravated driving while intoxicated'
+    assert normalizer.normalize('Common-law DWI') == 'Common-law DWI'
+    assert normalizer.unmatched == {'Common-law DWI'}
+
+
+def test_canonicalize_substrings_prefers_longest_whole_word_match():
+    normalizer = ChargeNormalizer(renames)
+
+    assert normalizer.canonicalize_substrings('Aggravated DWI and speed not reasonable and prudent, DWIs') == \
+        'Aggravated driving while intoxicated and speed not reasonable or prudent, DWIs'
+
+
+def test_mapping_is_loaded_from_the_data_file():
+    assert normalize_charge('Harrassment') == 'Harassment'
+    assert normalize_many(['DWI', None, 'DWI', 'Petit larceny']) == \
+        ['Driving while intoxicated', None, 'Driving while intoxicated', 'Petit larceny']
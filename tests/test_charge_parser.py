@@ -0,0 +1,56 @@
+from police_fire.utilities.charge_parser import parse_charges, tokenize, get_segments
+
+# the charges from test_scrape_charges_from_incidents.test_assert_all_charges_are_categorized
+seaman_charges = ('Aggravated driving while intoxicated with a blood alcohol content of 0.18% or more,'
+                  ' driving with a blood alcohol content of 0.08% or more, driving while intoxicated,'
+                  ' third-degree aggravated unlicensed operation of a motor vehicle, misdemeanors; '
+                  'inadequate brake lamps, a violation.')
+
+
+def summarize(records):
+    return [(record['crime'], record['charge_class'], record['degree'], record['counts']) for record in records]
+
+
+def test_golden_seaman_charges():
+    records = parse_charges(seaman_charges, 'Christian M. Seaman')
+
+    assert summarize(records) == [
+        ('Aggravated driving while intoxicated with a blood-alcohol content of 0.18% or greater', 'misdemeanors',
+         None, 1),
+        ('Driving while intoxicated with a blood-alcohol content of 0.08% or greater', 'misdemeanors', None, 1),
+        ('Driving while intoxicated', 'misdemeanors', None, 1),
+        ('Aggravated unlicensed operation of a motor vehicle', 'misdemeanors', 3, 1),
+        ('Inadequate brake lights', 'violations', None, 1),
+    ]
+    assert all(record['charged_name'] == 'Christian M. Seaman' for record in records)
+    assert records[3]['charge_description'] == 'third-degree aggravated unlicensed operation of a motor vehicle'
+
+
+def test_segments_match_categorize_charges():
+    segments = [(charge_class, ''.join(text for kind, text, value in tokens).strip())
+                for charge_class, tokens in get_segments(tokenize(seaman_charges))]
+
+    assert [charge_class for charge_class, text in segments] == ['misdemeanors', 'violations']
+    assert segments[1][1] == 'inadequate brake lamps'
+
+
+def test_counts_degrees_and_named_defendants():
+    records = parse_charges('Two counts of third-degree burglary, felonies; Smith was charged with petit larceny '
+                            'and Jones was charged with harassment, misdemeanors.', 'John Smith')
+
+    assert summarize(records) == [('Burglary', 'felonies', 3, 2), ('Petit larceny', 'misdemeanors', None, 1)]
+    assert records[1]['named_defendant'] == 'Smith'
+
+
+def test_known_descriptions_and_amounts_are_not_split():
+    records = parse_charges('speed not reasonable and prudent, a traffic infraction; fourth-degree grand larceny '
+                            '(property over $1,000), a felony.', 'John Smith')
+
+    # renamed to 'speed not reasonable or prudent' before it can be split on 'and'
+    assert summarize(records) == [('Speed not reasonable or prudent', 'traffic_infraction', None, 1),
+                                  ('Grand larceny', 'felonies', 4, 1)]
+
+
+def test_charges_without_a_class_are_uncategorized():
+    assert summarize(parse_charges('Petit larceny', 'John Smith')) == [('Petit larceny', 'uncategorized', None, 1)]
+    assert parse_charges(None, 'John Smith') == []
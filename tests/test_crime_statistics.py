@@ -0,0 +1,38 @@
+from police_fire.analysis.crime_statistics import refresh_materialized_views
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+
+class FakeDBsession:
+    def __init__(self, existing_views):
+        self.existing_views = existing_views
+        self.statements = []
+        self.commits = 0
+
+    def execute(self, statement, parameters=None):
+        if parameters is not None:
+            name = parameters['name']
+            return FakeResult(name if name in self.existing_views else None)
+        self.statements.append(str(statement))
+        return FakeResult(None)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+
+def test_views_missing_from_the_database_are_skipped():
+    DBsession = FakeDBsession(['public.crime_counts'])
+
+    refresh_materialized_views(DBsession)
+
+    assert DBsession.statements == ['REFRESH MATERIALIZED VIEW CONCURRENTLY public.crime_counts']
+    assert DBsession.commits == 1
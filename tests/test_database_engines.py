@@ -0,0 +1,24 @@
+from database import get_database_session, get_engine, get_scoped_session
+
+
+def test_sessions_share_one_engine_per_database():
+    first_session, first_engine = get_database_session(environment='test')
+    second_session, second_engine = get_database_session(environment='test')
+    assert first_engine is second_engine
+    assert first_session is not second_session
+    # 'dev' and 'development' are the same database
+    assert get_engine('dev') is get_engine('development')
+    assert get_engine('test') is not get_engine('development')
+    first_session.close()
+    second_session.close()
+
+
+def test_engine_pool_is_tuned():
+    engine = get_engine('test')
+    assert engine.pool.size() == 5
+    assert engine.pool._pre_ping
+    assert engine.pool._recycle == 1800
+
+
+def test_scoped_session_is_cached():
+    assert get_scoped_session('test') is get_scoped_session('test')
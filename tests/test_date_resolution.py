@@ -0,0 +1,35 @@
+import datetime
+
+from police_fire.utilities.date_resolution import resolve_incident_date, get_last_weekday_before, to_date
+
+
+def test_weekday_resolves_to_most_recent_weekday_before_article_date():
+    details = 'Two people called 911 about 5:35 p.m. Monday complaining'
+    assert resolve_incident_date(details, datetime.date(2022, 10, 28)) == datetime.date(2022, 10, 24)
+
+
+def test_same_weekday_as_article_resolves_to_previous_week():
+    assert get_last_weekday_before('Friday', '2022-10-28') == datetime.date(2022, 10, 21)
+
+
+def test_month_and_day_use_article_year():
+    details = 'Hill kicked open the door to a residence then threatened the resident with a knife on Oct. 9'
+    assert resolve_incident_date(details, datetime.date(2023, 10, 18)) == datetime.date(2023, 10, 9)
+
+
+def test_month_and_day_after_article_date_use_previous_year():
+    assert resolve_incident_date('The theft happened Dec. 28.', '2024-01-03') == datetime.date(2023, 12, 28)
+
+
+def test_yesterday_and_last_week():
+    assert resolve_incident_date('Police said the crash happened yesterday.', '2024-03-05') == datetime.date(2024, 3, 4)
+    assert resolve_incident_date('He was arrested last week.', '2024-03-05') == datetime.date(2024, 2, 27)
+
+
+def test_unparseable_details_return_none():
+    assert resolve_incident_date('Police said they found Conners intoxicated.', '2024-03-05') is None
+    assert resolve_incident_date('Officers said she may 3 times have fled.', '2024-03-05') is None
+
+
+def test_to_date_accepts_unpadded_strings():
+    assert to_date('2018-12-1') == datetime.date(2018, 12, 1)
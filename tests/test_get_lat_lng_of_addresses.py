@@ -0,0 +1,33 @@
+from models.geocode_cache import GeocodeCache
+from police_fire.maps.get_lat_lng_of_addresses import normalize_address, make_stub_geocoder, geocode_addresses
+from police_fire.test_database import setup_database
+
+
+def test_normalize_address_ignores_case_punctuation_and_state_suffix():
+    assert normalize_address('110 Main St., Cortland, New York') == '110 main st cortland'
+    assert normalize_address('110 Main Street, Cortland, NY') == '110 main st cortland'
+    assert normalize_address('110 MAIN ST CORTLAND') == '110 main st cortland'
+
+
+def test_stub_geocoder_returns_zero_results_for_unknown_addresses():
+    geocoder = make_stub_geocoder({'110 Main St., Cortland, New York': (42.6, -76.18)})
+    assert geocoder('110 Main Street, Cortland, NY') == (42.6, -76.18, 'OK')
+    assert geocoder('Nowhere Road, Atlantis') == (None, None, 'ZERO_RESULTS')
+
+
+def test_geocode_addresses_only_geocodes_unique_misses(setup_database):
+    DBsession = setup_database
+    DBsession.query(GeocodeCache).delete()
+    DBsession.commit()
+    geocoder = make_stub_geocoder({'110 Main St., Cortland, New York': (42.6, -76.18)})
+
+    addresses = ['110 Main St., Cortland, New York', '110 Main Street, Cortland, NY', 'Nowhere Road, Atlantis', 'N/A']
+    lat_lngs = geocode_addresses(addresses, DBsession, geocoder=geocoder)
+    assert lat_lngs['110 Main Street, Cortland, NY'] == (42.6, -76.18)
+    assert lat_lngs['Nowhere Road, Atlantis'] == (None, None)
+    assert lat_lngs['N/A'] == (None, None)
+    assert len(geocoder.calls) == 2
+
+    # second run is served entirely from the cache, including the negative result
+    geocode_addresses(addresses, DBsession, geocoder=geocoder)
+    assert len(geocoder.calls) == 2
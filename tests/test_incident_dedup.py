@@ -0,0 +1,63 @@
+import datetime
+from types import SimpleNamespace
+
+from models.details_fingerprint import get_details_fingerprint
+from police_fire.utilities.incident_dedup import block_incidents, plan_merges, split_accused_names
+
+DETAILS = 'City police said Smith took a bike from a porch on Main Street at 2 p.m. Monday.'
+
+
+def make_incident(incident_id, accused_name, details=DETAILS, reported_date=datetime.date(2022, 10, 26)):
+    return SimpleNamespace(id=incident_id, accused_name=accused_name, details=details,
+                           incident_reported_date=reported_date, details_fingerprint=get_details_fingerprint(details))
+
+
+def test_fingerprint_ignores_whitespace_case_and_quotes():
+    assert get_details_fingerprint('Police said  Smith’s\ncar') == get_details_fingerprint("police said Smith's car ")
+    assert get_details_fingerprint('') is None
+
+
+def test_names_are_split_without_splitting_suffixes():
+    assert split_accused_names('John Smith, Jr.,Jane Doe') == ['John Smith Jr.', 'Jane Doe']
+
+
+def test_incidents_are_only_compared_within_blocks():
+    incidents = [
+        make_incident(1, 'John Smith'),
+        make_incident(2, 'Jane Doe', details='Something else.', reported_date=datetime.date(2022, 10, 24)),
+        make_incident(3, 'Bob Smith', details='Another thing.', reported_date=datetime.date(2022, 10, 30)),
+        make_incident(4, 'Bob Smith', details='A third thing.', reported_date=datetime.date(2022, 11, 7)),
+    ]
+
+    # 1 and 3 share a last name and a week; 4 was reported the week after
+    assert block_incidents(incidents) == {(1, 3)}
+
+
+def test_groups_of_any_size_keep_one_incident_per_person():
+    incidents = [
+        make_incident(1, 'John Smith, Jr.'),
+        make_incident(2, 'John Smith Jr.', details=DETAILS.upper()),
+        make_incident(3, 'John A. Smith Jr.', details=DETAILS.replace('Main Street', 'Main St.')),
+        make_incident(4, 'John Smith,Jane Doe'),
+        make_incident(5, 'N/A'),
+    ]
+
+    plan = plan_merges(incidents)
+
+    assert plan == [{
+        'incident_ids': [1, 2, 3, 4],
+        'rules': ['same first and last name', 'same name except for commas', 'several accused'],
+        'keep': [3],
+        'delete': [1, 2, 4],
+        'split': [{'incident_id': 4, 'names': ['Jane Doe']}],
+    }]
+
+
+def test_different_people_and_different_details_are_not_merged():
+    incidents = [
+        make_incident(1, 'John Smith'),
+        make_incident(2, 'Mary Smith'),
+        make_incident(3, 'John Smith', details='State police said Smith was speeding on Route 11 in Homer.'),
+    ]
+
+    assert plan_merges(incidents) == []
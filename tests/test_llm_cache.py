@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from police_fire.utilities import llm_cache
+
+
+@pytest.fixture(scope="function")
+def cache_path(tmp_path):
+    llm_cache.reset_cache_stats()
+    yield str(tmp_path / 'llm_cache.sqlite3')
+    llm_cache.close_connections()
+
+
+def test_cache_key_depends_on_every_input():
+    key = llm_cache.get_cache_key('gpt-4-1106-preview', 'query', 'json_object', 0)
+    assert key == llm_cache.get_cache_key('gpt-4-1106-preview', 'query', 'json_object', 0)
+    assert key != llm_cache.get_cache_key('gpt-3.5-turbo-1106', 'query', 'json_object', 0)
+    assert key != llm_cache.get_cache_key('gpt-4-1106-preview', 'other query', 'json_object', 0)
+    assert key != llm_cache.get_cache_key('gpt-4-1106-preview', 'query', None, 0)
+    assert key != llm_cache.get_cache_key('gpt-4-1106-preview', 'query', 'json_object', 1)
+
+
+def test_stored_response_is_returned_and_counted(cache_path):
+    key = llm_cache.get_cache_key('gpt-4-1106-preview', 'query', 'json_object', 0)
+    assert llm_cache.get_cached_response(key, cache_path=cache_path, mode='readwrite') is None
+
+    llm_cache.store_response(key, 'gpt-4-1106-preview', '{"date": "2022-10-24"}', cache_path=cache_path,
+                             mode='readwrite')
+
+    assert llm_cache.get_cached_response(key, cache_path=cache_path, mode='readwrite') == '{"date": "2022-10-24"}'
+    assert llm_cache.cache_stats['hits'] == 1
+    assert llm_cache.cache_stats['misses'] == 1
+    assert llm_cache.cache_stats['writes'] == 1
+
+
+def test_replay_mode_raises_on_miss_and_does_not_write(cache_path):
+    key = llm_cache.get_cache_key('gpt-4-1106-preview', 'query', 'json_object', 0)
+    llm_cache.store_response(key, 'gpt-4-1106-preview', 'response', cache_path=cache_path, mode='replay')
+
+    with pytest.raises(llm_cache.LLMCacheMissError):
+        llm_cache.get_cached_response(key, cache_path=cache_path, mode='replay')
+    assert llm_cache.get_cache_size(cache_path=cache_path) == 0
+
+
+def test_evict_drops_old_and_least_recently_used_entries(cache_path):
+    for index in range(5):
+        llm_cache.store_response(str(index), 'model', 'response', cache_path=cache_path, mode='readwrite')
+    connection = llm_cache.get_connection(cache_path)
+    connection.execute("UPDATE llm_response SET last_used_at = ? WHERE cache_key = '0'", (time.time() - 10 * 86400,))
+    connection.execute("UPDATE llm_response SET last_used_at = ? WHERE cache_key = '1'", (time.time() - 60,))
+    connection.commit()
+
+    evicted = llm_cache.evict(max_entries=3, max_age_days=1, cache_path=cache_path)
+
+    assert evicted == 2
+    assert llm_cache.get_cache_size(cache_path=cache_path) == 3
+    assert llm_cache.get_cached_response('1', cache_path=cache_path, mode='readwrite') is None
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from police_fire.cortland_standard.ocr_pages import ocr_pages
+
+ocr_calls = []
+
+
+def stub_ocr(pdf_path, newspaper_page_number):
+    ocr_calls.append(newspaper_page_number)
+    if newspaper_page_number > 2:
+        return None
+    return f'Police/fire page {newspaper_page_number}'
+
+
+def test_pages_are_ocred_once_and_then_read_from_the_cache(tmp_path):
+    ocr_calls.clear()
+    pdf_path = tmp_path / 'edition.pdf'
+    pdf_path.write_bytes(b'%PDF-1.4 first edition')
+    pages_path = str(tmp_path / 'pages')
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        texts = ocr_pages(str(pdf_path), [2, 1], pages_path, executor=executor, ocr_function=stub_ocr)
+        assert texts == {2: 'Police/fire page 2', 1: 'Police/fire page 1'}
+        assert sorted(ocr_calls) == [1, 2]
+
+        texts = ocr_pages(str(pdf_path), [2, 1], pages_path, executor=executor, ocr_function=stub_ocr)
+        assert texts == {2: 'Police/fire page 2', 1: 'Police/fire page 1'}
+        assert sorted(ocr_calls) == [1, 2]
+
+        # a different PDF in the same folder doesn't hit the first one's cache
+        pdf_path.write_bytes(b'%PDF-1.4 second edition')
+        ocr_pages(str(pdf_path), [2], pages_path, executor=executor, ocr_function=stub_ocr)
+        assert sorted(ocr_calls) == [1, 2, 2]
+
+
+def test_missing_pages_are_not_cached(tmp_path):
+    ocr_calls.clear()
+    pdf_path = tmp_path / 'edition.pdf'
+    pdf_path.write_bytes(b'%PDF-1.4')
+    pages_path = str(tmp_path / 'pages')
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert ocr_pages(str(pdf_path), [5], pages_path, executor=executor, ocr_function=stub_ocr) == {5: None}
+        ocr_pages(str(pdf_path), [5], pages_path, executor=executor, ocr_function=stub_ocr)
+    assert ocr_calls == [5, 5]
@@ -0,0 +1,37 @@
+from police_fire.utilities.person_names import format_name, parse_name, resolve_names, soundex
+
+
+def test_names_are_parsed_with_commas_suffixes_and_middle_initials():
+    assert parse_name('Smith, John A. Jr.') == parse_name('John A Smith, Jr') == {
+        'first': 'John', 'middle': 'A', 'last': 'Smith', 'suffix': 'Jr.'}
+    assert parse_name('Chris "CJ" Hines')['first'] == 'Chris'
+    assert parse_name('N/A') is None
+    assert format_name(parse_name('smith, john a')) == 'John A. Smith'
+
+
+def test_soundex():
+    assert soundex('Hines') == soundex('Hynes') == 'H520'
+    assert soundex('Ashcraft') == 'A261'
+
+
+def test_name_variants_resolve_to_one_person():
+    person_keys, canonical_names = resolve_names(
+        ['Chris Hines', 'Christopher Hines', 'Chris Hynes', 'Chris Jones'],
+        counts={'Christopher Hines': 3, 'Chris Hines': 1, 'Chris Hynes': 1})
+    assert person_keys['Chris Hines'] == person_keys['Christopher Hines'] == person_keys['Chris Hynes']
+    assert person_keys['Chris Jones'] != person_keys['Chris Hines']
+    assert canonical_names[person_keys['Chris Hines']] == 'Christopher Hines'
+
+
+def test_conflicting_middle_initials_and_suffixes_stay_separate():
+    person_keys, canonical_names = resolve_names(['John A. Smith', 'John B. Smith', 'John Smith', 'John Smith Jr.',
+                                                  'John Smith Sr.'])
+    assert person_keys['John A. Smith'] != person_keys['John B. Smith']
+    assert person_keys['John Smith Jr.'] != person_keys['John Smith Sr.']
+
+
+def test_new_names_join_saved_people():
+    person_keys, canonical_names = resolve_names(['Christopher Hines', 'Jane Doe'], people=[(7, 'Chris Hines')])
+    assert person_keys['Christopher Hines'] == 7
+    assert person_keys['Jane Doe'] == -1
+    assert canonical_names == {-1: 'Jane Doe'}
@@ -0,0 +1,66 @@
+import asyncio
+
+from police_fire.utilities.rate_limiting import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_burst_is_available_immediately_then_callers_queue():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    # the next two callers wait for the bucket to refill at 2 tokens per second
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+
+
+def test_tokens_refill_over_time_up_to_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.now = 100.0
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 1.0
+
+
+def test_acquire_waits_for_reserved_delay():
+    clock = FakeClock()
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+        clock.now += delay
+
+    bucket = TokenBucket(rate=4, capacity=1, clock=clock, async_sleep=fake_sleep)
+
+    async def acquire_twice():
+        await bucket.acquire()
+        await bucket.acquire()
+
+    asyncio.run(acquire_twice())
+    # the first caller takes the only token, the second waits 1/rate for the next one
+    assert delays == [0.25]
+
+
+def test_wait_sleeps_for_reserved_delay():
+    clock = FakeClock()
+    delays = []
+    bucket = TokenBucket(rate=2, capacity=1, clock=clock, sleep=delays.append)
+
+    bucket.wait()
+    bucket.wait()
+    clock.now = 10.0
+    bucket.wait()
+
+    assert delays == [0.5]
@@ -0,0 +1,40 @@
+import datetime
+
+from police_fire.utilities.recidivism import get_min_gaps, get_offender_key, get_recidivism_rates, get_timeline
+
+
+def test_offender_keys():
+    assert get_offender_key(12, 'Chris Hines') == 'person:12'
+    assert get_offender_key(None, ' Chris  Hines, Jr.') == 'name:chris hines jr.'
+    assert get_offender_key(None, 'Chris Hines, Jane Doe') is None
+    assert get_offender_key(None, 'N/A') is None
+
+
+def test_timeline_gaps_are_days_to_the_next_incident():
+    assert get_timeline([(3, datetime.date(2022, 3, 1)), (1, datetime.date(2022, 1, 1)),
+                         (2, datetime.date(2022, 1, 31))]) == [
+        (1, datetime.date(2022, 1, 1), 30),
+        (2, datetime.date(2022, 1, 31), 29),
+        (3, datetime.date(2022, 3, 1), None),
+    ]
+
+
+def test_rates_for_any_threshold_and_window():
+    timeline_rows = [('person:1', incident_date, days_to_next) for incident_id, incident_date, days_to_next in
+                     get_timeline([(1, datetime.date(2022, 1, 1)), (2, datetime.date(2022, 6, 1))])]
+    timeline_rows += [
+        ('name:jane doe', datetime.date(2022, 2, 1), 10),
+        ('name:jane doe', datetime.date(2022, 2, 11), None),
+        ('name:john smith', datetime.date(2023, 1, 1), None),
+    ]
+
+    sorted_gaps, offender_count = get_min_gaps(timeline_rows)
+    assert (sorted_gaps, offender_count) == ([10, 151], 3)
+    rates = get_recidivism_rates(sorted_gaps, offender_count, [5, 10, 365])
+    assert [rate['reoffenders'] for rate in rates] == [0, 1, 2]
+
+    sorted_gaps, offender_count = get_min_gaps(timeline_rows, start_date=datetime.date(2022, 2, 1),
+                                               end_date=datetime.date(2022, 12, 31))
+    assert (sorted_gaps, offender_count) == ([10], 2)
+    assert get_recidivism_rates(sorted_gaps, offender_count, [30])[0]['rate'] == 0.5
+    assert get_recidivism_rates([], 0, [30])[0]['rate'] == 0.0
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+from police_fire.cortland_standard.scrape_articles_by_section import get_article_urls
+from police_fire.utilities.scraped_url_index import ScrapedUrlIndex
+
+STORY_URL = 'https://www.cortlandstandard.com/stories/'
+
+
+class FakeQuery:
+    def __init__(self, urls):
+        self.urls = urls
+        self.criteria = []
+
+    def filter(self, *criteria):
+        self.criteria.extend(criteria)
+        return self
+
+    def __iter__(self):
+        return iter([(url,) for url in self.urls])
+
+
+class FakeDBsession:
+    def __init__(self, urls):
+        self.queries = []
+        self.urls = urls
+
+    def query(self, *columns):
+        self.queries.append(FakeQuery(self.urls))
+        return self.queries[-1]
+
+
+class FakeListingSession:
+    """Serves archive listing pages; every page has a next link, so only the index can stop pagination."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested_urls = []
+
+    def get(self, url):
+        self.requested_urls.append(url)
+        page_number = int(url.rsplit('page=', 1)[1])
+        items = ''.join(f'<div class="item"><a href="/stories/{slug}">{slug}</a></div>'
+                        for slug in self.pages[page_number - 1])
+        html = (f'<div class="container pk-layer default noear"><div class="story_list">{items}</div></div>'
+                f'<span class="next">Next</span>')
+        return SimpleNamespace(content=html.encode('utf-8'))
+
+
+def test_load_reads_urls_with_one_query():
+    DBsession = FakeDBsession([STORY_URL + 'a,1', STORY_URL + 'b,2'])
+
+    scraped_urls = ScrapedUrlIndex.load(DBsession, url_prefix='https://www.cortlandstandard.com')
+
+    assert len(DBsession.queries) == 1
+    assert len(DBsession.queries[0].criteria) == 1
+    assert len(scraped_urls) == 2
+    assert STORY_URL + 'a,1' in scraped_urls
+
+
+def test_add_unknown_and_all_known():
+    scraped_urls = ScrapedUrlIndex([STORY_URL + 'a,1'])
+
+    assert scraped_urls.unknown([STORY_URL + 'a,1', STORY_URL + 'b,2']) == [STORY_URL + 'b,2']
+    assert not scraped_urls.all_known([STORY_URL + 'a,1', STORY_URL + 'b,2'])
+    # an empty listing page isn't evidence that older pages have been scraped
+    assert not scraped_urls.all_known([])
+
+    scraped_urls.add(STORY_URL + 'b,2')
+
+    assert scraped_urls.unknown([STORY_URL + 'a,1', STORY_URL + 'b,2']) == []
+    assert scraped_urls.all_known([STORY_URL + 'a,1', STORY_URL + 'b,2'])
+
+
+def test_get_article_urls_stops_at_the_first_all_known_page():
+    session = FakeListingSession([['c,3', 'b,2'], ['b,2', 'a,1'], ['z,0']])
+    scraped_urls = ScrapedUrlIndex([STORY_URL + 'b,2', STORY_URL + 'a,1'])
+
+    article_urls = get_article_urls(['Police/Fire'], [], '', 'any', '', '', [], session=session, max_pages=10,
+                                    page_delay=0.001, scraped_urls=scraped_urls)
+
+    assert len(session.requested_urls) == 2
+    assert article_urls == [STORY_URL + 'c,3', STORY_URL + 'b,2', STORY_URL + 'b,2', STORY_URL + 'a,1']